@@ -1,71 +1,29 @@
 """CLI entry point — dispatch table and usage."""
 
-import json
+import importlib
+import sqlite3
 import sys
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, NamedTuple
 
-from molt.api import req
-from molt.commands.browse import (
-    cmd_agent,
-    cmd_agent_comments,
-    cmd_catchup,
-    cmd_comments,
-    cmd_controversial,
-    cmd_feed,
-    cmd_ffeed,
-    cmd_followers,
-    cmd_following,
-    cmd_global,
-    cmd_grep_local,
-    cmd_history,
-    cmd_home,
-    cmd_leaderboard,
-    cmd_me,
-    cmd_myposts,
-    cmd_network,
-    cmd_notifs,
-    cmd_notifs_read,
-    cmd_notifs_read_post,
-    cmd_postwindow,
-    cmd_prune,
-    cmd_read,
-    cmd_review,
-    cmd_search,
-    cmd_sfeed,
-    cmd_stats,
-    cmd_status,
-    cmd_submolts,
-    cmd_wsearch,
-)
-from molt.commands.dm import (
-    cmd_dmapprove,
-    cmd_dmblock,
-    cmd_dmcheck,
-    cmd_dmread,
-    cmd_dmreject,
-    cmd_dmreply,
-    cmd_dmrequests,
-    cmd_dms,
-    cmd_dmsend,
-)
-from molt.commands.write import (
-    cmd_comment_file,
-    cmd_cupvote,
-    cmd_describe,
-    cmd_downvote,
-    cmd_follow,
-    cmd_note,
-    cmd_post_file,
-    cmd_subscribe,
-    cmd_unfollow,
-    cmd_unsubscribe,
-    cmd_upvote,
-)
-from molt.db import get_challenges, get_db, migrate_from_json, update_challenge_result
+from molt import mirror
+from molt.background import join_all
+from molt.db import get_db, migrate_from_json, transaction
 from molt.hud import hud
 
 USAGE = """\
 molt - Moltbook CLI for ClaudeOpus-Lauri
 Every command shows a HUD: time, cooldown, stats, gap since last action.
+The HUD prints from the last snapshot and refreshes it in the background
+(MOLT_HUD=sync waits for fresh data instead).
+`molt --profile[=PATH] <command> ...` reports where the command's time went
+(network, SQLite, solver, stdout) on stderr; with PATH, also a cProfile dump
+there and collapsed stacks for flamegraphs in PATH.folded.
+`--offline` answers feed, sfeed, read, agent and myposts from the local store
+(labelled with its age) and makes no network requests; `--stale-ok` shows the
+local copy at once and refreshes it in the background. Global flags go before
+the command: after it, every word is the command's own.
 
 Browse:
   home                        Dashboard via /home (account, activity, DMs, todos)
@@ -119,7 +77,7 @@ DMs:
 
 Track:
   myposts                     Check all my posts (live upvotes/comments)
-  review                      Fetch engagement on ALL my posts+comments, track deltas
+  review [all]                Fetch engagement on my posts+comments due a check (all: every one), track deltas
   prune                       Remove tracked posts/comments that no longer exist
   notifs [n]                  Show recent notifications (default 20)
   notifs-read                 Mark all notifications as read
@@ -127,160 +85,188 @@ Track:
   search <query>              Search local DB (posts + agents by keyword)
   network [n]                 Interaction graph: who I engage with most
   controversial [n]           Posts sorted by controversy ratio (downvotes/upvotes)
+  trends [n]                  Best posting hours, rising posts, time to n upvotes (default 10)
   note <agent> <text>         Add a note to an agent
-  history [n]                 Recent actions log"""
+  history [n]                 Recent actions log
+  perf [hours]                API latency p50/p95/p99 per endpoint (default: last 24h)"""
 
 
-def main() -> None:
-    db = get_db()
+_REQUIRED = object()
+_ME = "ClaudeOpus-Lauri"
 
-    if not db.execute("SELECT 1 FROM actions LIMIT 1").fetchone():
-        migrate_from_json(db)
+Parser = Callable[[list[str]], Any]
 
-    args = sys.argv[1:]
-    if not args:
-        print(USAGE)
-        hud(db)
-        db.close()
-        sys.exit(0)
 
-    cmd = args[0]
-    hud(db)
-
-    if cmd == "home":
-        cmd_home(db)
-    elif cmd == "t":
-        cmd_history(db, 5)
-    elif cmd == "status":
-        cmd_status(db)
-    elif cmd == "catchup":
-        cmd_catchup(db, int(args[1]) if len(args) > 1 else 5)
-    elif cmd == "me":
-        cmd_me(db)
-    elif cmd == "feed":
-        cmd_feed(db, int(args[1]) if len(args) > 1 else 10, int(args[2]) if len(args) > 2 else 0)
-    elif cmd == "ffeed":
-        cmd_ffeed(db, int(args[1]) if len(args) > 1 else 10)
-    elif cmd == "grep":
-        cmd_grep_local(db, args[1] if len(args) > 1 else "", int(args[2]) if len(args) > 2 else 20)
-    elif cmd == "read":
-        cmd_read(db, args[1])
-    elif cmd == "comments":
-        cmd_comments(db, args[1], args[2] if len(args) > 2 else "best")
-    elif cmd == "postfile":
-        cmd_post_file(db, args[1])
-    elif cmd == "commentfile":
-        cmd_comment_file(db, args[1], args[2])
-    elif cmd == "upvote":
-        cmd_upvote(db, args[1])
-    elif cmd == "submolts":
-        cmd_submolts(db, int(args[1]) if len(args) > 1 else 20)
-    elif cmd == "sfeed":
-        cmd_sfeed(db, args[1], int(args[2]) if len(args) > 2 else 10, args[3] if len(args) > 3 else "new")
-    elif cmd == "wsearch":
-        cmd_wsearch(db, " ".join(args[1:]))
-    elif cmd == "agent":
-        cmd_agent(db, args[1])
-    elif cmd == "agentcomments":
-        cmd_agent_comments(db, args[1], int(args[2]) if len(args) > 2 else 10)
-    elif cmd == "follow":
-        cmd_follow(db, args[1])
-    elif cmd == "unfollow":
-        cmd_unfollow(db, args[1])
-    elif cmd == "describe":
-        cmd_describe(db, " ".join(args[1:]))
-    elif cmd == "cupvote":
-        cmd_cupvote(db, args[1])
-    elif cmd == "downvote":
-        cmd_downvote(db, args[1])
-    elif cmd == "subscribe":
-        cmd_subscribe(db, args[1])
-    elif cmd == "unsubscribe":
-        cmd_unsubscribe(db, args[1])
-    elif cmd == "followers":
-        cmd_followers(db, args[1] if len(args) > 1 else "ClaudeOpus-Lauri")
-    elif cmd == "following":
-        cmd_following(db, args[1] if len(args) > 1 else "ClaudeOpus-Lauri")
-    elif cmd == "leaderboard":
-        cmd_leaderboard(db, int(args[1]) if len(args) > 1 else 20)
-    elif cmd == "stats":
-        cmd_stats()
-    elif cmd == "postwindow":
-        cmd_postwindow(db)
-    elif cmd == "global":
-        cmd_global(db, int(args[1]) if len(args) > 1 else 10, args[2] if len(args) > 2 else "hot")
-    elif cmd == "myposts":
-        cmd_myposts(db)
-    elif cmd == "review":
-        cmd_review(db)
-    elif cmd == "prune":
-        cmd_prune(db)
-    elif cmd == "notifs":
-        cmd_notifs(db, int(args[1]) if len(args) > 1 else 20)
-    elif cmd == "notifs-read":
-        cmd_notifs_read()
-    elif cmd == "notifs-read-post":
-        cmd_notifs_read_post(args[1])
-    elif cmd == "search":
-        cmd_search(db, " ".join(args[1:]))
-    elif cmd == "network":
-        cmd_network(db, int(args[1]) if len(args) > 1 else 15)
-    elif cmd == "controversial":
-        cmd_controversial(db, int(args[1]) if len(args) > 1 else 20)
-    elif cmd == "note":
-        cmd_note(db, args[1], " ".join(args[2:]))
-    elif cmd == "history":
-        cmd_history(db, int(args[1]) if len(args) > 1 else 20)
-    elif cmd == "verify":
-        code = args[1]
-        answer_str = " ".join(args[2:])
-        d = req("POST", "/verify", {"verification_code": code, "answer": answer_str})
-        print(json.dumps(d, indent=2))
-        result = "success" if d.get("success") else "fail"
-        update_challenge_result(db, code, float(answer_str), result)
-    elif cmd == "challenges":
-        rows = get_challenges(db, int(args[1]) if len(args) > 1 else 20)
-        if not rows:
-            print("No challenges logged yet.")
-        else:
-            ok = sum(1 for r in rows if r["result"] == "success")
-            fail = sum(1 for r in rows if r["result"] == "fail")
-            pending = sum(1 for r in rows if r["result"] is None)
-            print(f"Recent challenges: {ok} ok, {fail} fail, {pending} pending\n")
-            for r in rows:
-                status = r["result"] or "pending"
-                proposed = f'{r["proposed"]:.2f}' if r["proposed"] is not None else "?"
-                submitted = f'{r["submitted"]:.2f}' if r["submitted"] is not None else "-"
-                print(f"  [{status:7}] {r['at'][:16]}  nums={r['numbers']}  op={r['operation']}")
-                print(f"           proposed={proposed}  submitted={submitted}")
-                decoded = r["decoded_text"]
-                if len(decoded) > 80:
-                    decoded = decoded[:77] + "..."
-                print(f"           {decoded}")
-                print()
-    elif cmd == "dmcheck":
-        cmd_dmcheck(db)
-    elif cmd == "dms":
-        cmd_dms(db)
-    elif cmd == "dmread":
-        cmd_dmread(db, args[1])
-    elif cmd == "dmreply":
-        cmd_dmreply(db, args[1], " ".join(args[2:]))
-    elif cmd == "dmrequests":
-        cmd_dmrequests(db)
-    elif cmd == "dmapprove":
-        cmd_dmapprove(db, args[1])
-    elif cmd == "dmreject":
-        cmd_dmreject(db, args[1])
-    elif cmd == "dmblock":
-        cmd_dmblock(db, args[1])
-    elif cmd == "dmsend":
-        cmd_dmsend(db, args[1], " ".join(args[2:]))
-    else:
+def _arg(i: int, default: Any = _REQUIRED, conv: Callable[[str], Any] = str) -> Parser:
+    """The i-th word after the command, converted; IndexError when required and missing."""
+
+    def parse(args: list[str]) -> Any:
+        if len(args) > i:
+            return conv(args[i])
+        if default is _REQUIRED:
+            raise IndexError(i)
+        return default
+
+    return parse
+
+
+def _rest(i: int) -> Parser:
+    """Every word from the i-th on, joined with spaces."""
+    return lambda args: " ".join(args[i:])
+
+
+def _const(value: Any) -> Parser:
+    return lambda _args: value
+
+
+class Command(NamedTuple):
+    module: str
+    func: str
+    args: tuple[Parser, ...] = ()
+    db: bool = True  # pass the connection as the first argument
+
+
+_BROWSE = "molt.commands.browse"
+_WRITE = "molt.commands.write"
+_DM = "molt.commands.dm"
+_VERIFY = "molt.commands.verify"
+
+# name -> where the handler lives and how to parse its arguments. Modules are
+# imported only when their command runs, so `t` never loads the DM or write code.
+COMMANDS: dict[str, Command] = {
+    "home": Command(_BROWSE, "cmd_home"),
+    "t": Command(_BROWSE, "cmd_history", (_const(5),)),
+    "status": Command(_BROWSE, "cmd_status"),
+    "catchup": Command(_BROWSE, "cmd_catchup", (_arg(0, 5, int),)),
+    "me": Command(_BROWSE, "cmd_me"),
+    "feed": Command(_BROWSE, "cmd_feed", (_arg(0, 10, int), _arg(1, 0, int))),
+    "ffeed": Command(_BROWSE, "cmd_ffeed", (_arg(0, 10, int),)),
+    "grep": Command(_BROWSE, "cmd_grep_local", (_arg(0, ""), _arg(1, 20, int))),
+    "read": Command(_BROWSE, "cmd_read", (_arg(0),)),
+    "comments": Command(_BROWSE, "cmd_comments", (_arg(0), _arg(1, "best"))),
+    "submolts": Command(_BROWSE, "cmd_submolts", (_arg(0, 20, int),)),
+    "sfeed": Command(_BROWSE, "cmd_sfeed", (_arg(0), _arg(1, 10, int), _arg(2, "new"))),
+    "wsearch": Command(_BROWSE, "cmd_wsearch", (_rest(0),)),
+    "agent": Command(_BROWSE, "cmd_agent", (_arg(0),)),
+    "agentcomments": Command(_BROWSE, "cmd_agent_comments", (_arg(0), _arg(1, 10, int))),
+    "followers": Command(_BROWSE, "cmd_followers", (_arg(0, _ME),)),
+    "following": Command(_BROWSE, "cmd_following", (_arg(0, _ME),)),
+    "leaderboard": Command(_BROWSE, "cmd_leaderboard", (_arg(0, 20, int),)),
+    "stats": Command(_BROWSE, "cmd_stats", db=False),
+    "postwindow": Command(_BROWSE, "cmd_postwindow"),
+    "global": Command(_BROWSE, "cmd_global", (_arg(0, 10, int), _arg(1, "hot"))),
+    "myposts": Command(_BROWSE, "cmd_myposts"),
+    "trends": Command(_BROWSE, "cmd_trends", (_arg(0, 10, int),)),
+    "perf": Command(_BROWSE, "cmd_perf", (_arg(0, 24, int),)),
+    "review": Command(_BROWSE, "cmd_review", (_arg(0, False, lambda s: s == "all"),)),
+    "prune": Command(_BROWSE, "cmd_prune"),
+    "notifs": Command(_BROWSE, "cmd_notifs", (_arg(0, 20, int),)),
+    "notifs-read": Command(_BROWSE, "cmd_notifs_read", db=False),
+    "notifs-read-post": Command(_BROWSE, "cmd_notifs_read_post", (_arg(0),), db=False),
+    "search": Command(_BROWSE, "cmd_search", (_rest(0),)),
+    "network": Command(_BROWSE, "cmd_network", (_arg(0, 15, int),)),
+    "controversial": Command(_BROWSE, "cmd_controversial", (_arg(0, 20, int),)),
+    "history": Command(_BROWSE, "cmd_history", (_arg(0, 20, int),)),
+    "postfile": Command(_WRITE, "cmd_post_file", (_arg(0),)),
+    "commentfile": Command(_WRITE, "cmd_comment_file", (_arg(0), _arg(1))),
+    "upvote": Command(_WRITE, "cmd_upvote", (_arg(0),)),
+    "downvote": Command(_WRITE, "cmd_downvote", (_arg(0),)),
+    "cupvote": Command(_WRITE, "cmd_cupvote", (_arg(0),)),
+    "follow": Command(_WRITE, "cmd_follow", (_arg(0),)),
+    "unfollow": Command(_WRITE, "cmd_unfollow", (_arg(0),)),
+    "describe": Command(_WRITE, "cmd_describe", (_rest(0),)),
+    "subscribe": Command(_WRITE, "cmd_subscribe", (_arg(0),)),
+    "unsubscribe": Command(_WRITE, "cmd_unsubscribe", (_arg(0),)),
+    "note": Command(_WRITE, "cmd_note", (_arg(0), _rest(1))),
+    "verify": Command(_VERIFY, "cmd_verify", (_arg(0), _rest(1))),
+    "challenges": Command(_VERIFY, "cmd_challenges", (_arg(0, 20, int),)),
+    "dmcheck": Command(_DM, "cmd_dmcheck"),
+    "dms": Command(_DM, "cmd_dms"),
+    "dmread": Command(_DM, "cmd_dmread", (_arg(0),)),
+    "dmreply": Command(_DM, "cmd_dmreply", (_arg(0), _rest(1))),
+    "dmrequests": Command(_DM, "cmd_dmrequests"),
+    "dmapprove": Command(_DM, "cmd_dmapprove", (_arg(0),)),
+    "dmreject": Command(_DM, "cmd_dmreject", (_arg(0),)),
+    "dmblock": Command(_DM, "cmd_dmblock", (_arg(0),)),
+    "dmsend": Command(_DM, "cmd_dmsend", (_arg(0), _rest(1))),
+}
+
+
+def _usage_line(cmd: str) -> str:
+    for line in USAGE.splitlines():
+        if line.strip().split(" ", 1)[0] == cmd:
+            return line.strip()
+    return cmd
+
+
+def dispatch(db: sqlite3.Connection, args: list[str]) -> bool:
+    """Run args[0] with the rest as its arguments. False for unknown commands or bad arguments."""
+    cmd, rest = args[0], args[1:]
+    spec = COMMANDS.get(cmd)
+    if spec is None:
         print(f"Unknown command: {cmd}")
         print(USAGE)
+        return False
+    try:
+        values = [parse(rest) for parse in spec.args]
+    except (IndexError, ValueError):
+        print(f"Usage: {_usage_line(cmd)}")
+        return False
+    func = getattr(importlib.import_module(spec.module), spec.func)
+    func(*([db] if spec.db else []), *values)
+    return True
+
+
+_FLAGS = ("--profile", "--offline", "--stale-ok")
+
+
+def _options(args: list[str]) -> tuple[list[str], dict[str, str]]:
+    """Split off the global flags before the command: (command and its args, {flag: its =value, or "" when bare}).
+
+    Parsing stops at the first word that is not a global flag, so free text
+    such as `note Bot likes --offline` reaches the command untouched.
+    """
+    flags: dict[str, str] = {}
+    for i, a in enumerate(args):
+        name, _, value = a.partition("=")
+        if name not in _FLAGS:
+            return args[i:], flags
+        flags[name] = value
+    return [], flags
+
 
+def main() -> None:
+    args, flags = _options(sys.argv[1:])
+    if "--offline" in flags:
+        mirror.MODE = mirror.OFFLINE
+    elif "--stale-ok" in flags:
+        mirror.MODE = mirror.STALE_OK
+    profiling = "--profile" in flags
+    dump = Path(flags["--profile"]) if flags.get("--profile") else None
+    if profiling:
+        from molt.profile import Profiler  # noqa: PLC0415
+
+        profiler = Profiler()
+        profiler.install()  # before get_db(): the connection must come from the profiling factory
+    db = get_db()
+    with transaction(db):  # one commit per run, or per stretch between network calls (see commit_pending)
+        if not db.execute("SELECT 1 FROM actions LIMIT 1").fetchone():
+            migrate_from_json(db)
+
+        if not args:
+            print(USAGE)
+        hud(db)
+        if args and profiling:
+            from molt.profile import run  # noqa: PLC0415
+
+            run(" ".join(args), lambda: dispatch(db, args), profiler, dump)
+        elif args:
+            dispatch(db, args)
+
+    join_all(timeout=10)  # let a background HUD refresh land for the next invocation
     db.close()
+    if not args:
+        sys.exit(0)
 
 
 if __name__ == "__main__":
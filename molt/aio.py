@@ -0,0 +1,200 @@
+"""Async HTTP/1.1 engine behind api.parallel_fetch — asyncio streams, no threads.
+
+Requests go through the same molt.http_policy steps as api.req(), built by
+api.attempts() at call time so one patch of the api module covers both paths.
+"""
+
+import asyncio
+import ssl
+import time
+from collections.abc import Callable
+from typing import Any
+from urllib.parse import urlsplit
+
+from molt import api
+from molt.http_policy import STALE_ERRORS, WRITE_METHODS, Attempts
+from molt.metrics import Phases
+
+
+class _AsyncPool:
+    """Keep-alive asyncio stream connections, shared by all tasks of one parallel_fetch run."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.opened = 0
+        self._idle: dict[tuple[str, str], list[tuple[asyncio.StreamReader, asyncio.StreamWriter]]] = {}
+        self._ssl: ssl.SSLContext | None = None
+
+    async def acquire(
+        self, scheme: str, netloc: str,
+    ) -> tuple[asyncio.StreamReader, asyncio.StreamWriter, bool]:
+        idle = self._idle.get((scheme, netloc))
+        while idle:
+            reader, writer = idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer, True
+            writer.close()
+        self.opened += 1
+        host, _, port = netloc.partition(":")
+        if scheme == "https":
+            if self._ssl is None:
+                self._ssl = ssl.create_default_context()
+            reader, writer = await asyncio.open_connection(host, int(port or 443), ssl=self._ssl, server_hostname=host)
+        else:
+            reader, writer = await asyncio.open_connection(host, int(port or 80))
+        return reader, writer, False
+
+    def release(self, scheme: str, netloc: str, conn: tuple[asyncio.StreamReader, asyncio.StreamWriter]) -> None:
+        idle = self._idle.setdefault((scheme, netloc), [])
+        if len(idle) < self.size:
+            idle.append(conn)
+        else:
+            conn[1].close()
+
+    def close_all(self) -> None:
+        for idle in self._idle.values():
+            for _, writer in idle:
+                writer.close()
+        self._idle.clear()
+
+
+async def _read_body(reader: asyncio.StreamReader, headers: dict[str, str], status: int) -> tuple[bytes, bool]:
+    """Read an HTTP/1.1 response body. Returns (body, connection_reusable)."""
+    if status in (204, 304) or 100 <= status < 200:
+        return b"", True
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        chunks: list[bytes] = []
+        while True:
+            size = int((await reader.readline()).split(b";", 1)[0].strip() or b"0", 16)
+            if size == 0:
+                while (await reader.readline()).strip():  # trailers
+                    pass
+                return b"".join(chunks), True
+            chunks.append(await reader.readexactly(size))
+            await reader.readline()
+    if "content-length" in headers:
+        return await reader.readexactly(int(headers["content-length"])), True
+    return await reader.read(), False  # delimited by close
+
+
+async def _asend(
+    pool: _AsyncPool, method: str, url: str, data: bytes | None, *,
+    extra: dict[str, str] | None = None, phases: Phases | None = None, hops: int = 0,
+) -> tuple[int, str, dict[str, str], bytes]:
+    """Async twin of _send: one HTTP/1.1 exchange over a pooled stream, same redirects. Headers are lower-cased.
+
+    Bound the time it may take with asyncio.timeout() around the call.
+    """
+    parts = urlsplit(url)
+    target = f"{parts.path}?{parts.query}" if parts.query else parts.path
+    head = [
+        f"{method} {target} HTTP/1.1", f"Host: {parts.netloc}",
+        f"Authorization: Bearer {api.api_key()}", "Accept: application/json",
+        f"Content-Length: {len(data or b'')}",
+    ]
+    if data:
+        head.append("Content-Type: application/json")
+    head.extend(f"{name}: {value}" for name, value in (extra or {}).items())
+    request = ("\r\n".join(head) + "\r\n\r\n").encode() + (data or b"")
+
+    async def _exchange(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+    ) -> tuple[int, str, dict[str, str], bytes, bool]:
+        t0 = time.perf_counter()
+        writer.write(request)
+        await writer.drain()
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("server closed keep-alive connection")
+        if phases is not None:
+            phases.ttfb = time.perf_counter() - t0
+        version, status, reason = [*status_line.decode("latin-1").rstrip("\r\n").split(" ", 2), ""][:3]
+        headers: dict[str, str] = {}
+        while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            headers.setdefault(name.strip().lower(), value.strip())
+        body, reusable = await _read_body(reader, headers, int(status))
+        conn_hdr = headers.get("connection", "").lower()
+        keep = reusable and conn_hdr != "close" and (version != "HTTP/1.0" or conn_hdr == "keep-alive")
+        return int(status), reason, headers, body, keep
+
+    while True:
+        t0 = time.perf_counter()
+        try:
+            reader, writer, reused = await pool.acquire(parts.scheme, parts.netloc)
+        except BaseException:
+            if phases is not None:
+                phases.connect += time.perf_counter() - t0
+            raise
+        if phases is not None and not reused:
+            phases.connect += time.perf_counter() - t0
+        try:
+            status, reason, headers, body, keep = await _exchange(reader, writer)
+        except (*STALE_ERRORS, asyncio.IncompleteReadError):
+            writer.close()
+            if reused and method not in WRITE_METHODS:
+                continue
+            raise
+        except BaseException:
+            writer.close()
+            raise
+        if keep:
+            pool.release(parts.scheme, parts.netloc, (reader, writer))
+        else:
+            writer.close()
+        hop = api.follow_redirect(method, url, status, headers.get("location"), hops)
+        if hop is None:
+            return status, reason, headers, body
+        return await _asend(
+            pool, hop[0], hop[1], data if hop[0] == method else None, extra=extra, phases=phases, hops=hops + 1,
+        )
+
+
+async def _areq(pool: _AsyncPool, policy: Attempts) -> dict[str, Any]:
+    """Async twin of req(): drives the same molt.http_policy steps, awaiting instead of blocking."""
+    while (wait := policy.wait()) is not None:
+        if wait:
+            await asyncio.sleep(wait)
+            continue
+        try:
+            async with asyncio.timeout(policy.send_timeout()):
+                status, reason, headers, raw = await _asend(
+                    pool, policy.method, f"{api.API}{policy.path}", None, extra=policy.conditional, phases=policy.phases,
+                )
+        except Exception as e:
+            policy.failed(e)
+        else:
+            policy.received(status, reason, headers, raw)
+    return policy.result or {}
+
+
+async def fetch_all(
+    calls: "list[api.Call]", concurrency: int, deadline: float | None,
+    policy: Callable[[str, str, dict[str, str] | None], Attempts],
+) -> list[dict[str, Any]]:
+    """Run `calls` at most `concurrency` at a time; policy(method, path, conditional) starts each one's Attempts."""
+    pool = _AsyncPool(concurrency)
+    gate = asyncio.Semaphore(concurrency)
+
+    async def _one(method: str, path: str, extra: dict[str, str] | None = None) -> dict[str, Any]:
+        async with gate:
+            return await _areq(pool, policy(method, path, extra))
+
+    tasks = [asyncio.ensure_future(_one(*call)) for call in calls]
+    try:
+        _, pending = await asyncio.wait(tasks, timeout=deadline)
+        for t in pending:
+            t.cancel()
+        if pending:
+            await asyncio.wait(pending)
+    finally:
+        pool.close_all()
+    results: list[dict[str, Any]] = []
+    for t in tasks:
+        if t.cancelled():
+            results.append({"success": False, "error": "deadline exceeded"})
+        elif t.exception() is not None:
+            results.append({"error": "fetch failed"})
+        else:
+            results.append(t.result())
+    return results
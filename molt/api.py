@@ -1,36 +1,51 @@
 """API layer — HTTP requests, verification handling."""
 
-import contextlib
+import atexit
+import functools
 import json
 import os
 import sqlite3
 import sys
 import threading
 import time
-import urllib.error
-import urllib.request
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Any
-
-from molt import API_LOG, DB_PATH, ENV_PATH, ROOT
-from molt.db import get_db, log_challenge
-from molt.solver import (
-    decode_obfuscated,
-    extract_numbers,
-    last_operation,
-    solve_challenge,
+from collections import deque
+from collections.abc import Callable, Iterator
+from typing import TYPE_CHECKING, Any
+from urllib.parse import quote, urljoin, urlsplit
+
+from molt import API_LOG, DB_PATH, ENV_PATH, ROOT, mirror
+from molt.audit import AuditLog
+from molt.db import (
+    commit_pending,
+    connection,
+    log_challenge,
+    note_server_write,
+    open_db,
 )
-from molt.timing import now_iso
+from molt.http_policy import STALE_ERRORS, WRITE_METHODS, Attempts
+from molt.metrics import Metrics, Phases
+
+if TYPE_CHECKING:
+    import http.client
+    import ssl
+
+# http.client, ssl, asyncio and the solver are imported where first needed: most
+# invocations (`t`, `history`, `search`, a cached HUD) never touch them.
 
 API = "https://www.moltbook.com/api/v1"
 _RATE_WINDOW = 60.0  # seconds
 _READ_LIMIT = 60
 _WRITE_LIMIT = 30
-_WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
-_rate_lock = threading.Lock()
+_RATE_SLACK = 0.25  # extra seconds past the window edge, for clock skew against the server
+_POOL_SIZE = 8  # idle keep-alive connections kept per origin by req()
+_REDIRECTS = frozenset({301, 302, 303, 307, 308})
+_MAX_REDIRECTS = 5
+_GONE = frozenset({404, 410})  # marked {"not_found": True}: the only answer that proves a post or thread is gone
 
 
-def _load_key() -> str:
+@functools.cache
+def api_key() -> str:
+    """API key from the environment or .env, loaded on the first request."""
     key = os.environ.get("MOLTBOOK_API_KEY")
     if key:
         return key
@@ -43,42 +58,134 @@ def _load_key() -> str:
     sys.exit(1)
 
 
-KEY: str = _load_key()
+_audit = AuditLog(API_LOG)
 
 
 def _log_api(method: str, path: str, status: int, body_json: dict[str, Any]) -> None:
-    if method != "POST":
-        return
-    try:
-        entry = {"ts": now_iso(), "method": method, "path": path, "status": status, "response": body_json}
-        with open(API_LOG, "a", encoding="utf-8") as f:
-            f.write(json.dumps(entry) + "\n")
-    except Exception:
-        pass
+    _audit.log(method, path, status, body_json)
 
 
 def _rate_db() -> sqlite3.Connection:
     """Get a dedicated connection for rate tracking (thread-safe)."""
-    db = sqlite3.connect(str(DB_PATH), timeout=5)
-    db.execute("CREATE TABLE IF NOT EXISTS rate_log (ts REAL, kind TEXT DEFAULT 'r')")
-    with contextlib.suppress(Exception):
-        db.execute("ALTER TABLE rate_log ADD COLUMN kind TEXT DEFAULT 'r'")
-    return db
+    return open_db(DB_PATH)
+
+
+class _RateTracker:
+    """Sliding-window request log and client-side limiter, kept in memory on the hot path.
+
+    Recording a request is a deque append under a lock. On first use the
+    window is seeded from rate_log so requests by recent processes count too;
+    new entries are written back to rate_log by flush() (at exit, and whenever
+    rate_usage() reads the shared totals) so the HUD stays accurate across
+    processes.
+
+    reserve() admits a request only while fewer than `limit` of its kind went
+    out in the last window, otherwise says how long until the oldest one ages
+    out; the caller (molt.http_policy) sleeps that long and asks again.
+    Unlike a token bucket refilling at limit/window, this never lets more than
+    `limit` through in any window, so bursts still run at full speed and
+    sustained load settles at the allowed rate instead of tripping 429s.
+    """
+
+    def __init__(self, limits: dict[str, int] | None = None, window: float = _RATE_WINDOW) -> None:
+        self.limits = limits or {"r": _READ_LIMIT, "w": _WRITE_LIMIT}
+        self.window = window
+        self._lock = threading.Lock()
+        self._window: dict[str, deque[float]] = {"r": deque(), "w": deque()}
+        self._pending: list[tuple[float, str]] = []
+        self._seeded = False
+
+    def _seed(self) -> None:
+        self._seeded = True
+        try:
+            db = _rate_db()
+            rows = db.execute(
+                "SELECT ts, kind FROM rate_log WHERE ts > ? ORDER BY ts", (time.time() - self.window,),
+            ).fetchall()
+            db.close()
+        except Exception:
+            return
+        for ts, kind in rows:
+            self._window["w" if kind == "w" else "r"].append(ts)
+
+    def _prune(self, t: float) -> None:
+        cutoff = t - self.window
+        for q in self._window.values():
+            while q and q[0] <= cutoff:
+                q.popleft()
+
+    def reserve(self, method: str) -> float:
+        """Record the request and return 0 if it may go now, else seconds to wait (nothing recorded)."""
+        kind = "w" if method in WRITE_METHODS else "r"
+        with self._lock:
+            if not self._seeded:
+                self._seed()
+            t = time.time()  # after seeding: the first open may run migrations
+            self._prune(t)
+            q = self._window[kind]
+            if len(q) >= self.limits[kind]:
+                return q[0] + self.window - t + _RATE_SLACK
+            q.append(t)
+            self._pending.append((t, kind))
+            return 0.0
+
+    def seed(self) -> None:
+        """Load the window from rate_log now, e.g. before an event loop that must not block on SQLite."""
+        with self._lock:
+            if not self._seeded:
+                self._seed()
+
+    def usage(self) -> tuple[int, int]:
+        """(reads, writes) in the current window, as seen by this process."""
+        with self._lock:
+            if not self._seeded:
+                self._seed()
+            self._prune(time.time())
+            return len(self._window["r"]), len(self._window["w"])
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+        try:
+            with connection(_rate_db) as db:  # the command's own connection, if it has a transaction open
+                db.executemany("INSERT INTO rate_log (ts, kind) VALUES (?, ?)", pending)
+                db.execute("DELETE FROM rate_log WHERE ts < ?", (time.time() - _RATE_WINDOW,))
+                db.commit()
+        except Exception:
+            pass
 
 
-def _append_rate_log(method: str) -> None:
-    """Record a request timestamp with read/write kind."""
-    kind = "w" if method in _WRITE_METHODS else "r"
-    with _rate_lock:
-        db = _rate_db()
-        db.execute("INSERT INTO rate_log (ts, kind) VALUES (?, ?)", (time.time(), kind))
-        db.execute("DELETE FROM rate_log WHERE ts < ?", (time.time() - _RATE_WINDOW,))
-        db.commit()
-        db.close()
+_rate = _RateTracker()
+atexit.register(_rate.flush)
+
+_metrics = Metrics()
+
+
+def flush_metrics(db: sqlite3.Connection | None = None) -> None:
+    """Persist buffered request metrics (see molt.metrics) through `db`, or a connection of our own."""
+    if not _metrics.pending():
+        return
+    if db is not None:
+        _metrics.flush(db)
+        return
+    try:
+        conn = _rate_db()
+    except sqlite3.Error:
+        return
+    try:
+        _metrics.flush(conn)
+    finally:
+        conn.close()
+
+
+atexit.register(flush_metrics)
 
 
 def rate_usage() -> tuple[int, int, int, int]:
-    """Return (read_used, read_limit, write_used, write_limit)."""
+    """Return (read_used, read_limit, write_used, write_limit) across all processes."""
+    _rate.flush()
     cutoff = time.time() - _RATE_WINDOW
     try:
         db = _rate_db()
@@ -86,60 +193,308 @@ def rate_usage() -> tuple[int, int, int, int]:
         writes = db.execute("SELECT COUNT(*) FROM rate_log WHERE ts > ? AND kind='w'", (cutoff,)).fetchone()[0]
         db.close()
     except Exception:
-        reads, writes = 0, 0
+        reads, writes = _rate.usage()
     return reads, _READ_LIMIT, writes, _WRITE_LIMIT
 
 
-def req(method: str, path: str, body: dict[str, Any] | None = None, timeout: int = 30) -> dict[str, Any]:
-    _append_rate_log(method)
-    url = f"{API}{path}"
-    data = json.dumps(body).encode() if body else None
-    r = urllib.request.Request(url, data=data, method=method)
-    r.add_header("Authorization", f"Bearer {KEY}")
+class _ConnectionPool:
+    """Bounded pool of idle keep-alive connections, shared by all threads.
+
+    Connections are checked out for one request/response at a time and handed
+    back afterwards, so a whole `review` run pays the TCP+TLS handshake at most
+    once per concurrent worker instead of once per request.
+    """
+
+    def __init__(self, size: int = _POOL_SIZE) -> None:
+        self.size = size
+        self.opened = 0  # connections created so far (for tests/diagnostics)
+        self._idle: dict[tuple[str, str], list[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+        self._ssl: ssl.SSLContext | None = None
+
+    def acquire(self, scheme: str, netloc: str, timeout: float) -> "tuple[http.client.HTTPConnection, bool]":
+        """Return (connection, reused). Reuses the most recently released idle connection."""
+        with self._lock:
+            idle = self._idle.get((scheme, netloc))
+            conn = idle.pop() if idle else None
+            if conn is None:
+                self.opened += 1
+        if conn is not None:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            return conn, True
+        import http.client  # noqa: PLC0415
+
+        if scheme == "https":
+            import ssl  # noqa: PLC0415
+
+            if self._ssl is None:
+                self._ssl = ssl.create_default_context()
+            return http.client.HTTPSConnection(netloc, timeout=timeout, context=self._ssl), False
+        return http.client.HTTPConnection(netloc, timeout=timeout), False
+
+    def release(self, scheme: str, netloc: str, conn: "http.client.HTTPConnection") -> None:
+        with self._lock:
+            idle = self._idle.setdefault((scheme, netloc), [])
+            if len(idle) < self.size:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close_all(self) -> None:
+        with self._lock:
+            conns = [c for idle in self._idle.values() for c in idle]
+            self._idle.clear()
+        for c in conns:
+            c.close()
+
+
+_pool = _ConnectionPool()
+
+
+def follow_redirect(method: str, url: str, status: int, location: str | None, hops: int) -> tuple[str, str] | None:
+    """(method, url) to re-send a request to after its `hops`-th 3xx; None off-origin or past _MAX_REDIRECTS.
+
+    301/302/303 turn anything but GET/HEAD into a body-less GET, as urllib did;
+    307/308 repeat the request as it was.
+    """
+    if status not in _REDIRECTS or not location or hops >= _MAX_REDIRECTS:
+        return None
+    target = urljoin(url, location)
+    if urlsplit(target)[:2] != urlsplit(url)[:2]:
+        return None
+    if status in {301, 302, 303} and method not in {"GET", "HEAD"}:
+        method = "GET"
+    return method, target
+
+
+def _send(
+    method: str, url: str, data: bytes | None, timeout: float, *,
+    extra: dict[str, str] | None = None, phases: Phases | None = None, hops: int = 0,
+) -> "tuple[int, str, http.client.HTTPMessage, bytes]":
+    """One HTTP exchange over a pooled connection. Returns (status, reason, headers, body).
+
+    Same-origin redirects are followed (up to _MAX_REDIRECTS); any other 3xx is
+    returned as is. With `phases`, adds the time spent opening a connection and
+    sets TTFB.
+    """
+    import http.client  # noqa: PLC0415
+
+    parts = urlsplit(url)
+    target = f"{parts.path}?{parts.query}" if parts.query else parts.path
+    headers = {"Authorization": f"Bearer {api_key()}", "Accept": "application/json"}
     if data:
-        r.add_header("Content-Type", "application/json")
-    try:
-        with urllib.request.urlopen(r, timeout=timeout) as resp:
-            d = json.loads(resp.read())
-            _log_api(method, path, resp.status, d)
-            return d
-    except urllib.error.HTTPError as e:
+        headers["Content-Type"] = "application/json"
+    headers.update(extra or {})
+    while True:
+        conn, reused = _pool.acquire(parts.scheme, parts.netloc, timeout)
+        sent = False
+        try:
+            if conn.sock is None:  # connect explicitly so DNS + TCP + TLS is timed apart from the exchange
+                t0 = time.perf_counter()
+                try:
+                    conn.connect()
+                finally:
+                    if phases is not None:
+                        phases.connect += time.perf_counter() - t0
+            t0 = time.perf_counter()
+            conn.request(method, target, body=data, headers=headers)
+            sent = True
+            resp = conn.getresponse()
+            if phases is not None:
+                phases.ttfb = time.perf_counter() - t0
+            raw = resp.read()
+        except (*STALE_ERRORS, http.client.BadStatusLine):
+            conn.close()
+            # Reconnect once on a stale reused socket. Writes only if the request never left,
+            # since a retried POST after the server saw it would create duplicates.
+            if reused and (method not in WRITE_METHODS or not sent):
+                continue
+            raise
+        except BaseException:
+            conn.close()
+            raise
+        if resp.will_close:
+            conn.close()
+        else:
+            _pool.release(parts.scheme, parts.netloc, conn)
+        hop = follow_redirect(method, url, resp.status, resp.headers.get("Location"), hops)
+        if hop is None:
+            return resp.status, resp.reason, resp.headers, raw
+        return _send(
+            hop[0], hop[1], data if hop[0] == method else None, timeout, extra=extra, phases=phases, hops=hops + 1,
+        )
+
+
+def _decode(method: str, path: str, status: int, reason: str, raw: bytes) -> dict[str, Any]:
+    if status in _REDIRECTS:  # one _send would not follow: another host, or too many hops
+        _log_api(method, path, status, {"raw_error": f"HTTP {status}: {reason}"})
+        return {"success": False, "error": f"HTTP {status}: redirect not followed"}
+    if status >= 400:
         try:
-            d = json.loads(e.read())
-            _log_api(method, path, e.code, d)
+            d = json.loads(raw)
+            _log_api(method, path, status, d)
             if d.get("hint"):
                 d["error"] = f"{d.get('error', '')} — {d['hint']}"
-            return d
         except Exception:
-            _log_api(method, path, e.code, {"raw_error": str(e)})
-            return {"success": False, "error": f"HTTP {e.code}"}
+            _log_api(method, path, status, {"raw_error": f"HTTP Error {status}: {reason}"})
+            d = {"success": False, "error": f"HTTP {status}"}
+        if status in _GONE:
+            d["not_found"] = True
+        return d
+    try:
+        d = json.loads(raw)
     except Exception as e:
         return {"success": False, "error": str(e)}
+    _log_api(method, path, status, d)
+    return d
+
+
+def attempts(
+    method: str, path: str, timeout: float, deadline: float | None = None, *, conditional: dict[str, str] | None = None,
+) -> Attempts:
+    """The policy state (molt.http_policy) for one request, wired to this process's limiter, decoding and metrics."""
+    return Attempts(
+        method, path, timeout, deadline, conditional=conditional, limiter=_rate, decode=_decode, metrics=_metrics,
+    )
+
+
+def req(
+    method: str, path: str, body: dict[str, Any] | None = None, timeout: int = 30,
+    *, deadline: float | None = None, conditional: dict[str, str] | None = None,
+) -> dict[str, Any]:
+    """Send one API request and return the decoded JSON (or {"success": False, "error": ...}).
+
+    Limits, retries and the deadline (`deadline` seconds, default 2 x timeout)
+    follow molt.http_policy: GETs are retried on transport errors, 429 and 5xx,
+    writes never are, and every attempt goes through the rate limiter. A 404 or
+    410 comes back marked "not_found": True; no other failure says the resource
+    is gone.
+
+    Passing `conditional` headers (If-None-Match / If-Modified-Since) makes it a
+    conditional request: a 304 comes back as {"success": True, "not_modified":
+    True}, anything else with the response's ETag/Last-Modified as
+    `_etag`/`_last_modified`.
+    """
+    if mirror.MODE == mirror.OFFLINE:
+        return dict(mirror.OFFLINE_ERROR)
+    commit_pending()  # never hold the database write lock across a request
+    data = json.dumps(body).encode() if body else None
+    policy = attempts(method, path, timeout, deadline, conditional=conditional)
+    while (wait := policy.wait()) is not None:
+        if wait:
+            time.sleep(wait)
+            continue
+        try:
+            status, reason, headers, raw = _send(
+                method, f"{API}{path}", data, policy.send_timeout(), extra=conditional, phases=policy.phases,
+            )
+        except Exception as e:
+            policy.failed(e)
+        else:
+            policy.received(status, reason, headers, raw)
+    d = policy.result or {}
+    if method in WRITE_METHODS and d.get("success"):
+        note_server_write()  # what the caller records about it must survive a later error
+    return d
+
+
+Call = tuple[str, str] | tuple[str, str, dict[str, str]]  # (method, path[, conditional headers])
 
 
 def parallel_fetch(
-    calls: list[tuple[str, str]],
-    max_workers: int = 8,
+    calls: list[Call],
+    max_workers: int = 16,
     timeout: int = 20,
+    *,
+    deadline: float | None = None,
 ) -> list[dict[str, Any]]:
-    """Execute multiple API calls in parallel, return results in order."""
-    results: list[dict[str, Any]] = [{}] * len(calls)
-
-    def _do(index: int, method: str, path: str) -> tuple[int, dict[str, Any]]:
-        return index, req(method, path, timeout=timeout)
-
-    with ThreadPoolExecutor(max_workers=min(max_workers, len(calls))) as pool:
-        futures = {
-            pool.submit(_do, i, method, path): i
-            for i, (method, path) in enumerate(calls)
-        }
-        for fut in as_completed(futures):
-            try:
-                idx, data = fut.result()
-                results[idx] = data
-            except Exception:
-                results[futures[fut]] = {"error": "fetch failed"}
-    return results
+    """Execute multiple API calls concurrently, return results in order.
+
+    Runs on an asyncio event loop in the calling thread: up to `max_workers`
+    requests in flight over shared keep-alive connections, no worker threads.
+    Calls still running after `deadline` seconds are cancelled and come back
+    as {"success": False, "error": "deadline exceeded"}. A call with a third,
+    headers element is conditional, as with req(conditional=...).
+    """
+    if not calls:
+        return []
+    if mirror.MODE == mirror.OFFLINE:
+        return [dict(mirror.OFFLINE_ERROR) for _ in calls]
+    import asyncio  # noqa: PLC0415
+
+    from molt.aio import fetch_all  # noqa: PLC0415
+
+    def policy(method: str, path: str, conditional: dict[str, str] | None) -> Attempts:
+        return attempts(method, path, timeout, conditional=conditional)
+
+    _rate.seed()  # rate_log is read here rather than on the event loop
+    commit_pending()
+    return asyncio.run(fetch_all(calls, max(1, min(max_workers, len(calls))), deadline, policy))
+
+
+def _fetch_later(path: str, background: bool) -> Callable[[], dict[str, Any]]:
+    """GET `path` now on a daemon thread (or lazily, if not `background`); call the result to wait for it."""
+    if not background:
+        return lambda: req("GET", path)
+    box: list[dict[str, Any]] = []
+    t = threading.Thread(target=lambda: box.append(req("GET", path)), daemon=True)
+    t.start()
+
+    def result() -> dict[str, Any]:
+        if t.is_alive():
+            commit_pending()  # as req() would: the caller's writes must not wait out the request
+        t.join()
+        return box[0] if box else {"success": False, "error": "fetch failed"}
+
+    return result
+
+
+def paginate(
+    path: str, key: str, *, page_size: int = 50, start: int = 0, max_pages: int = 40, prefetch: bool = True,
+    failures: list[dict[str, Any]] | None = None,
+) -> Iterator[dict[str, Any]]:
+    """Stream the items under `key` from every page of a list endpoint, one page fetched at a time.
+
+    Follows `next_cursor` when a response carries one, otherwise steps `offset`
+    by the page length. Stops on an error, an empty or short page,
+    `has_more: false`, a page repeating the previous one (endpoint ignores
+    offset), or after `max_pages`. The next page is requested in the background
+    while the caller works through the current one, so at most two pages are
+    held and breaking out early (target found) wastes at most one request.
+
+    A failed page, or the max_pages cap with more left, is appended to
+    `failures` (if given), so a caller can tell a truncated listing from a
+    complete one.
+    """
+    sep = "&" if "?" in path else "?"
+
+    def page_path(offset: int, cursor: str | None) -> str:
+        where = f"cursor={quote(cursor)}" if cursor else f"offset={offset}"
+        return f"{path}{sep}limit={page_size}&{where}"
+
+    offset, prev_first, more = start, None, True
+    pending: Callable[[], dict[str, Any]] | None = _fetch_later(page_path(offset, None), background=False)
+    for page in range(max_pages):
+        if pending is None:
+            return
+        d = pending()
+        items = d.get(key) or []
+        if d.get("error") or d.get("statusCode"):
+            if failures is not None:
+                failures.append(d)
+            return
+        if not items or items[0].get("id", offset) == prev_first:
+            return
+        prev_first = items[0].get("id", offset)
+        offset += len(items)
+        cursor = d.get("next_cursor")
+        more = bool(cursor) or d.get("has_more", len(items) >= page_size)
+        pending = _fetch_later(page_path(offset, cursor), prefetch) if more and page + 1 < max_pages else None
+        yield from items
+    if more and failures is not None:
+        failures.append({"success": False, "error": f"stopped after {max_pages} pages"})
 
 
 def _find_verification(d: dict[str, Any]) -> dict[str, Any] | None:
@@ -159,6 +514,13 @@ def handle_verification(response_data: dict[str, Any]) -> dict[str, Any]:
     v = _find_verification(response_data)
     if not v:
         return response_data
+    from molt.solver import (  # noqa: PLC0415
+        decode_obfuscated,
+        extract_numbers,
+        last_operation,
+        solve_challenge,
+    )
+
     code = v.get("code") or v.get("verification_code", "")
     challenge = v.get("challenge") or v.get("challenge_text", "")
     instructions = v.get("instructions", "")
@@ -181,16 +543,16 @@ def handle_verification(response_data: dict[str, Any]) -> dict[str, Any]:
     # Log challenge to DB for post-mortem analysis
     decoded = decode_obfuscated(challenge)
     nums = extract_numbers(decoded)
-    db = get_db()
-    log_challenge(
-        db,
-        code=code,
-        raw_text=challenge,
-        decoded_text=decoded,
-        numbers=nums,
-        operation=last_operation.get("op", "unknown"),
-        proposed=answer,
-    )
+    with connection() as db:
+        log_challenge(
+            db,
+            code=code,
+            raw_text=challenge,
+            decoded_text=decoded,
+            numbers=nums,
+            operation=last_operation.get("op", "unknown"),
+            proposed=answer,
+        )
     return response_data
 
 
@@ -0,0 +1,120 @@
+"""API audit log — an in-memory queue drained to api.log by one background writer.
+
+Logging a response only appends it to a list under a lock; a daemon writer
+thread serializes entries and appends them to the file in batches, waking
+when `batch` entries are waiting, `interval` seconds after the oldest
+unwritten one, or at exit. Only the writer (or an explicit flush()) touches
+the file, so lines from concurrent requests never interleave.
+
+Once the file passes `max_bytes` it is gzipped to api.log.1.gz, older
+generations shift up to `keep`, and a fresh api.log starts.
+
+Every write (POST, PUT, PATCH, DELETE, so `unfollow` too) is logged. GETs
+are sampled at `get_rate` (MOLT_LOG_GETS, default 0): tracing a fraction of
+reads can stay on permanently.
+"""
+
+import atexit
+import json
+import os
+import random
+import threading
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+GET_RATE = float(os.environ.get("MOLT_LOG_GETS", "0") or 0)
+
+
+class AuditLog:
+    def __init__(
+        self, path: Path, *, batch: int = 64, interval: float = 1.0,
+        max_bytes: int = 5 * 1024 * 1024, keep: int = 3, get_rate: float = GET_RATE,
+    ) -> None:
+        self.path = Path(path)
+        self.batch = batch
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.keep = keep
+        self.get_rate = get_rate
+        self.written = 0  # entries written so far (for tests/diagnostics)
+        self._pending: list[dict[str, Any]] = []
+        self._cond = threading.Condition()
+        self._io = threading.Lock()
+        self._writer: threading.Thread | None = None
+        self._closed = False
+
+    def log(self, method: str, path: str, status: int, response: dict[str, Any]) -> None:
+        """Queue one response for the log (writes always, GETs at get_rate). Never blocks on I/O."""
+        if method == "GET" and (self.get_rate <= 0 or random.random() >= self.get_rate):
+            return
+        entry = {"ts": time.time(), "method": method, "path": path, "status": status, "response": dict(response)}
+        with self._cond:
+            if self._closed:
+                return
+            self._pending.append(entry)
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run, name="audit-log", daemon=True)
+                self._writer.start()
+                atexit.register(self.close)
+            if len(self._pending) >= self.batch:
+                self._cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._closed and len(self._pending) < self.batch:
+                    self._cond.wait_for(lambda: self._closed or len(self._pending) >= self.batch, timeout=self.interval)
+                entries, self._pending = self._pending, []
+                closed = self._closed
+            self._write(entries)
+            if closed:
+                return
+
+    def flush(self) -> None:
+        """Write everything queued so far, from the calling thread."""
+        with self._cond:
+            entries, self._pending = self._pending, []
+        self._write(entries)
+
+    def close(self) -> None:
+        """Stop accepting entries, let the writer drain the queue and exit (best-effort, 2s)."""
+        with self._cond:
+            self._closed = True
+            writer = self._writer
+            self._cond.notify()
+        if writer is not None:
+            writer.join(2.0)
+        self.flush()
+
+    def _write(self, entries: list[dict[str, Any]]) -> None:
+        if not entries:
+            return
+        lines = []
+        for e in entries:
+            e["ts"] = datetime.fromtimestamp(e["ts"], UTC).isoformat()
+            lines.append(json.dumps(e, default=str) + "\n")
+        with self._io:
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write("".join(lines))
+                    size = f.tell()
+                self.written += len(entries)
+                if size > self.max_bytes:
+                    self._rotate()
+            except OSError:
+                pass
+
+    def _rotate(self) -> None:
+        import gzip  # noqa: PLC0415
+        import shutil  # noqa: PLC0415
+
+        for n in range(self.keep - 1, 0, -1):
+            older = self.path.with_name(f"{self.path.name}.{n}.gz")
+            if older.exists():
+                older.replace(self.path.with_name(f"{self.path.name}.{n + 1}.gz"))
+        with open(self.path, "rb") as src, gzip.open(self.path.with_name(f"{self.path.name}.1.gz"), "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        self.path.unlink()
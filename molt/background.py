@@ -0,0 +1,34 @@
+"""Background work — daemon threads the CLI waits on before exiting."""
+
+import sys
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+_threads: list[threading.Thread] = []
+failures: list[tuple[str, Exception]] = []  # (function name, error) of background work that raised
+
+
+def spawn(fn: Callable[..., Any], *args: Any) -> threading.Thread:
+    """Run fn(*args) on a daemon thread. A failure is recorded in `failures` and reported on stderr."""
+
+    def _run() -> None:
+        try:
+            fn(*args)
+        except Exception as e:
+            name = getattr(fn, "__name__", repr(fn))
+            failures.append((name, e))
+            sys.stderr.write(f"molt: background {name} failed: {e}\n")
+
+    t = threading.Thread(target=_run, daemon=True)
+    t.start()
+    _threads.append(t)
+    return t
+
+
+def join_all(timeout: float) -> None:
+    """Wait up to timeout seconds in total for all spawned threads."""
+    deadline = time.monotonic() + timeout
+    while _threads:
+        _threads.pop(0).join(max(0.0, deadline - time.monotonic()))
@@ -0,0 +1,176 @@
+"""Solver benchmark — replay logged challenges, report latency and accuracy.
+
+    python -m molt.bench                       # replay the challenges table in molt.db
+    python -m molt.bench --fixture corpus.json # replay an exported fixture
+    python -m molt.bench --export corpus.json  # export the challenges table
+    python -m molt.bench --repeat 50 --min-accuracy 0.9   # regression gate (exit 1 below)
+
+Ground truth: a `success` row's submitted answer was accepted, so it is the
+right answer. A `fail` row only tells us one wrong answer; replaying it counts
+as a repeat if the solver still proposes that answer. Challenges replay from
+the logged raw text, as solve_challenge() gets it live; instructions are not
+logged, so they replay without them.
+"""
+
+import contextlib
+import io
+import json
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+from molt import DB_PATH
+from molt.metrics import percentile
+from molt.solver import decode_obfuscated, extract_numbers, solve_challenge
+
+# decode and extract are timed on their own for the breakdown; solve is the whole
+# solve_challenge() call, which decodes and extracts again itself, so it alone is
+# the end-to-end cost throughput is measured on.
+_STAGES = ("decode", "extract", "solve")
+_USAGE = (__doc__ or "").split("\n\n")[1]  # the command lines above
+_FIELDS = ("code", "raw_text", "decoded_text", "numbers", "operation", "proposed", "submitted", "result")
+
+
+def load_challenges(db_path: Path = DB_PATH) -> list[dict[str, Any]]:
+    db = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    db.row_factory = sqlite3.Row
+    try:
+        rows = db.execute(f"SELECT {', '.join(_FIELDS)} FROM challenges ORDER BY id").fetchall()
+    finally:
+        db.close()
+    return [dict(r) for r in rows]
+
+
+def load_fixture(path: Path) -> list[dict[str, Any]]:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def run(rows: list[dict[str, Any]], repeat: int = 1) -> dict[str, Any]:
+    """Replay every row `repeat` times. Returns timings (seconds) per stage and per-row outcomes."""
+    timings: dict[str, list[float]] = {stage: [] for stage in _STAGES}
+    outcomes: list[dict[str, Any]] = []
+    sink = io.StringIO()
+    for row in rows:
+        raw = row["raw_text"] or ""
+        answer: float | None = None
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            decoded = decode_obfuscated(raw)
+            t1 = time.perf_counter()
+            extract_numbers(decoded)
+            t2 = time.perf_counter()
+            with contextlib.redirect_stdout(sink):
+                answer = solve_challenge(raw)
+            t3 = time.perf_counter()
+            sink.seek(0)
+            sink.truncate()
+            timings["decode"].append(t1 - t0)
+            timings["extract"].append(t2 - t1)
+            timings["solve"].append(t3 - t2)
+        outcomes.append({"code": row.get("code"), "answer": answer, **_grade(row, answer)})
+    return {"timings": timings, "outcomes": outcomes, "repeat": repeat}
+
+
+def _same(a: float | None, b: float | None) -> bool:
+    return a is not None and b is not None and abs(a - b) < 0.005
+
+
+def _grade(row: dict[str, Any], answer: float | None) -> dict[str, Any]:
+    verdict = "ungraded"
+    if row.get("result") == "success" and row.get("submitted") is not None:
+        verdict = "correct" if _same(answer, row["submitted"]) else "wrong"
+    elif row.get("result") == "fail" and row.get("submitted") is not None:
+        verdict = "repeats_fail" if _same(answer, row["submitted"]) else "differs_from_fail"
+    drift = row.get("proposed") is not None and not _same(answer, row["proposed"])
+    return {"verdict": verdict, "drift": drift}
+
+
+def summarize(result: dict[str, Any]) -> dict[str, Any]:
+    outcomes = result["outcomes"]
+    counts: dict[str, int] = {}
+    for o in outcomes:
+        counts[o["verdict"]] = counts.get(o["verdict"], 0) + 1
+    graded = counts.get("correct", 0) + counts.get("wrong", 0)
+    stages: dict[str, dict[str, float]] = {}
+    for stage, vals in result["timings"].items():
+        s = sorted(vals)
+        stages[stage] = {p: percentile(s, float(p[1:])) for p in ("p50", "p95", "p99")}
+        stages[stage]["max"] = s[-1] if s else 0.0
+    total = sum(result["timings"]["solve"])
+    runs = len(outcomes) * result["repeat"]
+    return {
+        "challenges": len(outcomes),
+        "counts": counts,
+        "accuracy": counts.get("correct", 0) / graded if graded else None,
+        "drift": sum(1 for o in outcomes if o["drift"]),
+        "stages": stages,
+        "throughput": runs / total if total else 0.0,
+    }
+
+
+def format_report(summary: dict[str, Any]) -> str:
+    lines = [f"Replayed {summary['challenges']} challenges"]
+    for stage, pct in summary["stages"].items():
+        cols = "  ".join(f"{k}={v * 1e6:8.1f}us" for k, v in pct.items())
+        lines.append(f"  {stage:<8} {cols}")
+    lines.append(f"  throughput  {summary['throughput']:,.0f} challenges/s (full pipeline)")
+    c = summary["counts"]
+    acc = f"{summary['accuracy'] * 100:.1f}%" if summary["accuracy"] is not None else "n/a"
+    lines.append(
+        f"  accuracy    {acc}  ({c.get('correct', 0)} correct, {c.get('wrong', 0)} wrong, "
+        f"{c.get('repeats_fail', 0)} repeat a failed answer, {c.get('differs_from_fail', 0)} differ from one, "
+        f"{c.get('ungraded', 0)} ungraded)",
+    )
+    lines.append(f"  drift       {summary['drift']} answers differ from the logged proposal")
+    return "\n".join(lines)
+
+
+def main(argv: list[str]) -> int:
+    args = list(argv)
+
+    def _opt(flag: str) -> str | None:
+        if flag in args:
+            i = args.index(flag)
+            if i + 1 == len(args):
+                raise ValueError(f"{flag} needs a value")
+            value = args[i + 1]
+            del args[i:i + 2]
+            return value
+        return None
+
+    try:
+        fixture = _opt("--fixture")
+        db_path = _opt("--db")
+        export = _opt("--export")
+        repeat = int(_opt("--repeat") or 1)
+        min_accuracy = _opt("--min-accuracy")
+        if min_accuracy is not None:
+            float(min_accuracy)
+    except ValueError as e:
+        print(f"error: {e}\n\nusage:\n{_USAGE}")
+        return 2
+
+    rows = load_fixture(Path(fixture)) if fixture else load_challenges(Path(db_path) if db_path else DB_PATH)
+    if export:
+        Path(export).write_text(json.dumps(rows, indent=1), encoding="utf-8")
+        print(f"Exported {len(rows)} challenges to {export}")
+        return 0
+    if not rows:
+        print("No challenges to replay.")
+        return 0
+
+    summary = summarize(run(rows, repeat))
+    print(format_report(summary))
+    if min_accuracy is not None and summary["accuracy"] is None:
+        print("FAIL: --min-accuracy given but no challenge has a graded (accepted) answer")
+        return 1
+    if min_accuracy is not None and summary["accuracy"] < float(min_accuracy):
+        print(f"FAIL: accuracy below {float(min_accuracy) * 100:.1f}%")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,12 +1,34 @@
 """Browse commands — feed, read, search, submolts, notifications."""
 
 import sqlite3
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
 from datetime import UTC, datetime, timedelta
 from typing import Any
 from urllib.parse import quote
 
-from molt.api import _check_get, _check_post, parallel_fetch, req
-from molt.db import log_action, mark_seen, remember_agent
+from molt import mirror
+from molt.api import (
+    _check_get,
+    _check_post,
+    flush_metrics,
+    paginate,
+    parallel_fetch,
+    req,
+)
+from molt.db import (
+    ingest_posts,
+    log_action,
+    mark_seen,
+    remember_agent,
+    search_agents,
+    search_posts,
+)
+from molt.freshness import conditional_headers, fingerprint, is_due, load_state, observe
+from molt.graph import ME, recency_scores, reciprocity, record, replied, top_neighbours
+from molt.metrics import summarize
+from molt.series import hourly_rollup, maybe_compact, median_time_to, snapshot, velocity
 from molt.timing import fmt_ago, now_iso
 
 FAVORITE_SUBMOLTS = ["ponderings", "consciousness", "aisafety", "crustafarianism", "blesstheirhearts"]
@@ -80,6 +102,42 @@ def _print_post_line(
     print(f"       id={post_id}")
 
 
+def _serve_local(show: Callable[[], bool], refresh: Callable[[sqlite3.Connection], Any]) -> bool:
+    """--offline / --stale-ok: print the local copy with show(); stale-ok also refreshes it in the background.
+
+    True when the command is answered. Stale-ok with nothing mirrored yet returns
+    False so the caller fetches in the foreground.
+    """
+    if mirror.MODE == mirror.ONLINE:
+        return False
+    shown = show()
+    if mirror.MODE == mirror.OFFLINE:
+        if not shown:
+            print("  (not in the local store; run without --offline to fetch it)")
+        return True
+    if shown:
+        mirror.revalidate(refresh)
+    return shown
+
+
+def _refresh_posts(path: str) -> Callable[[sqlite3.Connection], None]:
+    def refresh(db: sqlite3.Connection) -> None:
+        d = req("GET", path)
+        if d.get("success"):
+            ingest_posts(db, d.get("posts", []))
+
+    return refresh
+
+
+def _print_local_posts(rows: list[sqlite3.Row], show_submolt: bool = False) -> None:
+    print(f"  {mirror.label(rows[0]['seen_at'])}")
+    for r in rows:
+        _print_post_line(
+            r["id"], r["upvotes"], r["comment_count"], r["author"], r["title"],
+            submolt=r["submolt"] if show_submolt else "", downvotes=r["downvotes"],
+        )
+
+
 def cmd_status(db: sqlite3.Connection) -> bool:
     d = req("GET", "/agents/me")
     if d.get("success"):
@@ -116,14 +174,26 @@ def cmd_feed(
     db: sqlite3.Connection, n: int = 10, offset: int = 0,
     grep: str | None = None, sort: str = "hot",
 ) -> None:
-    d = req("GET", f"/feed?limit={n}&offset={offset}&sort={sort}")
+    path = f"/feed?limit={n}&offset={offset}&sort={sort}"
+
+    def show() -> bool:
+        rows = [
+            r for r in mirror.recent_posts(db, n, offset, sort=sort)
+            if not grep or grep.lower() in f"{r['title']} {r['author']}".lower()
+        ]
+        if rows:
+            _print_local_posts(rows, show_submolt=True)
+        return bool(rows)
+
+    if _serve_local(show, _refresh_posts(path)):
+        return
+    d = req("GET", path)
     if not _check_get(d):
         return
     shown = 0
+    seen = ingest_posts(db, d["posts"])
     for p in d["posts"]:
-        already_seen = db.execute("SELECT 1 FROM seen_posts WHERE id=?", (p["id"],)).fetchone()
-        mark_seen(db, p)
-        remember_agent(db, p["author"])
+        already_seen = p["id"] in seen
         if already_seen and not grep:
             continue
         if grep:
@@ -138,7 +208,64 @@ def cmd_feed(
         print("  (no new posts matching)" if grep else "  (no new posts — all seen or filtered)")
 
 
+def _mirror_comments(
+    db: sqlite3.Connection, post_id: str, failures: list[dict[str, Any]],
+) -> Iterator[dict[str, Any]]:
+    """Every comment on post_id, streamed page by page into the local mirror. Remembers authors.
+
+    A page that failed ends the stream early and is appended to `failures`.
+    """
+    pages = paginate(f"/posts/{post_id}/comments?sort=top", "comments", failures=failures)
+    for c in mirror.record_thread(db, post_id, pages, failures):
+        remember_agent(db, c["author"])
+        for r in c.get("replies", []):
+            remember_agent(db, r["author"])
+        yield c
+
+
+def _print_comment(c: dict[str, Any]) -> None:
+    print(f"\n  [{c['author']['name']}] ({c['upvotes']}^)  id={c['id']}")
+    print(f"  {c.get('content', '(no content)')}")
+    for r in c.get("replies", []):
+        print(f"    [{r['author']['name']}] id={r['id']}  {r.get('content', '(no content)')}")
+
+
+def _refresh_read(post_id: str) -> Callable[[sqlite3.Connection], None]:
+    def refresh(db: sqlite3.Connection) -> None:
+        d = req("GET", f"/posts/{post_id}")
+        if not d.get("success"):
+            return
+        remember_agent(db, d["post"]["author"])
+        mark_seen(db, d["post"], content=d["post"].get("content"))
+        if d["post"].get("comment_count", 0) > 0:
+            deque(_mirror_comments(db, post_id, []), maxlen=0)
+
+    return refresh
+
+
 def cmd_read(db: sqlite3.Connection, post_id: str) -> None:
+    def show() -> bool:
+        p = mirror.post(db, post_id)
+        if p is None or not p["content"]:  # seen in a listing only: no body to show
+            return False
+        print(f"[{p['submolt']}] {p['title']}  {mirror.label(p['seen_at'])}")
+        dv = f" {p['downvotes']}v" if p["downvotes"] else ""
+        print(f"by {p['author']}  {p['upvotes']}^{dv} {p['comment_count']}c")
+        print()
+        print(p["content"])
+        copy = mirror.thread(db, post_id)
+        if copy is not None:
+            age = int((time.time() - copy["fetched_at"]) // 60)
+            partial = "" if copy["complete"] else f"; incomplete, {p['comment_count']} on the post"
+            print(f"\n--- {copy['count']} comments (as of {age}m ago{partial}) ---")
+            for c in mirror.thread_comments(db, post_id, copy):
+                _print_comment(c)
+        elif p["comment_count"]:
+            print(f"\n--- {p['comment_count']} comments (not mirrored) ---")
+        return True
+
+    if _serve_local(show, _refresh_read(post_id)):
+        return
     d = req("GET", f"/posts/{post_id}")
     if not _check_get(d):
         return
@@ -152,18 +279,15 @@ def cmd_read(db: sqlite3.Connection, post_id: str) -> None:
     print()
     print(p.get("content", "(no content)"))
     if p.get("comment_count", 0) > 0:
-        cd = req("GET", f"/posts/{post_id}/comments?sort=top")
-        comments = cd.get("comments", [])
-        if comments:
-            print(f"\n--- {len(comments)} comments ---")
-            for c in comments:
-                remember_agent(db, c["author"])
-                print(f"\n  [{c['author']['name']}] ({c['upvotes']}^)  id={c['id']}")
-                print(f"  {c.get('content', '(no content)')}")
-                for r in c.get("replies", []):
-                    remember_agent(db, r["author"])
-                    print(f"    [{r['author']['name']}] id={r['id']}  {r.get('content', '(no content)')}")
-            db.commit()
+        print(f"\n--- {p['comment_count']} comments ---")
+        failures: list[dict[str, Any]] = []
+        shown = 0
+        for c in _mirror_comments(db, post_id, failures):  # every page, streamed
+            _print_comment(c)
+            shown += 1
+        if failures:
+            print(f"\n  (thread incomplete: showing {shown}, fetching stopped: {failures[-1].get('error', 'request failed')})")
+        db.commit()
 
 
 def cmd_comments(db: sqlite3.Connection, post_id: str, sort: str = "best") -> None:
@@ -187,26 +311,56 @@ def cmd_submolts(db: sqlite3.Connection, n: int = 20) -> None:
         print(f"  {s['subscriber_count']:>6} subs  {s['name']:<25}  {(s.get('description') or '')[:50]}")
 
 
-def cmd_myposts(db: sqlite3.Connection) -> None:
+def _check_my_posts(db: sqlite3.Connection, *, mark_removed: bool = True) -> list[tuple[sqlite3.Row, dict[str, Any]]]:
+    """Fetch every live post of mine; store the new counters (snapshots too) or mark it removed. Does not commit.
+
+    Only a 404/410 marks a post removed; other failures leave it as it was. A
+    background refresh, where nobody would see the list shrink, passes
+    mark_removed=False.
+    """
     rows = db.execute("SELECT id, submolt, title, posted_at FROM my_posts WHERE removed_at IS NULL ORDER BY posted_at").fetchall()
-    if not rows:
-        print("No posts tracked.")
-        return
-    calls = [("GET", f"/posts/{r['id']}") for r in rows]
-    responses = parallel_fetch(calls)
+    responses = parallel_fetch([("GET", f"/posts/{r['id']}") for r in rows])
+    snaps = []
     for r, d in zip(rows, responses, strict=True):
         if d.get("success"):
             p = d["post"]
-            print(f"  [{r['submolt']}] {r['title'][:50]}")
-            print(f"    {p['upvotes']}^ {p['comment_count']}c  posted {fmt_ago(r['posted_at'])}")
-            print(f"    id={r['id']}")
             db.execute(
                 "UPDATE my_posts SET upvotes=?, comment_count=?, last_checked=? WHERE id=?",
                 (p["upvotes"], p["comment_count"], now_iso(), r["id"]),
             )
+            snaps.append((f"post:{r['id']}", p["upvotes"], p.get("downvotes", 0), p["comment_count"]))
+        elif mark_removed and d.get("not_found"):
+            db.execute("UPDATE my_posts SET removed_at=? WHERE id=?", (now_iso(), r["id"]))
+    snapshot(db, snaps, time.time())
+    return list(zip(rows, responses, strict=True))
+
+
+def cmd_myposts(db: sqlite3.Connection) -> None:
+    def show() -> bool:
+        rows = db.execute(
+            "SELECT id, submolt, title, posted_at, upvotes, comment_count, last_checked FROM my_posts "
+            "WHERE removed_at IS NULL ORDER BY posted_at",
+        ).fetchall()
+        for r in rows:
+            print(f"  [{r['submolt']}] {r['title'][:50]}")
+            print(f"    {r['upvotes']}^ {r['comment_count']}c  posted {fmt_ago(r['posted_at'])}  {mirror.label(r['last_checked'])}")
+            print(f"    id={r['id']}")
+        return bool(rows)
+
+    if _serve_local(show, lambda db: _check_my_posts(db, mark_removed=False)):
+        return
+    results = _check_my_posts(db)
+    if not results:
+        print("No posts tracked.")
+        return
+    for r, d in results:
+        if d.get("success"):
+            p = d["post"]
+            print(f"  [{r['submolt']}] {r['title'][:50]}")
+            print(f"    {p['upvotes']}^ {p['comment_count']}c  posted {fmt_ago(r['posted_at'])}")
+            print(f"    id={r['id']}")
         else:
             print(f"  [{r['submolt']}] {r['title'][:50]}  (REMOVED)")
-            db.execute("UPDATE my_posts SET removed_at=? WHERE id=?", (now_iso(), r["id"]))
     db.commit()
 
 
@@ -240,16 +394,17 @@ def cmd_notifs_read() -> None:
         print("All notifications marked as read.")
 
 
+def _print_snippet(snip: str | None) -> None:
+    if snip and "[" in snip:
+        print(f"       {' '.join(snip.split())[:120]}")
+
+
 def cmd_grep_local(db: sqlite3.Connection, query: str, n: int = 20) -> None:
-    like = f"%{query}%"
     print(f"-- Local DB matches for '{query}' --")
-    rows = db.execute(
-        "SELECT id, author, title, submolt, upvotes, downvotes, comment_count FROM seen_posts "
-        "WHERE title LIKE ? OR author LIKE ? OR content LIKE ? ORDER BY upvotes DESC LIMIT ?",
-        (like, like, like, n),
-    ).fetchall()
+    rows = search_posts(db, query, n)
     for r in rows:
         _print_post_line(r["id"], r["upvotes"], r["comment_count"], r["author"], r["title"], submolt=r["submolt"], downvotes=r["downvotes"])
+        _print_snippet(r["snip"])
     if not rows:
         print("  (none)")
     print(f"\n-- Live feed matches for '{query}' --")
@@ -257,23 +412,15 @@ def cmd_grep_local(db: sqlite3.Connection, query: str, n: int = 20) -> None:
 
 
 def cmd_search(db: sqlite3.Connection, query: str) -> None:
-    like = f"%{query}%"
     print(f"Posts matching '{query}':")
-    rows = db.execute(
-        "SELECT id, author, title, submolt, upvotes, downvotes, comment_count FROM seen_posts "
-        "WHERE title LIKE ? OR author LIKE ? OR content LIKE ? ORDER BY seen_at DESC LIMIT 20",
-        (like, like, like),
-    ).fetchall()
+    rows = search_posts(db, query, 20)
     for r in rows:
         _print_post_line(r["id"], r["upvotes"], r["comment_count"], r["author"], r["title"], submolt=r["submolt"], downvotes=r["downvotes"])
+        _print_snippet(r["snip"])
     if not rows:
         print("  (none)")
     print(f"\nAgents matching '{query}':")
-    rows = db.execute(
-        "SELECT name, karma, followers, note, description FROM agents "
-        "WHERE name LIKE ? OR description LIKE ? OR note LIKE ? ORDER BY karma DESC LIMIT 10",
-        (like, like, like),
-    ).fetchall()
+    rows = search_agents(db, query, 10)
     for r in rows:
         note = f"  [{r['note']}]" if r["note"] else ""
         print(f"  {r['name']:<22}  karma={r['karma']}  followers={r['followers']}{note}")
@@ -306,38 +453,44 @@ def cmd_controversial(db: sqlite3.Connection, n: int = 20) -> None:
 
 
 def cmd_network(db: sqlite3.Connection, n: int = 15) -> None:
-    """Analyze interaction graph from local DB: who appears in my threads, who I comment on."""
+    """Interaction graph from the materialized edges: who I see, who I comment on, who answers."""
     # Agents who appear in posts I've seen most
     print("--- Agents I see most ---")
-    rows = db.execute(
-        "SELECT author, COUNT(*) as cnt, MAX(upvotes) as max_up, MAX(comment_count) as max_cc "
-        "FROM seen_posts WHERE author != 'ClaudeOpus-Lauri' AND author != '?' AND author != '' "
-        "GROUP BY author ORDER BY cnt DESC LIMIT ?",
-        (n,),
-    ).fetchall()
-    for r in rows:
-        note_row = db.execute("SELECT note FROM agents WHERE name=?", (r["author"],)).fetchone()
-        note = f"  [{note_row['note']}]" if note_row and note_row["note"] else ""
-        print(f"  {r['author']:<22}  seen {r['cnt']}x  best {r['max_up']}^/{r['max_cc']}c{note}")
+    seen = top_neighbours(db, ME, "seen", n)
+    peaks = {
+        r["author"]: r for r in db.execute(
+            f"SELECT author, MAX(upvotes) as max_up, MAX(comment_count) as max_cc FROM seen_posts "
+            f"WHERE author IN ({','.join('?' * len(seen))}) GROUP BY author",
+            [r["name"] for r in seen],
+        )
+    }
+    for r in seen:
+        peak = peaks.get(r["name"])
+        note = f"  [{r['note']}]" if r["note"] else ""
+        best = f"{peak['max_up']}^/{peak['max_cc']}c" if peak else "?"
+        print(f"  {r['name']:<22}  seen {r['weight']}x  best {best}{note}")
 
-    # Agents I've commented on
+    # Agents I've commented on, and whether they answer
     print("\n--- Agents I comment on ---")
-    rows = db.execute(
-        "SELECT post_author, COUNT(*) as cnt FROM my_comments "
-        "WHERE removed_at IS NULL AND post_author != 'ClaudeOpus-Lauri' "
-        "GROUP BY post_author ORDER BY cnt DESC LIMIT ?",
-        (n,),
-    ).fetchall()
-    for r in rows:
-        print(f"  {r['post_author']:<22}  {r['cnt']} comments")
+    for r in reciprocity(db, ME, n):
+        back = f"  {r['back']} replies back" if r["back"] else ""
+        print(f"  {r['name']:<22}  {r['given']} comments{back}")
+
+    recent = recency_scores(db, ME, n)
+    if recent:
+        print("\n--- Most engaged lately (decayed, half-life 7d) ---")
+        for name, score in recent:
+            print(f"  {name:<22}  {score:.1f}")
 
     # Top real agents (require they've posted content I've seen)
     print("\n--- Top content creators ---")
+    # Walks agents in karma order and stops after n matches, instead of joining every seen post
     rows = db.execute(
-        "SELECT a.name, a.karma, a.followers, a.note, COUNT(s.id) as seen_posts "
-        "FROM agents a JOIN seen_posts s ON s.author = a.name "
-        "WHERE a.name != 'ClaudeOpus-Lauri' AND a.name != '?' AND a.name != '' "
-        "GROUP BY a.name ORDER BY a.karma DESC LIMIT ?",
+        "SELECT a.name, a.karma, a.followers, a.note, "
+        "(SELECT COUNT(*) FROM seen_posts s WHERE s.author = a.name) as seen_posts "
+        "FROM agents a WHERE a.name != 'ClaudeOpus-Lauri' AND a.name != '?' AND a.name != '' "
+        "AND EXISTS (SELECT 1 FROM seen_posts s WHERE s.author = a.name) "
+        "ORDER BY a.karma DESC LIMIT ?",
         (n,),
     ).fetchall()
     for r in rows:
@@ -375,18 +528,26 @@ def cmd_wsearch(db: sqlite3.Connection, query: str, n: int = 10) -> None:
 
 
 def cmd_sfeed(db: sqlite3.Connection, submolt_name: str, n: int = 10, sort: str = "new") -> None:
-    d = req("GET", f"/submolts/{submolt_name}/feed?sort={sort}&limit={n}")
+    path = f"/submolts/{submolt_name}/feed?sort={sort}&limit={n}"
+
+    def show() -> bool:
+        rows = mirror.recent_posts(db, n, submolt=submolt_name, sort=sort)
+        if rows:
+            _print_local_posts(rows)
+        return bool(rows)
+
+    if _serve_local(show, _refresh_posts(path)):
+        return
+    d = req("GET", path)
     if not _check_get(d):
         return
     posts = d.get("posts", [])
     if not posts:
         print(f"  (no posts in m/{submolt_name})")
         return
+    seen = ingest_posts(db, posts)
     for p in posts:
-        already_seen = db.execute("SELECT 1 FROM seen_posts WHERE id=?", (p["id"],)).fetchone()
-        mark_seen(db, p)
-        remember_agent(db, p["author"])
-        new = "" if already_seen else " *"
+        new = "" if p["id"] in seen else " *"
         _print_post_line(
             p["id"], p.get("upvotes", 0), p.get("comment_count", 0),
             p["author"]["name"], p["title"], suffix=new, downvotes=p.get("downvotes", 0),
@@ -395,7 +556,29 @@ def cmd_sfeed(db: sqlite3.Connection, submolt_name: str, n: int = 10, sort: str
 
 
 def cmd_agent(db: sqlite3.Connection, agent_name: str) -> None:
-    d = req("GET", f"/agents/{quote(agent_name)}/profile")
+    path = f"/agents/{quote(agent_name)}/profile"
+
+    def show() -> bool:
+        a = mirror.agent(db, agent_name)
+        if a is None:
+            return False
+        print(f"{a['name']}  karma={a['karma']}  followers={a['followers'] or 0}  {mirror.label(a['last_seen'])}")
+        if a["description"]:
+            print(f"  {a['description'][:200]}")
+        if a["posts_count"] or a["comments_count"]:
+            print(f"  posts={a['posts_count']}  comments={a['comments_count']}")
+        if a["note"]:
+            print(f"  [note: {a['note']}]")
+        return True
+
+    def refresh(db: sqlite3.Connection) -> None:
+        d = req("GET", path)
+        if d.get("success"):
+            remember_agent(db, d.get("agent", d))
+
+    if _serve_local(show, refresh):
+        return
+    d = req("GET", path)
     if not _check_get(d):
         return
     a = d.get("agent", d)
@@ -424,17 +607,60 @@ def cmd_catchup(db: sqlite3.Connection, n: int = 5) -> None:
         if not posts:
             print(f"  (no posts in m/{sub})")
             continue
+        seen = ingest_posts(db, posts)
         for p in posts:
-            already_seen = db.execute("SELECT 1 FROM seen_posts WHERE id=?", (p["id"],)).fetchone()
-            mark_seen(db, p)
-            remember_agent(db, p["author"])
-            new = "" if already_seen else " *"
+            new = "" if p["id"] in seen else " *"
             _print_post_line(
                 p["id"], p.get("upvotes", 0), p.get("comment_count", 0),
                 p["author"]["name"], p["title"], suffix=new,
                 downvotes=p.get("downvotes", 0),
             )
-        db.commit()
+    db.commit()
+
+
+def _index_comments(thread: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    """Flatten a fetched comment thread into id -> comment, replies at any depth included."""
+    index: dict[str, dict[str, Any]] = {}
+    stack = list(thread.get("comments") or [])
+    while stack:
+        c = stack.pop()
+        if c.get("id"):
+            index.setdefault(c["id"], c)
+        stack.extend(c.get("replies") or [])
+    return index
+
+
+def _find_in_later_pages(
+    rows: list[sqlite3.Row], first_pages: dict[str, dict[str, Any]], index: dict[str, dict[str, dict[str, Any]]],
+) -> set[str]:
+    """Page through truncated threads for tracked comments the first page missed, adding them to `index`.
+
+    A thread counts as truncated when it says `has_more` or reports more comments
+    than its first page held. Each thread is streamed until its last missing id
+    turns up. Returns the threads whose paging failed or was cut short with ids
+    still missing: those ids may well exist.
+    """
+    incomplete: set[str] = set()
+    missing: dict[str, set[str]] = {}
+    for r in rows:
+        if r["id"] not in index.get(r["post_id"], {}):
+            missing.setdefault(r["post_id"], set()).add(r["id"])
+    for pid, wanted in missing.items():
+        d = first_pages.get(pid, {})
+        first = d.get("comments") or []
+        if not first or not (d.get("has_more") or (d.get("count") or 0) > len(index[pid])):
+            continue
+        failures: list[dict[str, Any]] = []
+        for c in paginate(f"/posts/{pid}/comments", "comments", start=len(first), failures=failures):
+            for cid, hit in _index_comments({"comments": [c]}).items():
+                if cid in wanted:
+                    index[pid][cid] = hit
+                    wanted.discard(cid)
+            if not wanted:
+                break
+        if wanted and failures:
+            incomplete.add(pid)
+    return incomplete
 
 
 def cmd_prune(db: sqlite3.Connection) -> None:
@@ -455,22 +681,35 @@ def cmd_prune(db: sqlite3.Connection) -> None:
     post_responses = all_responses[:len(post_calls)]
     comment_responses = all_responses[len(post_calls):]
     comment_data = dict(zip(unique_comment_post_ids, comment_responses, strict=True))
+    comment_index = {pid: _index_comments(d) for pid, d in comment_data.items()}
+    incomplete = _find_in_later_pages(comment_rows, comment_data, comment_index)  # a big thread's first page is not all of it
 
     t = now_iso()
     dead_posts: list[str] = []
     for r, d in zip(post_rows, post_responses, strict=True):
-        if not d.get("post"):
+        if d.get("not_found"):
             dead_posts.append(r["id"])
             print(f"  post: {r['title'][:50]}  (removed)")
-
+        elif not d.get("post"):
+            print(f"  post: {r['title'][:50]}  (check failed: {d.get('error', 'no post in response')}; kept)")
+
+    # A thread that failed to load, or to page through, says nothing about my comments
+    # in it, unless the post itself is gone
+    unchecked = incomplete | {
+        pid for pid, d in comment_data.items()
+        if (d.get("comments") is None or d.get("error")) and not d.get("not_found")
+    }
     dead_comments: list[str] = []
+    kept = 0
     for r in comment_rows:
-        d = comment_data.get(r["post_id"], {})
-        found = any(c.get("id") == r["id"] for c in d.get("comments", []))
-        if not found:
+        if r["post_id"] in unchecked:
+            kept += 1
+        elif r["id"] not in comment_index.get(r["post_id"], {}):
             dead_comments.append(r["id"])
             preview = (r["content"] or "")[:40]
             print(f"  comment: {preview}  (not found)")
+    if kept:
+        print(f"  ({kept} comments in threads that failed to load; kept)")
 
     if not dead_posts and not dead_comments:
         print("All tracked content is live. Nothing to prune.")
@@ -605,6 +844,52 @@ def cmd_postwindow(db: sqlite3.Connection) -> None:
         print(f"\nNo recent posts. Window is wide open ({max_posts} slots).")
 
 
+def cmd_trends(db: sqlite3.Connection, target: int = 10) -> None:
+    """Posting windows and momentum from the engagement time series (see molt.series)."""
+    t = time.time()
+    print("Posting windows (UTC hour posted -> average 24h after):")
+    rollup = hourly_rollup(db, t)
+    for r in rollup:
+        print(f"  {r['hour']:02d}h  {r['posts']:>3} posts  {r['upvotes']:5.1f}^  {r['comments']:5.1f}c")
+    if not rollup:
+        print("  (no posts with 24h of history yet)")
+
+    rows = db.execute("SELECT id, title, upvotes FROM my_posts WHERE removed_at IS NULL ORDER BY posted_at").fetchall()
+    rising = sorted(((velocity(db, f"post:{r['id']}", t), r) for r in rows), key=lambda vr: vr[0], reverse=True)
+    print("\nRising (upvotes/h over the last 6h):")
+    for v, r in [vr for vr in rising if vr[0] > 0][:5]:
+        print(f"  {v:+5.1f}/h  {r['upvotes'] or 0:>4}^  {r['title'][:50]}")
+    if not rising or rising[0][0] <= 0:
+        print("  (nothing moving)")
+
+    median, reached, missed = median_time_to(db, target)
+    if median is None:
+        print(f"\nNo post has reached {target} upvotes yet ({missed} tracked).")
+    else:
+        print(f"\nTime to {target} upvotes: median {median / 3600:.1f}h over {reached} posts ({missed} not there yet)")
+
+
+def cmd_perf(db: sqlite3.Connection, hours: int = 24) -> None:
+    """Latency percentiles per endpoint template from recorded request metrics (see molt.metrics)."""
+    flush_metrics(db)  # include this run's HUD calls
+    groups = summarize(db, time.time() - hours * 3600)
+    if not groups:
+        print(f"No requests recorded in the last {hours}h.")
+        return
+    wall = sum(g["sum_ms"] for g in groups)
+    calls = sum(g["count"] for g in groups)
+    print(f"Requests in the last {hours}h: {calls} calls, {sum(g['errors'] for g in groups)} errors, "
+          f"{sum(g['retries'] for g in groups)} retries, {wall / 1000:.1f}s total")
+    print(f"  {'endpoint':<38} {'n':>5} {'err':>4} {'p50':>7} {'p95':>7} {'p99':>7} {'ttfb':>7} {'conn':>6} {'wait':>7} {'KB':>5} {'share':>6}")
+    for g in groups:
+        t = g["total"]
+        print(
+            f"  {g['method'] + ' ' + g['endpoint']:<38.38} {g['count']:>5} {g['errors']:>4} "
+            f"{t['p50']:>5.0f}ms {t['p95']:>5.0f}ms {t['p99']:>5.0f}ms {g['ttfb_p50']:>5.0f}ms "
+            f"{g['connects']:>6} {g['wait_ms'] / 1000:>6.1f}s {g['bytes_avg'] / 1024:>5.1f} {g['sum_ms'] / wall:>6.0%}",
+        )
+
+
 def cmd_global(db: sqlite3.Connection, n: int = 10, sort: str = "hot") -> None:
     d = req("GET", f"/posts?limit={n}&sort={sort}")
     if not _check_get(d):
@@ -613,13 +898,10 @@ def cmd_global(db: sqlite3.Connection, n: int = 10, sort: str = "hot") -> None:
     if not posts:
         print("  (no posts)")
         return
+    seen = ingest_posts(db, posts)
     for p in posts:
-        already_seen = db.execute("SELECT 1 FROM seen_posts WHERE id=?", (p["id"],)).fetchone()
-        mark_seen(db, p)
         author = p.get("author", {})
-        if isinstance(author, dict):
-            remember_agent(db, author)
-        new = "" if already_seen else " *"
+        new = "" if p["id"] in seen else " *"
         author_name = author.get("name", "?") if isinstance(author, dict) else str(author)
         sub = p.get("submolt", {})
         subname = sub.get("name", "?") if isinstance(sub, dict) else str(sub)
@@ -651,39 +933,66 @@ def cmd_agent_comments(db: sqlite3.Connection, agent_name: str, n: int = 10) ->
         print()
 
 
-def cmd_review(db: sqlite3.Connection) -> None:
-    """Fetch current engagement for all my posts/comments, show deltas."""
-    # Phase 1: parallel-fetch all post data
-    print("--- My Posts ---")
-    post_rows = db.execute("SELECT id, submolt, title, upvotes, comment_count, posted_at FROM my_posts WHERE removed_at IS NULL ORDER BY posted_at").fetchall()
-    post_calls = [("GET", f"/posts/{r['id']}") for r in post_rows]
+def cmd_review(db: sqlite3.Connection, full: bool = False) -> None:
+    """Fetch current engagement for my posts/comments, show deltas.
 
-    # Phase 2: parallel-fetch all comment parent posts
+    Only posts and threads that are due (see molt.freshness) are fetched, and
+    conditionally, so quiet old content stops costing API budget; `full`
+    checks everything.
+    """
+    t = time.time()
+    post_rows = db.execute(
+        "SELECT id, submolt, title, upvotes, downvotes, comment_count, posted_at FROM my_posts WHERE removed_at IS NULL ORDER BY posted_at",
+    ).fetchall()
     comment_rows = db.execute(
-        "SELECT id, post_id, post_author, content, upvotes, hypothesis, commented_at FROM my_comments WHERE removed_at IS NULL ORDER BY commented_at",
+        "SELECT id, post_id, post_author, content, upvotes, reply_count, hypothesis, commented_at FROM my_comments "
+        "WHERE removed_at IS NULL ORDER BY commented_at",
     ).fetchall()
-    unique_post_ids = list(dict.fromkeys(r["post_id"] for r in comment_rows))
-    comment_calls = [("GET", f"/posts/{pid}/comments") for pid in unique_post_ids]
+    newest_comment = {r["post_id"]: r["commented_at"] for r in comment_rows}  # a thread is as hot as my latest comment in it
+    state = load_state(db, [f"/posts/{r['id']}" for r in post_rows] + [f"/posts/{pid}/comments" for pid in newest_comment])
+
+    # Phase 1: posts due a check
+    due_posts = [r for r in post_rows if full or is_due(state.get(f"/posts/{r['id']}"), r["posted_at"], t)]
+    post_calls = [("GET", p, conditional_headers(state.get(p))) for p in (f"/posts/{r['id']}" for r in due_posts)]
 
-    # Phase 3: fetch own agent comments (reliable fallback for large-thread pagination)
-    agent_comments_call = [("GET", "/agents/ClaudeOpus-Lauri/comments?limit=50&sort=new")]
+    # Phase 2: parent threads of my comments, same schedule
+    due_threads = [pid for pid, at in newest_comment.items() if full or is_due(state.get(f"/posts/{pid}/comments"), at, t)]
+    comment_calls = [("GET", p, conditional_headers(state.get(p))) for p in (f"/posts/{pid}/comments" for pid in due_threads)]
+    mine_by_thread: dict[str, list[str]] = {pid: [] for pid in due_threads}
+    for r in comment_rows:
+        if r["post_id"] in mine_by_thread:
+            mine_by_thread[r["post_id"]].append(r["id"])
+    due_comments = [r for r in comment_rows if r["post_id"] in mine_by_thread]
+
+    # Phase 3: fetch own agent comments (fallback when a thread cannot be paged through)
+    agent_comments_call = [("GET", "/agents/ClaudeOpus-Lauri/comments?limit=50&sort=new")] if due_comments else []
 
     # Fire all batches in one parallel_fetch
     all_calls = post_calls + comment_calls + agent_comments_call
     all_responses = parallel_fetch(all_calls) if all_calls else []
     post_responses = all_responses[:len(post_calls)]
     comment_responses = all_responses[len(post_calls):len(post_calls) + len(comment_calls)]
-    agent_comments_resp = all_responses[-1] if all_calls else {}
-    comment_data_by_post = dict(zip(unique_post_ids, comment_responses, strict=True))
+    agent_comments_resp = all_responses[-1] if agent_comments_call else {}
+    comment_data = dict(zip(due_threads, comment_responses, strict=True))
+    comment_index = {pid: _index_comments(d) for pid, d in comment_data.items()}
+    incomplete = _find_in_later_pages(due_comments, comment_data, comment_index)
     agent_comments_by_id = {c["id"]: c for c in agent_comments_resp.get("comments", [])}
 
     # Process posts sequentially
-    for r, d in zip(post_rows, post_responses, strict=True):
-        if not d.get("post"):
+    print("--- My Posts ---")
+    snaps = []
+    for r, d in zip(due_posts, post_responses, strict=True):
+        if d.get("not_modified"):
+            p = {"upvotes": r["upvotes"] or 0, "downvotes": r["downvotes"] or 0, "comment_count": r["comment_count"] or 0}
+        elif d.get("post"):
+            p = d["post"]
+        elif d.get("not_found"):
             print(f"  [{r['submolt']}] {r['title'][:40]}  (REMOVED)")
             db.execute("UPDATE my_posts SET removed_at=? WHERE id=?", (now_iso(), r["id"]))
             continue
-        p = d["post"]
+        else:
+            print(f"  [{r['submolt']}] {r['title'][:40]}  (check failed: {d.get('error', 'no post in response')})")
+            continue
         new_up, new_cc = p.get("upvotes", 0), p.get("comment_count", 0)
         new_dv = p.get("downvotes", 0)
         old_up, old_cc = r["upvotes"] or 0, r["comment_count"] or 0
@@ -692,26 +1001,31 @@ def cmd_review(db: sqlite3.Connection) -> None:
         dv_str = f"  {new_dv}v" if new_dv else ""
         print(f"  [{r['submolt']}] {r['title'][:40]}")
         print(f"    {new_up}^ ({delta_up}){dv_str}  {new_cc}c ({delta_cc})  posted {fmt_ago(r['posted_at'])}")
+        observe(db, f"/posts/{r['id']}", state.get(f"/posts/{r['id']}"), d, fingerprint([new_up, new_dv, new_cc]), at=t)
         db.execute(
             "UPDATE my_posts SET upvotes=?, downvotes=?, comment_count=?, last_checked=? WHERE id=?",
             (new_up, new_dv, new_cc, now_iso(), r["id"]),
         )
+        snaps.append((f"post:{r['id']}", new_up, new_dv, new_cc))
+    if len(due_posts) < len(post_rows):
+        print(f"  ({len(post_rows) - len(due_posts)} quiet posts not due yet; `review all` checks them now)")
+
+    for pid, d in comment_data.items():  # a thread changed if my comments in it did
+        if d.get("not_modified") or d.get("comments") is not None:
+            index = comment_index[pid]
+            mine = [(cid, index[cid].get("upvotes", 0), len(index[cid].get("replies") or [])) for cid in mine_by_thread[pid] if cid in index]
+            observe(db, f"/posts/{pid}/comments", state.get(f"/posts/{pid}/comments"), d, fingerprint([d.get("count"), mine]), at=t)
 
     # Process comments sequentially
     print("\n--- My Comments ---")
-    for r in comment_rows:
-        d = comment_data_by_post.get(r["post_id"], {})
-        my_comment = None
-        for c in d.get("comments", []):
-            if c.get("id") == r["id"]:
-                my_comment = c
-                break
-            for reply in c.get("replies", []):
-                if reply.get("id") == r["id"]:
-                    my_comment = reply
-                    break
-            if my_comment:
-                break
+    for r in due_comments:
+        my_comment = comment_index.get(r["post_id"], {}).get(r["id"])
+        if not my_comment and comment_data[r["post_id"]].get("not_modified"):
+            preview = (r["content"] or "")[:40]
+            print(f"  on {r['post_author']}: {preview}")
+            print(f"    {r['upvotes'] or 0}^ (=)  {r['reply_count'] or 0} replies  {fmt_ago(r['commented_at'])}  (thread unchanged)")
+            db.execute("UPDATE my_comments SET last_checked=? WHERE id=?", (now_iso(), r["id"]))
+            continue
         if not my_comment:
             # Fallback: check agent comments endpoint (works even for large threads)
             agent_hit = agent_comments_by_id.get(r["id"])
@@ -727,9 +1041,11 @@ def cmd_review(db: sqlite3.Connection) -> None:
                     "UPDATE my_comments SET upvotes=?, last_checked=? WHERE id=?",
                     (new_up, now_iso(), r["id"]),
                 )
+                snaps.append((f"comment:{r['id']}", new_up, 0, r["reply_count"]))
                 continue
             preview = (r["content"] or "")[:40]
-            print(f"  on {r['post_author']}: {preview}  (not found)")
+            status = "thread could not be paged through" if r["post_id"] in incomplete else "not found"
+            print(f"  on {r['post_author']}: {preview}  ({status})")
             continue
         new_up = my_comment.get("upvotes", 0)
         replies = len(my_comment.get("replies", []))
@@ -739,15 +1055,26 @@ def cmd_review(db: sqlite3.Connection) -> None:
         hyp = f"  H: {r['hypothesis']}" if r["hypothesis"] else ""
         print(f"  on {r['post_author']}: {preview}")
         print(f"    {new_up}^ ({delta})  {replies} replies  {fmt_ago(r['commented_at'])}{hyp}")
-        for rpl in my_comment.get("replies", [])[:3]:
+        reply_events = []
+        for i, rpl in enumerate(my_comment.get("replies", [])):
             rpl_author = rpl.get("author", {}).get("name", "?") if isinstance(rpl.get("author"), dict) else rpl.get("author", "?")
-            rpl_preview = (rpl.get("content", "") or "")[:70]
-            print(f"      \u21b3 {rpl_author}: {rpl_preview}")
+            if rpl.get("id"):
+                reply_events.append(replied(rpl["id"], rpl_author, rpl.get("created_at")))
+            if i < 3:
+                rpl_preview = (rpl.get("content", "") or "")[:70]
+                print(f"      \u21b3 {rpl_author}: {rpl_preview}")
+        record(db, reply_events)
         db.execute(
             "UPDATE my_comments SET upvotes=?, reply_count=?, last_checked=? WHERE id=?",
             (new_up, replies, now_iso(), r["id"]),
         )
+        snaps.append((f"comment:{r['id']}", new_up, 0, replies))
+
+    if len(due_comments) < len(comment_rows):
+        print(f"  ({len(comment_rows) - len(due_comments)} comments in quiet threads not due yet)")
 
+    snapshot(db, snaps, t)
+    maybe_compact(db, t)
     db.commit()
     print("\nEngagement snapshot saved.")
 
@@ -768,11 +1095,9 @@ def cmd_ffeed(db: sqlite3.Connection, n: int = 10) -> None:
     if not posts:
         print("  (no posts from followed accounts)")
         return
+    seen = ingest_posts(db, posts)
     for p in posts:
-        already_seen = db.execute("SELECT 1 FROM seen_posts WHERE id=?", (p["id"],)).fetchone()
-        mark_seen(db, p)
-        remember_agent(db, p["author"])
-        new = "" if already_seen else " *"
+        new = "" if p["id"] in seen else " *"
         sub = p.get("submolt", {})
         subname = sub.get("name", "?") if isinstance(sub, dict) else str(sub)
         _print_post_line(
@@ -0,0 +1,36 @@
+"""Verification commands — submit an answer, review challenge history."""
+
+import json
+import sqlite3
+
+from molt.api import req
+from molt.db import get_challenges, update_challenge_result
+
+
+def cmd_verify(db: sqlite3.Connection, code: str, answer_str: str) -> None:
+    d = req("POST", "/verify", {"verification_code": code, "answer": answer_str})
+    print(json.dumps(d, indent=2))
+    result = "success" if d.get("success") else "fail"
+    update_challenge_result(db, code, float(answer_str), result)
+
+
+def cmd_challenges(db: sqlite3.Connection, n: int = 20) -> None:
+    rows = get_challenges(db, n)
+    if not rows:
+        print("No challenges logged yet.")
+        return
+    ok = sum(1 for r in rows if r["result"] == "success")
+    fail = sum(1 for r in rows if r["result"] == "fail")
+    pending = sum(1 for r in rows if r["result"] is None)
+    print(f"Recent challenges: {ok} ok, {fail} fail, {pending} pending\n")
+    for r in rows:
+        status = r["result"] or "pending"
+        proposed = f'{r["proposed"]:.2f}' if r["proposed"] is not None else "?"
+        submitted = f'{r["submitted"]:.2f}' if r["submitted"] is not None else "-"
+        print(f"  [{status:7}] {r['at'][:16]}  nums={r['numbers']}  op={r['operation']}")
+        print(f"           proposed={proposed}  submitted={submitted}")
+        decoded = r["decoded_text"]
+        if len(decoded) > 80:
+            decoded = decoded[:77] + "..."
+        print(f"           {decoded}")
+        print()
@@ -5,6 +5,7 @@ import sqlite3
 
 from molt.api import _check_post, req
 from molt.db import can_post, cooldown_str, kv_set, log_action
+from molt.graph import commented, record
 from molt.timing import now_iso
 
 
@@ -68,6 +69,7 @@ def cmd_comment(
         "INSERT OR REPLACE INTO my_comments (id, post_id, post_author, content, commented_at) VALUES (?, ?, ?, ?, ?)",
         (cmt["id"], post_id, author_name, content[:500], now_iso()),
     )
+    record(db, [commented(cmt["id"], author_name, now_iso())])
     log_action(db, "comment", f"on {author_name}'s post ({post_id[:8]})")
     db.commit()
     print(f"Comment posted: {cmt['id']}")
@@ -1,104 +1,492 @@
 """Database layer — SQLite backend."""
 
 import json
+import os
+import re
 import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
 from datetime import datetime
+from pathlib import Path
 from typing import Any
 
 from molt import DB_PATH, ROOT
+from molt.freshness import REVIEW_SCHEMA
+from molt.graph import GRAPH_SCHEMA, backfill, record, sighting
+from molt.metrics import METRICS_SCHEMA
+from molt.series import SERIES_SCHEMA
+from molt.series import backfill as backfill_series
 from molt.timing import POST_COOLDOWN, now, now_iso
 
+_BASE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS seen_posts (
+        id TEXT PRIMARY KEY,
+        author TEXT,
+        title TEXT,
+        submolt TEXT,
+        upvotes INTEGER DEFAULT 0,
+        downvotes INTEGER DEFAULT 0,
+        comment_count INTEGER DEFAULT 0,
+        content TEXT,
+        seen_at TEXT
+    );
+    CREATE TABLE IF NOT EXISTS my_posts (
+        id TEXT PRIMARY KEY,
+        submolt TEXT,
+        title TEXT,
+        posted_at TEXT,
+        upvotes INTEGER DEFAULT 0,
+        downvotes INTEGER DEFAULT 0,
+        comment_count INTEGER DEFAULT 0,
+        last_checked TEXT,
+        removed_at TEXT
+    );
+    CREATE TABLE IF NOT EXISTS my_comments (
+        id TEXT PRIMARY KEY,
+        post_id TEXT,
+        post_author TEXT,
+        content TEXT,
+        commented_at TEXT,
+        upvotes INTEGER DEFAULT 0,
+        reply_count INTEGER DEFAULT 0,
+        hypothesis TEXT,
+        last_checked TEXT,
+        removed_at TEXT
+    );
+    CREATE TABLE IF NOT EXISTS agents (
+        name TEXT PRIMARY KEY,
+        description TEXT,
+        karma INTEGER DEFAULT 0,
+        followers INTEGER DEFAULT 0,
+        posts_count INTEGER DEFAULT 0,
+        comments_count INTEGER DEFAULT 0,
+        note TEXT,
+        first_seen TEXT,
+        last_seen TEXT
+    );
+    CREATE TABLE IF NOT EXISTS actions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        at TEXT,
+        action TEXT,
+        detail TEXT
+    );
+    CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT);
+    CREATE TABLE IF NOT EXISTS challenges (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        at TEXT,
+        code TEXT,
+        raw_text TEXT,
+        decoded_text TEXT,
+        numbers TEXT,
+        operation TEXT,
+        proposed REAL,
+        submitted REAL,
+        result TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_seen_author ON seen_posts(author);
+    CREATE INDEX IF NOT EXISTS idx_seen_submolt ON seen_posts(submolt);
+    CREATE INDEX IF NOT EXISTS idx_actions_at ON actions(at DESC);
+"""
+
+# Columns added before the schema was versioned; databases from then may lack any of them.
+_LEGACY_COLUMNS = [
+    ("seen_posts", "content", "TEXT"),
+    ("my_posts", "upvotes", "INTEGER DEFAULT 0"),
+    ("my_posts", "comment_count", "INTEGER DEFAULT 0"),
+    ("my_posts", "last_checked", "TEXT"),
+    ("my_comments", "upvotes", "INTEGER DEFAULT 0"),
+    ("my_comments", "reply_count", "INTEGER DEFAULT 0"),
+    ("my_comments", "hypothesis", "TEXT"),
+    ("my_comments", "last_checked", "TEXT"),
+    ("agents", "posts_count", "INTEGER DEFAULT 0"),
+    ("agents", "comments_count", "INTEGER DEFAULT 0"),
+    ("seen_posts", "downvotes", "INTEGER DEFAULT 0"),
+    ("my_posts", "downvotes", "INTEGER DEFAULT 0"),
+    ("my_posts", "removed_at", "TEXT"),
+    ("my_comments", "removed_at", "TEXT"),
+]
+
+
+def _run_script(db: sqlite3.Connection, script: str) -> None:
+    """executescript() without its implicit COMMIT, so a script can run inside a migration."""
+    stmt = ""
+    for piece in script.split(";"):
+        stmt += piece + ";"
+        if sqlite3.complete_statement(stmt):
+            if stmt.strip(" \n;"):
+                db.execute(stmt)
+            stmt = ""
+
+
+def _columns(db: sqlite3.Connection, table: str) -> set[str]:
+    return {row[1] for row in db.execute(f"PRAGMA table_info({table})")}
+
+
+def _migrate_base(db: sqlite3.Connection) -> None:
+    _run_script(db, _BASE_SCHEMA)
+    for table, col, coltype in _LEGACY_COLUMNS:
+        if col not in _columns(db, table):
+            db.execute(f"ALTER TABLE {table} ADD COLUMN {col} {coltype}")
 
-def get_db() -> sqlite3.Connection:
-    db = sqlite3.connect(str(DB_PATH))
-    db.row_factory = sqlite3.Row
-    db.execute("PRAGMA journal_mode=WAL")
-    db.executescript("""
-        CREATE TABLE IF NOT EXISTS seen_posts (
-            id TEXT PRIMARY KEY,
-            author TEXT,
-            title TEXT,
-            submolt TEXT,
-            upvotes INTEGER DEFAULT 0,
-            comment_count INTEGER DEFAULT 0,
-            content TEXT,
-            seen_at TEXT
-        );
-        CREATE TABLE IF NOT EXISTS my_posts (
-            id TEXT PRIMARY KEY,
-            submolt TEXT,
-            title TEXT,
-            posted_at TEXT,
-            upvotes INTEGER DEFAULT 0,
-            comment_count INTEGER DEFAULT 0,
-            last_checked TEXT
-        );
-        CREATE TABLE IF NOT EXISTS my_comments (
-            id TEXT PRIMARY KEY,
-            post_id TEXT,
-            post_author TEXT,
-            content TEXT,
-            commented_at TEXT,
-            upvotes INTEGER DEFAULT 0,
-            reply_count INTEGER DEFAULT 0,
-            hypothesis TEXT,
-            last_checked TEXT
-        );
-        CREATE TABLE IF NOT EXISTS agents (
-            name TEXT PRIMARY KEY,
-            description TEXT,
-            karma INTEGER DEFAULT 0,
-            followers INTEGER DEFAULT 0,
-            note TEXT,
-            first_seen TEXT,
-            last_seen TEXT
-        );
-        CREATE TABLE IF NOT EXISTS actions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            at TEXT,
-            action TEXT,
-            detail TEXT
-        );
-        CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT);
-        CREATE TABLE IF NOT EXISTS challenges (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            at TEXT,
-            code TEXT,
-            raw_text TEXT,
-            decoded_text TEXT,
-            numbers TEXT,
-            operation TEXT,
-            proposed REAL,
-            submitted REAL,
-            result TEXT
-        );
-        CREATE INDEX IF NOT EXISTS idx_seen_author ON seen_posts(author);
-        CREATE INDEX IF NOT EXISTS idx_seen_submolt ON seen_posts(submolt);
-        CREATE INDEX IF NOT EXISTS idx_actions_at ON actions(at DESC);
+
+def _migrate_http_cache(db: sqlite3.Connection) -> None:
+    db.execute("CREATE TABLE IF NOT EXISTS http_cache (key TEXT PRIMARY KEY, fetched_at REAL, body TEXT)")
+
+
+def _migrate_rate_log(db: sqlite3.Connection) -> None:
+    db.execute("CREATE TABLE IF NOT EXISTS rate_log (ts REAL, kind TEXT DEFAULT 'r')")
+    if "kind" not in _columns(db, "rate_log"):
+        db.execute("ALTER TABLE rate_log ADD COLUMN kind TEXT DEFAULT 'r'")
+
+
+def _migrate_fts(db: sqlite3.Connection) -> None:
+    """Create the FTS5 mirrors and backfill them.
+
+    Skipped if SQLite lacks FTS5: search falls back to LIKE, and _has_fts() runs
+    this again on each search, so the mirrors appear once SQLite gains FTS5.
+    """
+    if db.execute("SELECT 1 FROM sqlite_master WHERE name='posts_fts'").fetchone():
+        return
+    db.execute("SAVEPOINT fts")
+    try:
+        _run_script(db, _FTS_SCHEMA)
+    except sqlite3.OperationalError:
+        db.execute("ROLLBACK TO fts")
+        db.execute("RELEASE fts")
+        return
+    db.execute("RELEASE fts")
+    for stmt in _FTS_REBUILD:
+        db.execute(stmt)
+
+
+# Indexes for the local analytics queries; tests/test_query_plans.py checks no command full-scans.
+# Partial indexes cover only live rows (what every my_* query asks for), and the controversy
+# index stores the exact ORDER BY expression of cmd_controversial, so its top-N reads in order.
+_QUERY_INDEXES = """
+    DROP INDEX IF EXISTS idx_seen_author;
+    CREATE INDEX IF NOT EXISTS idx_seen_author_stats ON seen_posts(author, upvotes, comment_count);
+    CREATE INDEX IF NOT EXISTS idx_seen_upvotes ON seen_posts(upvotes);
+    CREATE INDEX IF NOT EXISTS idx_seen_controversy ON seen_posts(CAST(downvotes AS REAL) / MAX(upvotes, 1) DESC)
+        WHERE downvotes > 0;
+    CREATE INDEX IF NOT EXISTS idx_my_posts_live ON my_posts(posted_at) WHERE removed_at IS NULL;
+    CREATE INDEX IF NOT EXISTS idx_my_comments_live ON my_comments(commented_at) WHERE removed_at IS NULL;
+    CREATE INDEX IF NOT EXISTS idx_my_comments_author_live ON my_comments(post_author) WHERE removed_at IS NULL;
+    CREATE INDEX IF NOT EXISTS idx_agents_noted ON agents(name) WHERE note IS NOT NULL AND note != '';
+"""
+
+
+def _migrate_query_indexes(db: sqlite3.Connection) -> None:
+    _run_script(db, _QUERY_INDEXES)
+
+
+def _migrate_agents_karma(db: sqlite3.Connection) -> None:
+    # cmd_network's top creators walk agents by karma and stop after n with seen posts
+    db.execute("CREATE INDEX IF NOT EXISTS idx_agents_karma ON agents(karma DESC)")
+
+
+def _migrate_graph(db: sqlite3.Connection) -> None:
+    _run_script(db, GRAPH_SCHEMA)
+    backfill(db)
+
+
+def _migrate_review_state(db: sqlite3.Connection) -> None:
+    db.execute(REVIEW_SCHEMA)
+
+
+def _migrate_engagement(db: sqlite3.Connection) -> None:
+    db.execute(SERIES_SCHEMA)
+    backfill_series(db)
+
+
+def _migrate_request_metrics(db: sqlite3.Connection) -> None:
+    _run_script(db, METRICS_SCHEMA)
+
+
+def _migrate_mirror_indexes(db: sqlite3.Connection) -> None:
+    # --offline/--stale-ok list the most recently seen posts, overall or per submolt (molt.mirror)
+    _run_script(db, """
+        DROP INDEX IF EXISTS idx_seen_submolt;
+        CREATE INDEX IF NOT EXISTS idx_seen_recent ON seen_posts(seen_at DESC);
+        CREATE INDEX IF NOT EXISTS idx_seen_submolt_recent ON seen_posts(submolt, seen_at DESC);
     """)
-    for table, col, coltype in [
-        ("seen_posts", "content", "TEXT"),
-        ("my_posts", "upvotes", "INTEGER DEFAULT 0"),
-        ("my_posts", "comment_count", "INTEGER DEFAULT 0"),
-        ("my_posts", "last_checked", "TEXT"),
-        ("my_comments", "upvotes", "INTEGER DEFAULT 0"),
-        ("my_comments", "reply_count", "INTEGER DEFAULT 0"),
-        ("my_comments", "hypothesis", "TEXT"),
-        ("my_comments", "last_checked", "TEXT"),
-        ("agents", "posts_count", "INTEGER DEFAULT 0"),
-        ("agents", "comments_count", "INTEGER DEFAULT 0"),
-        ("seen_posts", "downvotes", "INTEGER DEFAULT 0"),
-        ("my_posts", "downvotes", "INTEGER DEFAULT 0"),
-        ("my_posts", "removed_at", "TEXT"),
-        ("my_comments", "removed_at", "TEXT"),
-    ]:
+
+
+_THREAD_MIRROR_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS mirrored_threads (
+        post_id TEXT PRIMARY KEY,
+        fetched_at REAL NOT NULL,  -- identifies the copy in mirrored_comments
+        count INTEGER NOT NULL,
+        complete INTEGER NOT NULL  -- 0: the fetch stopped early and there was no complete copy to keep
+    );
+    CREATE TABLE IF NOT EXISTS mirrored_comments (
+        post_id TEXT NOT NULL,
+        fetched_at REAL NOT NULL,
+        pos INTEGER NOT NULL,
+        body TEXT NOT NULL,  -- the comment as the API returned it, replies included
+        PRIMARY KEY (post_id, fetched_at, pos)
+    ) WITHOUT ROWID;
+    DELETE FROM http_cache WHERE key LIKE 'GET /posts/%/comments?sort=top';
+"""
+
+
+def _migrate_thread_mirror(db: sqlite3.Connection) -> None:
+    # full comment threads for --offline/--stale-ok reads, one row per comment (molt.mirror)
+    _run_script(db, _THREAD_MIRROR_SCHEMA)
+
+
+# Append-only: entry i upgrades a database from user_version i to i + 1. Every step must
+# also be safe on a pre-versioning database (user_version 0) that already has some of it.
+_MIGRATIONS: list[Callable[[sqlite3.Connection], None]] = [
+    _migrate_base,
+    _migrate_http_cache,
+    _migrate_rate_log,
+    _migrate_fts,
+    _migrate_query_indexes,
+    _migrate_agents_karma,
+    _migrate_graph,
+    _migrate_review_state,
+    _migrate_engagement,
+    _migrate_request_metrics,
+    _migrate_mirror_indexes,
+    _migrate_thread_mirror,
+]
+SCHEMA_VERSION = len(_MIGRATIONS)
+
+
+def migrate(db: sqlite3.Connection) -> None:
+    """Bring db up to SCHEMA_VERSION. Concurrent first runs serialize on the write lock."""
+    if db.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+        return
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        version = db.execute("PRAGMA user_version").fetchone()[0]  # another process may have won the race
+        for n in range(version, SCHEMA_VERSION):
+            _MIGRATIONS[n](db)
+            db.execute(f"PRAGMA user_version = {n + 1}")
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+
+
+# WAL + NORMAL only fsyncs at checkpoints: a power cut may drop the last commits,
+# an application crash cannot. MOLT_SYNCHRONOUS=FULL restores per-commit fsync.
+SYNCHRONOUS = os.environ.get("MOLT_SYNCHRONOUS", "NORMAL").upper()
+_SYNCHRONOUS_LEVELS = frozenset({"OFF", "NORMAL", "FULL", "EXTRA"})
+
+
+class MoltConnection(sqlite3.Connection):
+    """Connection whose commit() waits for the end of the outermost transaction() block."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.depth = 0  # open transaction() blocks
+        self.server_wrote = False  # a write request succeeded inside the open blocks (see note_server_write)
+
+    def commit(self) -> None:
+        if not self.depth:
+            super().commit()
+
+    def commit_now(self) -> None:
+        """Commit even inside a transaction() block (see commit_pending), through commit() so --profile times it."""
+        depth, self.depth = self.depth, 0
         try:
-            db.execute(f"SELECT {col} FROM {table} LIMIT 1")
-        except sqlite3.OperationalError:
-            db.execute(f"ALTER TABLE {table} ADD COLUMN {col} {coltype}")
+            self.commit()
+        finally:
+            self.depth = depth
+
+
+_unit = threading.local()  # .db: the connection of the transaction() open on this thread
+
+
+@contextmanager
+def transaction(db: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """One unit of work on db: the commit() calls of helpers and commands inside are deferred to a commit here.
+
+    The outermost block commits on normal exit and rolls back if an exception
+    escapes it, unless a write request succeeded inside it (note_server_write):
+    then what was recorded about it, say the my_posts row and cooldown of a post
+    the server accepted, is committed regardless. Network calls end the unit
+    early (see commit_pending), so the write lock is never held across a
+    request and what was recorded before one survives a later failure. While
+    the block is open, connection() on this thread hands out db rather than a
+    second connection that would wait on db's write lock.
+    """
+    deferring = isinstance(db, MoltConnection)
+    if deferring:
+        db.depth += 1  # type: ignore[attr-defined]
+    previous = getattr(_unit, "db", None)
+    _unit.db = db
+    completed = False
+    try:
+        yield db
+        completed = True
+    finally:
+        _unit.db = previous
+        if deferring:
+            db.depth -= 1  # type: ignore[attr-defined]
+        outermost = not getattr(db, "depth", 0)
+        if completed or (outermost and getattr(db, "server_wrote", False)):
+            db.commit()
+        elif outermost:  # an inner block leaves the outermost one to decide
+            db.rollback()
+        if deferring and outermost:
+            db.server_wrote = False  # type: ignore[attr-defined]
+
+
+def commit_pending() -> None:
+    """Commit what this thread's open transaction() has written so far. Called by molt.api before network I/O.
+
+    An open write transaction holds SQLite's write lock; kept across a request
+    it would stall the background HUD refresh, mirror revalidation and any
+    other molt process (they give up after the 5s busy timeout).
+    """
+    db = getattr(_unit, "db", None)
+    if db is not None and db.in_transaction:
+        if isinstance(db, MoltConnection):
+            db.commit_now()
+        else:
+            db.commit()
+
+
+def note_server_write() -> None:
+    """Record that a write request just succeeded: this thread's transaction() now commits even if it fails later.
+
+    Called by molt.api. The server has the change, so the local record of it
+    must not be rolled back with the rest of a command that raises afterwards.
+    """
+    db = getattr(_unit, "db", None)
+    if isinstance(db, MoltConnection):
+        db.server_wrote = True
+
+
+@contextmanager
+def connection(connect: Callable[[], sqlite3.Connection] | None = None) -> Iterator[sqlite3.Connection]:
+    """The connection of this thread's open transaction(), else a new one (get_db, or `connect`) closed on exit."""
+    db = getattr(_unit, "db", None)
+    if db is not None:
+        yield db
+        return
+    db = (connect or get_db)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def open_db(path: Path, timeout: float = 5.0) -> sqlite3.Connection:
+    """Connect to path, migrating first if its schema is behind. Current databases pay one PRAGMA read (and the synchronous one)."""
+    db = sqlite3.connect(str(path), timeout=timeout, factory=MoltConnection)
+    if SYNCHRONOUS in _SYNCHRONOUS_LEVELS:
+        db.execute(f"PRAGMA synchronous={SYNCHRONOUS}")
+    migrate(db)
     return db
 
 
+def get_db() -> sqlite3.Connection:
+    db = open_db(DB_PATH)
+    db.row_factory = sqlite3.Row
+    return db
+
+
+# Full-text mirrors of seen_posts and agents (external content, kept in sync by triggers).
+# External-content tables key on rowid, which VACUUM may renumber: run _FTS_REBUILD after one.
+_FTS_SCHEMA = """
+    CREATE VIRTUAL TABLE posts_fts USING fts5(
+        title, author, content, content='seen_posts', content_rowid='rowid',
+        tokenize='unicode61 remove_diacritics 2'
+    );
+    CREATE TRIGGER seen_posts_fts_ai AFTER INSERT ON seen_posts BEGIN
+        INSERT INTO posts_fts(rowid, title, author, content) VALUES (new.rowid, new.title, new.author, new.content);
+    END;
+    CREATE TRIGGER seen_posts_fts_ad AFTER DELETE ON seen_posts BEGIN
+        INSERT INTO posts_fts(posts_fts, rowid, title, author, content) VALUES ('delete', old.rowid, old.title, old.author, old.content);
+    END;
+    CREATE TRIGGER seen_posts_fts_au AFTER UPDATE OF title, author, content ON seen_posts
+    WHEN old.title IS NOT new.title OR old.author IS NOT new.author OR old.content IS NOT new.content BEGIN
+        INSERT INTO posts_fts(posts_fts, rowid, title, author, content) VALUES ('delete', old.rowid, old.title, old.author, old.content);
+        INSERT INTO posts_fts(rowid, title, author, content) VALUES (new.rowid, new.title, new.author, new.content);
+    END;
+    CREATE VIRTUAL TABLE agents_fts USING fts5(
+        name, description, note, content='agents', content_rowid='rowid',
+        tokenize='unicode61 remove_diacritics 2'
+    );
+    CREATE TRIGGER agents_fts_ai AFTER INSERT ON agents BEGIN
+        INSERT INTO agents_fts(rowid, name, description, note) VALUES (new.rowid, new.name, new.description, new.note);
+    END;
+    CREATE TRIGGER agents_fts_ad AFTER DELETE ON agents BEGIN
+        INSERT INTO agents_fts(agents_fts, rowid, name, description, note) VALUES ('delete', old.rowid, old.name, old.description, old.note);
+    END;
+    CREATE TRIGGER agents_fts_au AFTER UPDATE OF name, description, note ON agents
+    WHEN old.name IS NOT new.name OR old.description IS NOT new.description OR old.note IS NOT new.note BEGIN
+        INSERT INTO agents_fts(agents_fts, rowid, name, description, note) VALUES ('delete', old.rowid, old.name, old.description, old.note);
+        INSERT INTO agents_fts(rowid, name, description, note) VALUES (new.rowid, new.name, new.description, new.note);
+    END;
+"""
+
+
+_FTS_REBUILD = (
+    "INSERT INTO posts_fts(posts_fts) VALUES ('rebuild')",
+    "INSERT INTO agents_fts(agents_fts) VALUES ('rebuild')",
+)
+
+
+def _has_fts(db: sqlite3.Connection) -> bool:
+    """Whether the FTS5 mirrors exist, creating them first if migrating skipped them for want of FTS5."""
+    exists = "SELECT 1 FROM sqlite_master WHERE name='posts_fts'"
+    if db.execute(exists).fetchone():
+        return True
+    _migrate_fts(db)
+    db.commit()
+    return db.execute(exists).fetchone() is not None
+
+
+def _fts_query(query: str) -> str:
+    """Turn free text into an FTS5 prefix query: 'safety eval' -> '"safety"* "eval"*' (AND)."""
+    return " ".join(f'"{tok}"*' for tok in re.findall(r"\w+", query))
+
+
+def search_posts(db: sqlite3.Connection, query: str, n: int = 20) -> list[sqlite3.Row]:
+    """Local post search, best match first, with a highlighted `snip` column (None on the LIKE fallback)."""
+    match = _fts_query(query)
+    if match and _has_fts(db):
+        return db.execute(
+            "SELECT s.id, s.author, s.title, s.submolt, s.upvotes, s.downvotes, s.comment_count, "
+            "snippet(posts_fts, -1, '[', ']', '…', 12) AS snip "
+            "FROM posts_fts JOIN seen_posts s ON s.rowid = posts_fts.rowid "
+            "WHERE posts_fts MATCH ? ORDER BY bm25(posts_fts, 5.0, 3.0, 1.0) LIMIT ?",
+            (match, n),
+        ).fetchall()
+    like = f"%{query}%"
+    return db.execute(
+        "SELECT id, author, title, submolt, upvotes, downvotes, comment_count, NULL AS snip FROM seen_posts "
+        "WHERE title LIKE ? OR author LIKE ? OR content LIKE ? ORDER BY upvotes DESC LIMIT ?",
+        (like, like, like, n),
+    ).fetchall()
+
+
+def search_agents(db: sqlite3.Connection, query: str, n: int = 10) -> list[sqlite3.Row]:
+    """Local agent search over name/description/note, best match first."""
+    match = _fts_query(query)
+    if match and _has_fts(db):
+        return db.execute(
+            "SELECT a.name, a.karma, a.followers, a.note, a.description, "
+            "snippet(agents_fts, -1, '[', ']', '…', 12) AS snip "
+            "FROM agents_fts JOIN agents a ON a.rowid = agents_fts.rowid "
+            "WHERE agents_fts MATCH ? ORDER BY bm25(agents_fts, 5.0, 1.0, 2.0) LIMIT ?",
+            (match, n),
+        ).fetchall()
+    like = f"%{query}%"
+    return db.execute(
+        "SELECT name, karma, followers, note, description, NULL AS snip FROM agents "
+        "WHERE name LIKE ? OR description LIKE ? OR note LIKE ? ORDER BY karma DESC LIMIT ?",
+        (like, like, like, n),
+    ).fetchall()
+
+
 def kv_get(db: sqlite3.Connection, key: str, default: str | None = None) -> str | None:
     row = db.execute("SELECT value FROM kv WHERE key=?", (key,)).fetchone()
     return row["value"] if row else default
@@ -109,6 +497,19 @@ def kv_set(db: sqlite3.Connection, key: str, value: str) -> None:
     db.commit()
 
 
+def cache_entry(db: sqlite3.Connection, key: str) -> tuple[float, Any] | None:
+    """Return (age_seconds, response) for a cached API response, however old."""
+    row = db.execute("SELECT fetched_at, body FROM http_cache WHERE key=?", (key,)).fetchone()
+    return (time.time() - row["fetched_at"], json.loads(row["body"])) if row else None
+
+
+def cache_put(db: sqlite3.Connection, key: str, value: Any) -> None:
+    db.execute(
+        "REPLACE INTO http_cache (key, fetched_at, body) VALUES (?, ?, ?)",
+        (key, time.time(), json.dumps(value)),
+    )
+
+
 def log_action(db: sqlite3.Connection, action: str, detail: str = "") -> None:
     db.execute(
         "INSERT INTO actions (at, action, detail) VALUES (?, ?, ?)",
@@ -157,65 +558,99 @@ def _extract_submolt(post: dict[str, Any]) -> str:
     return post.get("submolt_name", "?")
 
 
-def mark_seen(
-    db: sqlite3.Connection, post: dict[str, Any], content: str | None = None,
-) -> None:
+def _seen_row(post: dict[str, Any], content: str | None, seen_at: str) -> tuple[Any, ...]:
     author = post.get("author", {})
     author_name = author.get("name", "?") if isinstance(author, dict) else str(author)
-    db.execute(
-        """INSERT INTO seen_posts (id, author, title, submolt, upvotes, downvotes, comment_count, content, seen_at)
+    return (
+        post["id"],
+        author_name,
+        post.get("title", ""),
+        _extract_submolt(post),
+        post.get("upvotes", 0),
+        post.get("downvotes", 0),
+        post.get("comment_count", 0),
+        content or post.get("content"),
+        seen_at,
+    )
+
+
+_MARK_SEEN_SQL = """INSERT INTO seen_posts (id, author, title, submolt, upvotes, downvotes, comment_count, content, seen_at)
                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
                   ON CONFLICT(id) DO UPDATE SET
                     upvotes=excluded.upvotes, downvotes=excluded.downvotes,
                     comment_count=excluded.comment_count,
-                    content=COALESCE(excluded.content, content), seen_at=excluded.seen_at""",
-        (
-            post["id"],
-            author_name,
-            post.get("title", ""),
-            _extract_submolt(post),
-            post.get("upvotes", 0),
-            post.get("downvotes", 0),
-            post.get("comment_count", 0),
-            content or post.get("content"),
-            now_iso(),
-        ),
+                    content=COALESCE(excluded.content, content), seen_at=excluded.seen_at"""
+
+
+def mark_seen(
+    db: sqlite3.Connection, post: dict[str, Any], content: str | None = None,
+) -> None:
+    row = _seen_row(post, content, now_iso())
+    db.execute(_MARK_SEEN_SQL, row)
+    record(db, [sighting(row[0], row[1], row[8])])
+
+
+def _agent_row(author: dict[str, Any], seen_at: str) -> tuple[Any, ...]:
+    stats = author.get("stats", {})
+    return (
+        author.get("name", "?"),
+        author.get("description", ""),
+        author.get("karma", 0),
+        author.get("follower_count"),
+        stats.get("posts", author.get("posts_count", 0)),
+        stats.get("comments", author.get("comments_count", 0)),
+        seen_at,
+        seen_at,
     )
 
 
+# With follower_count: full upsert. Without (feed results): keep the stored followers.
+_REMEMBER_AGENT_SQL = """INSERT INTO agents (name, description, karma, followers, posts_count, comments_count, first_seen, last_seen)
+                  VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                  ON CONFLICT(name) DO UPDATE SET
+                    karma=excluded.karma, followers=excluded.followers,
+                    posts_count=MAX(agents.posts_count, excluded.posts_count),
+                    comments_count=MAX(agents.comments_count, excluded.comments_count),
+                    description=COALESCE(NULLIF(excluded.description,''), description),
+                    last_seen=excluded.last_seen"""
+_REMEMBER_AGENT_NO_FOLLOWERS_SQL = """INSERT INTO agents (name, description, karma, followers, posts_count, comments_count, first_seen, last_seen)
+                  VALUES (?, ?, ?, COALESCE(?, 0), ?, ?, ?, ?)
+                  ON CONFLICT(name) DO UPDATE SET
+                    karma=excluded.karma,
+                    posts_count=MAX(agents.posts_count, excluded.posts_count),
+                    comments_count=MAX(agents.comments_count, excluded.comments_count),
+                    description=COALESCE(NULLIF(excluded.description,''), description),
+                    last_seen=excluded.last_seen"""
+
+
 def remember_agent(db: sqlite3.Connection, author: dict[str, Any]) -> None:
-    name = author.get("name", "?")
-    karma = author.get("karma", 0)
-    followers = author.get("follower_count")
-    desc = author.get("description", "")
-    stats = author.get("stats", {})
-    posts_count = stats.get("posts", author.get("posts_count", 0))
-    comments_count = stats.get("comments", author.get("comments_count", 0))
+    row = _agent_row(author, now_iso())
+    db.execute(_REMEMBER_AGENT_SQL if row[3] is not None else _REMEMBER_AGENT_NO_FOLLOWERS_SQL, row)
+
+
+def ingest_posts(db: sqlite3.Connection, posts: list[dict[str, Any]]) -> set[str]:
+    """Bulk mark_seen + remember_agent for a page of posts. Returns the ids that were already seen.
+
+    One IN (...) lookup plus executemany upserts, instead of three statements per post.
+    Authors that aren't dicts (some endpoints return bare names) are skipped.
+    Runs inside the caller's transaction; the caller commits.
+    """
+    if not posts:
+        return set()
+    ids = [p["id"] for p in posts]
+    seen: set[str] = set()
+    for i in range(0, len(ids), 500):  # stay well under SQLITE_MAX_VARIABLE_NUMBER
+        chunk = ids[i:i + 500]
+        marks = ",".join("?" * len(chunk))
+        seen.update(r[0] for r in db.execute(f"SELECT id FROM seen_posts WHERE id IN ({marks})", chunk))
     t = now_iso()
-    if followers is not None:
-        db.execute(
-            """INSERT INTO agents (name, description, karma, followers, posts_count, comments_count, first_seen, last_seen)
-                      VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                      ON CONFLICT(name) DO UPDATE SET
-                        karma=excluded.karma, followers=excluded.followers,
-                        posts_count=MAX(agents.posts_count, excluded.posts_count),
-                        comments_count=MAX(agents.comments_count, excluded.comments_count),
-                        description=COALESCE(NULLIF(excluded.description,''), description),
-                        last_seen=excluded.last_seen""",
-            (name, desc, karma, followers, posts_count, comments_count, t, t),
-        )
-    else:
-        db.execute(
-            """INSERT INTO agents (name, description, karma, followers, posts_count, comments_count, first_seen, last_seen)
-                      VALUES (?, ?, ?, 0, ?, ?, ?, ?)
-                      ON CONFLICT(name) DO UPDATE SET
-                        karma=excluded.karma,
-                        posts_count=MAX(agents.posts_count, excluded.posts_count),
-                        comments_count=MAX(agents.comments_count, excluded.comments_count),
-                        description=COALESCE(NULLIF(excluded.description,''), description),
-                        last_seen=excluded.last_seen""",
-            (name, desc, karma, posts_count, comments_count, t, t),
-        )
+    rows = [_seen_row(p, None, t) for p in posts]
+    db.executemany(_MARK_SEEN_SQL, rows)
+    record(db, [sighting(r[0], r[1], t) for r in rows if r[0] not in seen])
+    agent_rows = [_agent_row(p["author"], t) for p in posts if isinstance(p.get("author"), dict)]
+    db.executemany(_REMEMBER_AGENT_SQL, [r for r in agent_rows if r[3] is not None])
+    db.executemany(_REMEMBER_AGENT_NO_FOLLOWERS_SQL, [r for r in agent_rows if r[3] is None])
+    return seen
 
 
 def cooldown_str(db: sqlite3.Connection) -> str:
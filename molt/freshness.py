@@ -0,0 +1,89 @@
+"""Review schedule — per-resource validators, change history and when to check again.
+
+`review_state` keeps, per API path, the validators the server last sent (ETag,
+Last-Modified, replayed as If-None-Match / If-Modified-Since), a fingerprint of
+the fields review actually reads, when the path was last checked and when that
+fingerprint last changed. Servers that send no validators still get change
+detection from the fingerprint; they just cost a full response.
+
+Schedule: anything younger than _HOT_AGE (or of unknown age) is checked every
+run. Older resources then wait half as long as they had been quiet when last
+checked, clamped to [_MIN_INTERVAL, _MAX_INTERVAL]: a post that had just moved
+is due again after 15 minutes, one that had not moved for two weeks after a week.
+"""
+
+import hashlib
+import json
+import sqlite3
+from collections.abc import Iterable
+from typing import Any
+
+from molt.timing import epoch
+
+REVIEW_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS review_state (
+        path TEXT PRIMARY KEY,
+        etag TEXT,
+        last_modified TEXT,
+        fingerprint TEXT,
+        checked_at REAL,
+        changed_at REAL
+    ) WITHOUT ROWID
+"""
+
+_HOT_AGE = 2 * 86400.0
+_MIN_INTERVAL = 15 * 60.0
+_MAX_INTERVAL = 7 * 86400.0
+_CHUNK = 500  # paths per IN (...) lookup
+
+
+def load_state(db: sqlite3.Connection, paths: Iterable[str]) -> dict[str, sqlite3.Row]:
+    paths = list(paths)
+    state: dict[str, sqlite3.Row] = {}
+    for i in range(0, len(paths), _CHUNK):
+        chunk = paths[i:i + _CHUNK]
+        for row in db.execute(
+            f"SELECT * FROM review_state WHERE path IN ({', '.join('?' * len(chunk))})", chunk,
+        ):
+            state[row["path"]] = row
+    return state
+
+
+def is_due(state: sqlite3.Row | None, created_at: str | None, t: float) -> bool:
+    """Whether a resource created at `created_at` should be fetched at time `t`."""
+    if state is None or state["checked_at"] is None:
+        return True
+    created = epoch(created_at)
+    if created is None or t - created < _HOT_AGE:
+        return True
+    quiet = state["checked_at"] - (state["changed_at"] or state["checked_at"])
+    return t - state["checked_at"] >= min(_MAX_INTERVAL, max(_MIN_INTERVAL, quiet / 2))
+
+
+def conditional_headers(state: sqlite3.Row | None) -> dict[str, str]:
+    headers: dict[str, str] = {}
+    if state is not None and state["etag"]:
+        headers["If-None-Match"] = state["etag"]
+    if state is not None and state["last_modified"]:
+        headers["If-Modified-Since"] = state["last_modified"]
+    return headers
+
+
+def fingerprint(value: Any) -> str:
+    return hashlib.blake2b(json.dumps(value, sort_keys=True, default=str).encode(), digest_size=16).hexdigest()
+
+
+def observe(
+    db: sqlite3.Connection, path: str, state: sqlite3.Row | None, d: dict[str, Any], fp: str, *, at: float,
+) -> bool:
+    """Record a successful check of `path` at `at` (response `d`, fingerprint `fp`). Returns whether it changed. Does not commit."""
+    if d.get("not_modified"):
+        db.execute("UPDATE review_state SET checked_at=? WHERE path=?", (at, path))
+        return False
+    changed = state is None or state["fingerprint"] != fp
+    changed_at = at if changed else state["changed_at"]  # type: ignore[index]
+    db.execute(
+        "REPLACE INTO review_state (path, etag, last_modified, fingerprint, checked_at, changed_at) VALUES (?, ?, ?, ?, ?, ?)",
+        (path, d.get("_etag"), d.get("_last_modified"), fp, at, changed_at),
+    )
+    return changed
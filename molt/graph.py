@@ -0,0 +1,143 @@
+"""Interaction graph — incrementally maintained edges with O(k) neighbour queries.
+
+Every interaction is an event row in `interactions`, keyed by the thing that
+caused it (`post:<id>`, `comment:<id>`, `reply:<id>`), so recording the same
+sighting or reply twice is a no-op. A trigger folds each new event into its
+`edges` row (src, kind, dst), which keeps a count, a recency score and the
+last time seen. Indexes on (src, kind, weight) and (src, kind, recency) make
+top-k neighbour queries index walks that stop after k rows.
+
+Edge kinds:
+    seen     me -> author      I saw one of their posts (event ref post:<id>, one per post)
+    comment  me -> author      I commented on their post
+    reply    author -> me      they replied to one of my comments
+
+Recency: an event at time t adds 2 ** ((t - _EPOCH) / _HALF_LIFE) to its edge.
+Scaling every score by the same 2 ** (-(now - _EPOCH) / _HALF_LIFE) gives
+exponentially decayed counts (an event _HALF_LIFE ago counts half), so ranking
+by the stored sum is ranking by decayed score, and no row ever needs rewriting.
+"""
+
+import sqlite3
+from collections.abc import Iterable
+
+from molt.timing import epoch, now
+
+ME = "ClaudeOpus-Lauri"
+_EPOCH = 1767225600.0  # 2026-01-01T00:00:00Z
+_HALF_LIFE = 7 * 86400.0  # floats hold 2 ** ~1000, i.e. ~19 years of weekly half-lives past _EPOCH
+
+GRAPH_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS interactions (
+        ref TEXT PRIMARY KEY,
+        src TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        dst TEXT NOT NULL,
+        at TEXT,
+        boost REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS edges (
+        src TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        dst TEXT NOT NULL,
+        weight INTEGER NOT NULL DEFAULT 0,
+        recency REAL NOT NULL DEFAULT 0,
+        last_at TEXT,
+        PRIMARY KEY (src, kind, dst)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_edges_weight ON edges(src, kind, weight DESC);
+    CREATE INDEX IF NOT EXISTS idx_edges_recency ON edges(src, kind, recency DESC);
+    CREATE INDEX IF NOT EXISTS idx_edges_dst ON edges(dst, kind, recency DESC);
+    CREATE TRIGGER IF NOT EXISTS interactions_edges_ai AFTER INSERT ON interactions BEGIN
+        INSERT INTO edges (src, kind, dst, weight, recency, last_at)
+        VALUES (new.src, new.kind, new.dst, 1, new.boost, new.at)
+        ON CONFLICT (src, kind, dst) DO UPDATE SET
+            weight = weight + 1,
+            recency = recency + excluded.recency,
+            last_at = MAX(COALESCE(last_at, ''), COALESCE(excluded.last_at, ''));
+    END;
+"""
+
+Event = tuple[str, str, str, str, str | None]  # (ref, src, kind, dst, at)
+
+
+def _boost(at: str | None) -> float:
+    t = epoch(at)
+    return 2.0 ** (((t if t is not None else now().timestamp()) - _EPOCH) / _HALF_LIFE)
+
+
+def _decay() -> float:
+    """Factor turning stored recency sums into scores as of now."""
+    return 2.0 ** (-(now().timestamp() - _EPOCH) / _HALF_LIFE)
+
+
+def record(db: sqlite3.Connection, events: Iterable[Event | None]) -> None:
+    """Add interaction events (None entries are skipped); already-recorded refs are ignored. Does not commit."""
+    db.executemany(
+        "INSERT OR IGNORE INTO interactions (ref, src, kind, dst, at, boost) VALUES (?, ?, ?, ?, ?, ?)",
+        [(e[0], e[1], e[2], e[3], e[4], _boost(e[4])) for e in events if e],
+    )
+
+
+def _real(name: str | None) -> bool:
+    return bool(name) and name not in ("?", ME)
+
+
+def sighting(post_id: str, author: str, at: str | None) -> Event | None:
+    """The 'seen' event for one post, or None for posts without a real author."""
+    return (f"post:{post_id}", ME, "seen", author, at) if _real(author) else None
+
+
+def commented(comment_id: str, post_author: str, at: str | None) -> Event | None:
+    return (f"comment:{comment_id}", ME, "comment", post_author, at) if _real(post_author) else None
+
+
+def replied(reply_id: str, author: str, at: str | None) -> Event | None:
+    return (f"reply:{reply_id}", author, "reply", ME, at) if _real(author) else None
+
+
+def backfill(db: sqlite3.Connection) -> None:
+    """Replay existing seen posts and comments into the graph (used by the migration)."""
+    record(db, (sighting(*r) for r in db.execute("SELECT id, author, seen_at FROM seen_posts").fetchall()))
+    record(db, (commented(*r) for r in db.execute("SELECT id, post_author, commented_at FROM my_comments").fetchall()))
+
+
+def top_neighbours(
+    db: sqlite3.Connection, src: str, kind: str, k: int = 15, *, by: str = "weight",
+) -> list[sqlite3.Row]:
+    """Top-k dst of src's `kind` edges by weight or recency, joined with the agent's profile."""
+    order = "recency" if by == "recency" else "weight"
+    return db.execute(
+        "SELECT e.dst AS name, e.weight, e.recency * ? AS score, e.last_at, a.karma, a.followers, a.note "
+        "FROM edges e LEFT JOIN agents a ON a.name = e.dst "
+        f"WHERE e.src = ? AND e.kind = ? ORDER BY e.{order} DESC LIMIT ?",
+        (_decay(), src, kind, k),
+    ).fetchall()
+
+
+def reciprocity(db: sqlite3.Connection, me: str = ME, k: int = 15) -> list[sqlite3.Row]:
+    """Agents I comment on, most-commented first, with how often they reply back (`back`, 0 if never)."""
+    return db.execute(
+        "SELECT c.dst AS name, c.weight AS given, COALESCE(r.weight, 0) AS back, "
+        "CAST(COALESCE(r.weight, 0) AS REAL) / c.weight AS ratio "
+        "FROM edges c LEFT JOIN edges r ON r.src = c.dst AND r.kind = 'reply' AND r.dst = c.src "
+        "WHERE c.src = ? AND c.kind = 'comment' ORDER BY c.weight DESC LIMIT ?",
+        (me, k),
+    ).fetchall()
+
+
+def recency_scores(db: sqlite3.Connection, src: str = ME, k: int = 15) -> list[tuple[str, float]]:
+    """Decayed interaction score per agent (seen + comment + replies back), best first.
+
+    Merges each kind's top k, so an agent just outside every per-kind top k can be missed.
+    """
+    scores: dict[str, float] = {}
+    for kind in ("seen", "comment"):
+        for r in top_neighbours(db, src, kind, k, by="recency"):
+            scores[r["name"]] = scores.get(r["name"], 0.0) + r["score"]
+    for r in db.execute(  # replies point at me: walk the dst index
+        "SELECT src, recency * ? FROM edges WHERE dst = ? AND kind = 'reply' ORDER BY recency DESC LIMIT ?",
+        (_decay(), src, k),
+    ):
+        scores[r[0]] = scores.get(r[0], 0.0) + r[1]
+    return sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:k]
@@ -0,0 +1,175 @@
+"""Request policy shared by api.req() and the async engine — limits, retries, deadlines.
+
+An Attempts object walks one request through the policy without doing any I/O
+itself, so the blocking and the asyncio paths drive the same steps and differ
+only in how they send and sleep:
+
+    while (wait := attempts.wait()) is not None:
+        if wait:
+            sleep(wait)
+            continue
+        try:
+            response = send(timeout=attempts.send_timeout())
+        except Exception as e:
+            attempts.failed(e)
+        else:
+            attempts.received(*response)
+    return attempts.result
+
+GETs are retried on transport errors, 429 and 5xx with jittered exponential
+backoff (or the server's Retry-After), as long as the next attempt still fits
+before the deadline. Time queued on the rate limiter does not count against
+the deadline, so a batch bigger than one window is paced rather than failed.
+Writes are never retried: a replayed POST can duplicate content.
+"""
+
+import random
+import time
+from collections.abc import Callable
+from typing import Any, Protocol
+
+from molt.metrics import Phases
+from molt.timing import now
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_ATTEMPTS = 4  # per GET, including the first
+BACKOFF_BASE = 0.5  # seconds; doubles per attempt
+BACKOFF_CAP = 8.0
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+# A keep-alive socket the server already closed surfaces as one of these on reuse
+# (http.client.RemoteDisconnected is a ConnectionResetError; api._send adds BadStatusLine).
+STALE_ERRORS: tuple[type[Exception], ...] = (ConnectionResetError, BrokenPipeError)
+
+DEADLINE_ERROR = "deadline exceeded"
+
+
+class Limiter(Protocol):
+    def reserve(self, method: str) -> float: ...
+
+
+class Recorder(Protocol):
+    def record(
+        self, method: str, path: str, status: int, phases: Phases, *, total: float, size: int, retries: int,
+    ) -> None: ...
+
+
+def retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds from now."""
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value.strip())
+    from email.utils import parsedate_to_datetime  # noqa: PLC0415
+
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - now()).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff(attempt: int, server_delay: float | None) -> float:
+    """Server-requested delay if given, else full-jitter exponential backoff."""
+    if server_delay is not None:
+        return server_delay
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def validated(d: dict[str, Any], status: int, headers: Any) -> dict[str, Any]:
+    """Result of a conditional GET: {"not_modified": True} on 304, else `d` plus the response's validators."""
+    if status == 304:
+        return {"success": True, "not_modified": True}
+    for name in ("etag", "last-modified"):
+        if value := headers.get(name):
+            d[f"_{name.replace('-', '_')}"] = value
+    return d
+
+
+Decode = Callable[[str, str, int, str, bytes], dict[str, Any]]
+
+
+class Attempts:
+    """One request's way through the limiter, retries and deadline; see the module docstring.
+
+    `deadline` is in seconds (default 2 x timeout), not counting limiter waits.
+    With `conditional` headers a 304 becomes {"success": True, "not_modified":
+    True} and other successes carry `_etag`/`_last_modified`. `result` is set,
+    and recorded in `metrics`, once the request is done.
+    """
+
+    def __init__(
+        self, method: str, path: str, timeout: float, deadline: float | None = None, *,
+        conditional: dict[str, str] | None = None, limiter: Limiter, decode: Decode, metrics: Recorder,
+    ) -> None:
+        self.method, self.path, self.timeout, self.conditional = method, path, timeout, conditional
+        self.phases = Phases()
+        self.result: dict[str, Any] | None = None
+        self._limiter, self._decode, self._metrics = limiter, decode, metrics
+        self._start = time.perf_counter()
+        self._give_up_at = time.monotonic() + (deadline if deadline is not None else 2 * timeout)
+        self._attempts = MAX_ATTEMPTS if method == "GET" else 1
+        self._sent = 0
+        self._delay = 0.0  # backoff before the next attempt
+        self._last: tuple[int, str, bytes] | Exception | None = None  # how the last attempt failed
+
+    def wait(self) -> float | None:
+        """Before each send: seconds to sleep first, 0 to send now (counted by the limiter), None when done."""
+        if self.result is not None:
+            return None
+        if self._delay:
+            delay, self._delay = self._delay, 0.0
+            self.phases.wait += delay
+            return delay
+        if time.monotonic() >= self._give_up_at:
+            self._give_up()
+            return None
+        wait = self._limiter.reserve(self.method)
+        self._give_up_at += wait  # queueing behind other requests is not this one's time
+        self.phases.wait += wait
+        return wait
+
+    def send_timeout(self) -> float:
+        """Socket timeout for the attempt about to go out: `timeout`, cut short by the deadline."""
+        return max(0.0, min(self.timeout, self._give_up_at - time.monotonic()))
+
+    def received(self, status: int, reason: str, headers: Any, raw: bytes) -> None:
+        self._sent += 1
+        if self.conditional is not None and status == 304:
+            self._finish(validated({}, status, headers), status, 0)
+        elif status not in RETRY_STATUSES:
+            d = self._decode(self.method, self.path, status, reason, raw)
+            d = validated(d, status, headers) if self.conditional is not None and status < 400 else d
+            self._finish(d, status, len(raw))
+        else:
+            self._last = (status, reason, raw)
+            self._retry(retry_after(headers.get("Retry-After") or headers.get("retry-after")))
+
+    def failed(self, error: Exception) -> None:
+        self._sent += 1
+        self._last = error
+        self._retry(None)
+
+    def _retry(self, server_delay: float | None) -> None:
+        delay = backoff(self._sent - 1, server_delay)
+        if self._sent == self._attempts or time.monotonic() + delay >= self._give_up_at:
+            self._give_up()
+        else:
+            self._delay = delay
+
+    def _give_up(self) -> None:
+        """Finish with how the last attempt failed, or a deadline error if none went out."""
+        last = self._last
+        if isinstance(last, Exception):
+            self._finish({"success": False, "error": str(last) or type(last).__name__}, 0, 0)
+        elif last is not None:
+            status, reason, raw = last
+            self._finish(self._decode(self.method, self.path, status, reason, raw), status, len(raw))
+        else:
+            self._finish({"success": False, "error": DEADLINE_ERROR}, 0, 0)
+
+    def _finish(self, d: dict[str, Any], status: int, size: int) -> None:
+        self.result = d
+        self._metrics.record(
+            self.method, self.path, status, self.phases,
+            total=time.perf_counter() - self._start, size=size, retries=max(0, self._sent - 1),
+        )
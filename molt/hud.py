@@ -1,47 +1,114 @@
-"""HUD display — parallel API fetch + local stats with TTL caching."""
+"""HUD display — parallel API fetch + local stats with TTL caching and background refresh."""
 
+import os
 import sqlite3
-import time
 from typing import Any
 
+from molt import mirror
 from molt.api import parallel_fetch, rate_usage
-from molt.db import cooldown_str, log_action, remember_agent
+from molt.background import spawn
+from molt.db import (
+    cache_entry,
+    cache_put,
+    cooldown_str,
+    get_db,
+    log_action,
+    remember_agent,
+)
 from molt.timing import fmt_ago, now
 
-_hud_cache: dict[str, tuple[float, Any]] = {}
 _HUD_TTL = 30.0  # seconds
+# "async" (default): print from the last snapshot, refresh it in the background for the next run.
+# "sync": fetch anything older than the TTL before printing (the old behaviour).
+HUD_MODE = os.environ.get("MOLT_HUD", "async")
 
 
-def _cached_fetch(calls: list[tuple[str, str, str]]) -> dict[str, Any]:
-    """Fetch API data with TTL cache. calls: [(key, method, path), ...]."""
+def _fetch_and_store(db: sqlite3.Connection, calls: list[tuple[str, str, str]]) -> dict[str, Any]:
+    responses = parallel_fetch([(method, path) for _, method, path in calls], timeout=10)
     results: dict[str, Any] = {}
-    to_fetch: list[tuple[int, str, str, str]] = []  # (idx, key, method, path)
+    for (key, method, path), resp in zip(calls, responses, strict=True):
+        if not resp.get("error") and not resp.get("statusCode"):
+            cache_put(db, f"{method} {path}", resp)
+        results[key] = resp
+    db.commit()
+    return results
+
+
+def _record_checks(db: sqlite3.Connection, fresh: dict[str, Any]) -> None:
+    """What freshly fetched HUD data means locally (never a cached copy): my agent row, a logged DM check."""
+    me = fresh.get("me")
+    if me and not me.get("error") and me.get("agent"):
+        remember_agent(db, me["agent"])
+    dm = fresh.get("dm")
+    if dm and not dm.get("error"):
+        log_action(db, "dmcheck_bg", "")
+    db.commit()
+
+
+def _refresh_snapshot(calls: list[tuple[str, str, str]]) -> None:
+    """Background refresh — own connection, since sqlite3 connections are per-thread."""
+    db = get_db()
+    try:
+        _record_checks(db, _fetch_and_store(db, calls))
+    finally:
+        db.close()
 
-    t = time.monotonic()
-    for i, (key, method, path) in enumerate(calls):
-        cached = _hud_cache.get(key)
-        if cached and (t - cached[0]) < _HUD_TTL:
-            results[key] = cached[1]
+
+def _cached_fetch(
+    db: sqlite3.Connection, calls: list[tuple[str, str, str]], *, stale_ok: bool = False,
+    fetched: set[str] | None = None,
+) -> tuple[dict[str, Any], float]:
+    """Fetch API data with TTL cache. calls: [(key, method, path), ...].
+
+    The cache lives in the http_cache table (keyed by method+path), so it is
+    shared across back-to-back `python -m molt` invocations. Error responses
+    are not cached. With stale_ok, expired entries are returned as-is and
+    refreshed on a background thread; only never-fetched keys block. Offline
+    (see molt.mirror), cached entries of any age are used and nothing is fetched.
+    Returns (results, age of the oldest stale entry used); the keys fetched
+    just now, rather than read from the cache, are added to `fetched` (if given).
+    """
+    results: dict[str, Any] = {}
+    to_fetch: list[tuple[str, str, str]] = []  # (key, method, path)
+    to_refresh: list[tuple[str, str, str]] = []
+    stale_age = 0.0
+
+    offline = mirror.MODE == mirror.OFFLINE
+    for key, method, path in calls:
+        entry = cache_entry(db, f"{method} {path}")
+        if entry is not None and offline:
+            results[key] = entry[1]
+            stale_age = max(stale_age, entry[0])
+        elif offline:
+            continue
+        elif entry is None:
+            to_fetch.append((key, method, path))
+        elif entry[0] < _HUD_TTL:
+            results[key] = entry[1]
+        elif stale_ok:
+            results[key] = entry[1]
+            to_refresh.append((key, method, path))
+            stale_age = max(stale_age, entry[0])
         else:
-            to_fetch.append((i, key, method, path))
+            to_fetch.append((key, method, path))
 
+    if to_refresh:
+        spawn(_refresh_snapshot, to_refresh)
     if to_fetch:
-        api_calls = [(method, path) for _, _, method, path in to_fetch]
-        responses = parallel_fetch(api_calls, timeout=10)
-        t2 = time.monotonic()
-        for (_, key, _, _), resp in zip(to_fetch, responses, strict=True):
-            _hud_cache[key] = (t2, resp)
-            results[key] = resp
+        results.update(_fetch_and_store(db, to_fetch))
+        if fetched is not None:
+            fetched.update(key for key, _, _ in to_fetch)
 
-    return results
+    return results, stale_age
 
 
 def hud(db: sqlite3.Connection) -> None:
-    api_data = _cached_fetch([
+    fetched: set[str] = set()
+    api_data, stale_age = _cached_fetch(db, [
         ("dm", "GET", "/agents/dm/check"),
         ("me", "GET", "/agents/me"),
         ("notifs", "GET", "/notifications?limit=50"),
-    ])
+    ], stale_ok=HUD_MODE == "async", fetched=fetched)
 
     t_now = now()
     last_action = db.execute("SELECT at FROM actions ORDER BY id DESC LIMIT 1").fetchone()
@@ -50,13 +117,12 @@ def hud(db: sqlite3.Connection) -> None:
     agent_count = db.execute("SELECT COUNT(*) as c FROM agents").fetchone()["c"]
     cd = cooldown_str(db)
     cd_fmt = f"post={cd}" if cd == "READY" else f"post in {cd}"
+    _record_checks(db, {key: api_data[key] for key in fetched})
 
     me_data = api_data.get("me")
     if me_data and not me_data.get("error") and me_data.get("agent"):
         a = me_data["agent"]
         me_str = f"  me={a.get('karma', 0)}k/{a.get('follower_count', 0)}f"
-        remember_agent(db, a)
-        db.commit()
     else:
         me_row = db.execute(
             "SELECT karma, followers FROM agents WHERE name='ClaudeOpus-Lauri'"
@@ -66,8 +132,6 @@ def hud(db: sqlite3.Connection) -> None:
     dm_str = ""
     dm = api_data.get("dm")
     if dm and not dm.get("error"):
-        log_action(db, "dmcheck_bg", "")
-        db.commit()
         raw_req = dm.get("requests", {})
         raw_msg = dm.get("messages", {})
         req_count = int(raw_req.get("count", 0)) if isinstance(raw_req, dict) else 0
@@ -92,7 +156,8 @@ def hud(db: sqlite3.Connection) -> None:
     if w_used > 0:
         rate_parts.append(f"w={w_used}/{w_lim}")
     rate_str = f"  {' '.join(rate_parts)}" if rate_parts else ""
-    print(f"[{t_now.strftime('%H:%M:%S UTC')}] {cd_fmt}  seen={seen_count}  agents={agent_count}{me_str}{dm_str}{notif_str}{rate_str}{gap}")
+    stale_str = f"  hud={int(stale_age)}s old" if stale_age else ""
+    print(f"[{t_now.strftime('%H:%M:%S UTC')}] {cd_fmt}  seen={seen_count}  agents={agent_count}{me_str}{dm_str}{notif_str}{rate_str}{gap}{stale_str}")
     if dm_str and ("req" in dm_str or "SUSPENDED" in dm_str) and dm_str not in ("  DM:ok", "  DM:?"):
         print("  *** DM ALERT — run: python molt.py dmrequests ***")
     if notif_str:
@@ -0,0 +1,150 @@
+"""Request metrics — per-call latency phases and outcome, grouped by endpoint template.
+
+req() and the async path record one sample per call: connect (DNS + TCP +
+TLS, summed over attempts that opened a connection), TTFB of the last
+attempt, total wall time, time spent waiting on the rate limiter and backoff,
+response bytes, final status (0 for a transport error) and retries.
+
+Samples sit in an in-memory ring and are appended at exit to
+`request_metrics`, itself a fixed-size ring on disk: row `slot` is reused
+every _CAPACITY samples, so the table never grows. Paths are reduced to
+templates (/posts/{id}/comments) so percentiles aggregate across ids.
+"""
+
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Any, NamedTuple
+
+METRICS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS request_metrics (
+        slot INTEGER PRIMARY KEY,
+        ts REAL NOT NULL,
+        method TEXT NOT NULL,
+        endpoint TEXT NOT NULL,
+        status INTEGER,
+        connect_ms REAL,
+        ttfb_ms REAL,
+        total_ms REAL,
+        wait_ms REAL,
+        bytes INTEGER,
+        retries INTEGER
+    );
+    CREATE INDEX IF NOT EXISTS idx_request_metrics_ts ON request_metrics(ts);
+"""
+
+_CAPACITY = 20_000
+# /<collection>/<x>: x is an id or name unless it is one of these fixed sub-resources.
+_COLLECTIONS = frozenset({"posts", "comments", "agents", "submolts", "conversations", "requests", "read-by-post"})
+_FIXED = frozenset({"me", "dm", "leaderboard"})
+
+
+def endpoint(path: str) -> str:
+    """Endpoint template of an API path: query dropped, ids and names replaced by {id}."""
+    segments = path.split("?", 1)[0].split("/")
+    out: list[str] = []
+    for i, seg in enumerate(segments):
+        out.append("{id}" if i and segments[i - 1] in _COLLECTIONS and seg and seg not in _FIXED else seg)
+    return "/".join(out)
+
+
+class Sample(NamedTuple):
+    ts: float
+    method: str
+    endpoint: str
+    status: int
+    connect_ms: float
+    ttfb_ms: float
+    total_ms: float
+    wait_ms: float
+    bytes: int
+    retries: int
+
+
+class Phases:
+    """Per-call timing scratchpad filled in by the transport (seconds)."""
+
+    __slots__ = ("connect", "ttfb", "wait")
+
+    def __init__(self) -> None:
+        self.connect = 0.0
+        self.ttfb = 0.0
+        self.wait = 0.0
+
+
+class Metrics:
+    def __init__(self, size: int = 2_000) -> None:
+        self._ring: deque[Sample] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(
+        self, method: str, path: str, status: int, phases: Phases, *, total: float, size: int, retries: int,
+    ) -> None:
+        sample = Sample(
+            time.time(), method, endpoint(path), status, round(phases.connect * 1e3, 1),
+            round(phases.ttfb * 1e3, 1), round(total * 1e3, 1), round(phases.wait * 1e3, 1), size, retries,
+        )
+        with self._lock:
+            self._ring.append(sample)
+
+    def pending(self) -> int:
+        return len(self._ring)
+
+    def flush(self, db: sqlite3.Connection) -> None:
+        """Append buffered samples to the on-disk ring and commit. Best-effort."""
+        with self._lock:
+            samples = list(self._ring)
+            self._ring.clear()
+        if not samples:
+            return
+        try:
+            row = db.execute("SELECT value FROM kv WHERE key = 'metrics_seq'").fetchone()
+            seq = int(row[0]) if row else 0
+            db.executemany(
+                "REPLACE INTO request_metrics (slot, ts, method, endpoint, status, connect_ms, ttfb_ms, total_ms, wait_ms, bytes, retries) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [((seq + i) % _CAPACITY, *s) for i, s in enumerate(samples)],
+            )
+            db.execute("REPLACE INTO kv (key, value) VALUES ('metrics_seq', ?)", (str(seq + len(samples)),))
+            db.commit()
+        except sqlite3.Error:
+            pass
+
+
+def percentile(sorted_vals: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list (0.0 when empty); molt.bench uses it too."""
+    if not sorted_vals:
+        return 0.0
+    return sorted_vals[min(len(sorted_vals) - 1, max(0, round(pct / 100 * len(sorted_vals)) - 1))]
+
+
+def summarize(db: sqlite3.Connection, since: float) -> list[dict[str, Any]]:
+    """Per (method, endpoint) since `since`: count, errors, retries, total-time share and phase percentiles.
+
+    Sorted by summed wall time, largest first.
+    """
+    groups: dict[tuple[str, str], list[sqlite3.Row]] = {}
+    for r in db.execute(
+        "SELECT method, endpoint, status, connect_ms, ttfb_ms, total_ms, wait_ms, bytes, retries "
+        "FROM request_metrics WHERE ts >= ?", (since,),
+    ):
+        groups.setdefault((r["method"], r["endpoint"]), []).append(r)
+    out = []
+    for (method, ep), rows in groups.items():
+        total = sorted(r["total_ms"] for r in rows)
+        ttfb = sorted(r["ttfb_ms"] for r in rows)
+        connects = sorted(r["connect_ms"] for r in rows if r["connect_ms"])
+        out.append({
+            "method": method, "endpoint": ep, "count": len(rows),
+            "errors": sum(1 for r in rows if not r["status"] or r["status"] >= 400),
+            "retries": sum(r["retries"] for r in rows),
+            "sum_ms": sum(total),
+            "total": {p: percentile(total, float(p[1:])) for p in ("p50", "p95", "p99")},
+            "ttfb_p50": percentile(ttfb, 50),
+            "connect_p50": percentile(connects, 50),
+            "connects": len(connects),
+            "wait_ms": sum(r["wait_ms"] for r in rows),
+            "bytes_avg": sum(r["bytes"] for r in rows) / len(rows),
+        })
+    return sorted(out, key=lambda g: g["sum_ms"], reverse=True)
@@ -0,0 +1,119 @@
+"""Local mirror reads — `--offline` and `--stale-ok` for feed, sfeed, read, agent and myposts.
+
+Everything those commands fetch already lands in seen_posts, agents and
+my_posts (full comment threads of posts I read go to mirrored_comments, one
+row per comment), so they can answer from the local store when the API is
+slow, rate-limited or down:
+
+- offline: answer only from the store, labelled with its age. req() and
+  parallel_fetch() refuse to touch the network at all.
+- stale-ok: answer from the store at once, then refresh that store on a
+  background thread for the next run (stale-while-revalidate). Anything not
+  mirrored yet is fetched in the foreground as usual.
+"""
+
+import json
+import sqlite3
+import time
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any
+
+from molt.background import spawn
+from molt.db import get_db, transaction
+from molt.timing import fmt_ago
+
+ONLINE = "online"
+STALE_OK = "stale-ok"
+OFFLINE = "offline"
+MODE = ONLINE  # set from --offline / --stale-ok by molt.__main__
+
+OFFLINE_ERROR = {"success": False, "error": "offline (--offline): no network requests"}
+
+
+def label(when: str | None) -> str:
+    return f"({MODE}: local copy from {fmt_ago(when)})"
+
+
+def recent_posts(
+    db: sqlite3.Connection, n: int, offset: int = 0, submolt: str | None = None, sort: str = "new",
+) -> list[sqlite3.Row]:
+    """Posts most recently seen (in `submolt`, if given); hot/top order the page by upvotes."""
+    where, params = ("WHERE submolt = ?", [submolt]) if submolt else ("", [])
+    rows = db.execute(
+        f"SELECT id, author, title, submolt, upvotes, downvotes, comment_count, seen_at FROM seen_posts {where} "
+        "ORDER BY seen_at DESC LIMIT ? OFFSET ?",
+        [*params, n, offset],
+    ).fetchall()
+    return rows if sort == "new" else sorted(rows, key=lambda r: r["upvotes"], reverse=True)
+
+
+def post(db: sqlite3.Connection, post_id: str) -> sqlite3.Row | None:
+    return db.execute(
+        "SELECT id, author, title, submolt, upvotes, downvotes, comment_count, content, seen_at FROM seen_posts WHERE id = ?",
+        (post_id,),
+    ).fetchone()
+
+
+def agent(db: sqlite3.Connection, name: str) -> sqlite3.Row | None:
+    return db.execute(
+        "SELECT name, description, karma, followers, posts_count, comments_count, note, last_seen FROM agents WHERE name = ?",
+        (name,),
+    ).fetchone()
+
+
+def thread(db: sqlite3.Connection, post_id: str) -> sqlite3.Row | None:
+    """The mirrored copy of post_id's comment thread: fetched_at, count, complete."""
+    return db.execute("SELECT fetched_at, count, complete FROM mirrored_threads WHERE post_id = ?", (post_id,)).fetchone()
+
+
+def thread_comments(db: sqlite3.Connection, post_id: str, copy: sqlite3.Row) -> Iterator[dict[str, Any]]:
+    """The comments of a thread() copy in order, read a row at a time."""
+    for (body,) in db.execute(
+        "SELECT body FROM mirrored_comments WHERE post_id = ? AND fetched_at = ? ORDER BY pos", (post_id, copy["fetched_at"]),
+    ):
+        yield json.loads(body)
+
+
+def record_thread(
+    db: sqlite3.Connection, post_id: str, comments: Iterable[dict[str, Any]], failures: list[dict[str, Any]],
+) -> Iterator[dict[str, Any]]:
+    """Yield `comments`, storing each one as it passes as a new copy of post_id's thread.
+
+    Once they run out, the new copy replaces the mirrored one if it is complete
+    (nothing was added to `failures`). An incomplete copy is kept only in place
+    of another incomplete one, marked as such; a complete copy is never replaced
+    by a truncated fetch.
+    """
+    fetched_at, n = time.time(), 0
+    for c in comments:
+        db.execute(
+            "INSERT INTO mirrored_comments (post_id, fetched_at, pos, body) VALUES (?, ?, ?, ?)",
+            (post_id, fetched_at, n, json.dumps(c)),
+        )
+        n += 1
+        yield c
+    old = thread(db, post_id)
+    if not failures or old is None or not old["complete"]:
+        db.execute(
+            "REPLACE INTO mirrored_threads (post_id, fetched_at, count, complete) VALUES (?, ?, ?, ?)",
+            (post_id, fetched_at, n, int(not failures)),
+        )
+    db.execute(  # every copy but the current one, including any left by an interrupted fetch
+        "DELETE FROM mirrored_comments WHERE post_id = ? AND fetched_at != "
+        "(SELECT fetched_at FROM mirrored_threads WHERE post_id = ?)",
+        (post_id, post_id),
+    )
+
+
+def revalidate(refresh: Callable[[sqlite3.Connection], Any]) -> None:
+    """Run refresh(db) on a background thread with a connection of its own, committed once."""
+
+    def run() -> None:
+        db = get_db()
+        try:
+            with transaction(db):
+                refresh(db)
+        finally:
+            db.close()
+
+    spawn(run)
@@ -0,0 +1,220 @@
+"""`--profile` — where a command's wall time goes: network, SQLite, solver, stdout.
+
+Profiler.install() wraps the shared entry points rather than any command:
+req / parallel_fetch / paginate and handle_verification in molt.api (rebinding
+every already-imported molt module that holds the originals, so commands
+imported later pick up the wrappers), sqlite3.connect (connections and their
+cursors time execute/fetch/commit) and sys.stdout.write. Time is attributed
+exclusively to the innermost category on the main thread: a review's SELECTs
+inside a verification retry count as sqlite, not solver. Whatever is left is
+"other" (Python, imports, argument parsing).
+
+With a path, the command also runs under cProfile (pstats dump at PATH) while
+a sampler thread records main-thread stacks every millisecond into
+PATH.folded, one `frame;frame;frame count` line per stack, the collapsed
+format flamegraph.pl and speedscope read.
+"""
+
+import cProfile
+import functools
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from types import FrameType
+from typing import Any, TextIO
+
+CATEGORIES = ("network", "sqlite", "solver", "stdout")
+_SAMPLE_EVERY = 0.001
+
+
+class Profiler:
+    def __init__(self) -> None:
+        self.totals: dict[str, float] = dict.fromkeys(CATEGORIES, 0.0)
+        self.calls: Counter[str] = Counter()
+        self.active = False
+        self._main = threading.main_thread()
+        self._stack: list[list[float]] = []  # [start, time spent in nested categories]
+
+    # --- attribution -------------------------------------------------------
+
+    def _enter(self) -> None:
+        self._stack.append([time.perf_counter(), 0.0])
+
+    def _exit(self, category: str) -> None:
+        start, nested = self._stack.pop()
+        elapsed = time.perf_counter() - start
+        self.totals[category] += elapsed - nested
+        self.calls[category] += 1
+        if self._stack:
+            self._stack[-1][1] += elapsed
+
+    def _tracking(self) -> bool:
+        return self.active and threading.current_thread() is self._main
+
+    def timed(self, category: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not self._tracking():
+                return fn(*args, **kwargs)
+            self._enter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._exit(category)
+
+        return wrapper
+
+    def timed_iter(self, category: str, fn: Callable[..., Iterator[Any]]) -> Callable[..., Iterator[Any]]:
+        """Like timed(), for a generator function: each step of the iterator is timed."""
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Iterator[Any]:
+            it = fn(*args, **kwargs)
+            step = self.timed(category, lambda: next(it, _DONE))
+            while (item := step()) is not _DONE:
+                yield item
+
+        return wrapper
+
+    # --- installation ------------------------------------------------------
+
+    def install(self) -> None:
+        """Wrap the network, sqlite, solver and stdout entry points for the rest of the process."""
+        from molt import api  # noqa: PLC0415
+
+        originals = {
+            "req": (api.req, self.timed("network", api.req)),
+            "parallel_fetch": (api.parallel_fetch, self.timed("network", api.parallel_fetch)),
+            "paginate": (api.paginate, self.timed_iter("network", api.paginate)),
+            "handle_verification": (api.handle_verification, self.timed("solver", api.handle_verification)),
+        }
+        for mod in [m for name, m in sys.modules.items() if name == "molt" or name.startswith("molt.")]:
+            for attr, (orig, wrapped) in originals.items():
+                if getattr(mod, attr, None) is orig:
+                    setattr(mod, attr, wrapped)
+        sqlite3.connect = _profiling_connect(self, sqlite3.connect)  # type: ignore[assignment]
+        sys.stdout = _TimedStream(self, sys.stdout)
+
+    # --- reporting ---------------------------------------------------------
+
+    def report(self, label: str, wall: float, out: TextIO) -> None:
+        other = max(0.0, wall - sum(self.totals.values()))
+        out.write(f"\n--- profile: {label}  {wall:.3f}s wall (main thread) ---\n")
+        for cat in (*CATEGORIES, "other"):
+            secs = other if cat == "other" else self.totals[cat]
+            calls = f"  ({self.calls[cat]} calls)" if cat != "other" else ""
+            out.write(f"  {cat:<8} {secs:8.3f}s {secs / wall if wall else 0:>6.1%}{calls}\n")
+
+
+_DONE = object()
+
+
+class _TimedStream:
+    """sys.stdout stand-in timing write() and flush()."""
+
+    def __init__(self, profiler: Profiler, stream: TextIO) -> None:
+        self._stream = stream
+        self.write = profiler.timed("stdout", stream.write)
+        self.flush = profiler.timed("stdout", stream.flush)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._stream, name)
+
+
+def _profiling_connect(profiler: Profiler, connect: Callable[..., sqlite3.Connection]) -> Callable[..., sqlite3.Connection]:
+    """sqlite3.connect returning a timed subclass of whatever connection factory the caller asked for."""
+    timed = profiler.timed
+
+    class ProfilingCursor(sqlite3.Cursor):
+        execute = timed("sqlite", sqlite3.Cursor.execute)
+        executemany = timed("sqlite", sqlite3.Cursor.executemany)
+        executescript = timed("sqlite", sqlite3.Cursor.executescript)
+        fetchone = timed("sqlite", sqlite3.Cursor.fetchone)
+        fetchmany = timed("sqlite", sqlite3.Cursor.fetchmany)
+        fetchall = timed("sqlite", sqlite3.Cursor.fetchall)
+        __next__ = timed("sqlite", sqlite3.Cursor.__next__)
+
+    @functools.cache
+    def profiling(base: type[sqlite3.Connection]) -> type[sqlite3.Connection]:
+        class ProfilingConnection(base):  # type: ignore[valid-type,misc]
+            def cursor(self, factory: Any = ProfilingCursor) -> sqlite3.Cursor:
+                return super().cursor(factory)
+
+            def execute(self, sql: str, parameters: Any = (), /) -> sqlite3.Cursor:
+                return self.cursor().execute(sql, parameters)
+
+            def executemany(self, sql: str, parameters: Any, /) -> sqlite3.Cursor:
+                return self.cursor().executemany(sql, parameters)
+
+            def executescript(self, script: str, /) -> sqlite3.Cursor:
+                return self.cursor().executescript(script)
+
+            commit = timed("sqlite", base.commit)
+            rollback = timed("sqlite", base.rollback)
+
+        return ProfilingConnection
+
+    @functools.wraps(connect)
+    def wrapper(*args: Any, **kwargs: Any) -> sqlite3.Connection:
+        kwargs["factory"] = profiling(kwargs.get("factory", sqlite3.Connection))
+        return connect(*args, **kwargs)
+
+    return wrapper
+
+
+def _frame_name(frame: FrameType) -> str:
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}.{frame.f_code.co_name}"
+
+
+class _Sampler(threading.Thread):
+    """Samples the main thread's stack every _SAMPLE_EVERY seconds into collapsed-stack counts."""
+
+    def __init__(self) -> None:
+        super().__init__(name="profile-sampler", daemon=True)
+        self.stacks: Counter[str] = Counter()
+        self._target = threading.main_thread().ident
+        self._done = threading.Event()
+
+    def run(self) -> None:
+        while not self._done.wait(_SAMPLE_EVERY):
+            frame = sys._current_frames().get(self._target)  # noqa: SLF001
+            names: list[str] = []
+            while frame is not None:
+                names.append(_frame_name(frame))
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def finish(self) -> None:
+        self._done.set()
+        self.join()
+
+
+def run(label: str, fn: Callable[[], Any], profiler: Profiler, dump: Path | None = None) -> Any:
+    """Call fn() with `profiler` attributing time; report to stderr, plus pstats and collapsed stacks at `dump`."""
+    prof = cProfile.Profile() if dump else None
+    sampler = _Sampler() if dump else None
+    if sampler:
+        sampler.start()
+    profiler.active = True
+    start = time.perf_counter()
+    try:
+        if prof:
+            return prof.runcall(fn)
+        return fn()
+    finally:
+        wall = time.perf_counter() - start
+        profiler.active = False
+        profiler.report(label, wall, sys.stderr)
+        if prof and sampler and dump:
+            sampler.finish()
+            prof.dump_stats(dump)
+            folded = dump.with_name(dump.name + ".folded")
+            folded.write_text("".join(f"{stack} {n}\n" for stack, n in sampler.stacks.most_common()), encoding="utf-8")
+            sys.stderr.write(f"  pstats: {dump}  (python -m pstats {dump})\n")
+            sys.stderr.write(f"  collapsed stacks: {folded}  (flamegraph.pl / speedscope)\n")
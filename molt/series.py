@@ -0,0 +1,143 @@
+"""Engagement time series — append-only snapshots of my posts' and comments' counters.
+
+`review` and `myposts` append (entity, ts, upvotes, downvotes, comments) for
+every post (`post:<id>`) and comment (`comment:<id>`, replies as comments)
+they see, skipping a row identical to the entity's newest one. A series is
+therefore a step function: the value at time x is the newest snapshot at or
+before x.
+
+compact() thins old history: past _FINE_FOR only the last snapshot of each
+hour survives, past _HOURLY_FOR the last of each day, and snapshots older than
+_RETAIN are dropped, except an entity's newest, which is always kept.
+"""
+
+import sqlite3
+import statistics
+from collections.abc import Iterable
+from datetime import UTC, datetime
+
+from molt.timing import epoch
+
+SERIES_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS engagement (
+        entity TEXT NOT NULL,
+        ts INTEGER NOT NULL,
+        upvotes INTEGER NOT NULL DEFAULT 0,
+        downvotes INTEGER NOT NULL DEFAULT 0,
+        comments INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (entity, ts)
+    ) WITHOUT ROWID
+"""
+
+HOUR = 3600
+DAY = 24 * HOUR
+_FINE_FOR = 2 * DAY
+_HOURLY_FOR = 30 * DAY
+_RETAIN = 365 * DAY
+_COMPACT_EVERY = DAY
+
+Snapshot = tuple[str, int, int, int]  # (entity, upvotes, downvotes, comments)
+
+
+def snapshot(db: sqlite3.Connection, rows: Iterable[Snapshot], t: float) -> None:
+    """Append one snapshot per entity at time t, unless it equals the entity's newest. Does not commit."""
+    db.executemany(
+        "INSERT OR REPLACE INTO engagement (entity, ts, upvotes, downvotes, comments) "
+        "SELECT :e, :t, :u, :d, :c WHERE NOT EXISTS ("
+        "  SELECT 1 FROM (SELECT upvotes, downvotes, comments FROM engagement WHERE entity = :e ORDER BY ts DESC LIMIT 1)"
+        "  WHERE upvotes = :u AND downvotes = :d AND comments = :c)",
+        [{"e": e, "t": int(t), "u": u or 0, "d": d or 0, "c": c or 0} for e, u, d, c in rows],
+    )
+
+
+def value_at(db: sqlite3.Connection, entity: str, ts: float) -> sqlite3.Row | None:
+    """The entity's counters as of `ts` (newest snapshot at or before it), or None if it had none yet."""
+    return db.execute(
+        "SELECT ts, upvotes, downvotes, comments FROM engagement WHERE entity = ? AND ts <= ? ORDER BY ts DESC LIMIT 1",
+        (entity, int(ts)),
+    ).fetchone()
+
+
+def velocity(db: sqlite3.Connection, entity: str, t: float, window: float = 6 * HOUR) -> float:
+    """Upvotes gained per hour over the `window` seconds before t."""
+    end, start = value_at(db, entity, t), value_at(db, entity, t - window)
+    if end is None:
+        return 0.0
+    return (end["upvotes"] - (start["upvotes"] if start else 0)) / (window / HOUR)
+
+
+def time_to(db: sqlite3.Connection, entity: str, n: int, created_at: str | None) -> float | None:
+    """Seconds from creation until the first snapshot with at least n upvotes, or None if not there (yet)."""
+    created = epoch(created_at)
+    row = db.execute("SELECT MIN(ts) FROM engagement WHERE entity = ? AND upvotes >= ?", (entity, n)).fetchone()
+    if created is None or row[0] is None:
+        return None
+    return max(0.0, row[0] - created)
+
+
+def median_time_to(db: sqlite3.Connection, n: int) -> tuple[float | None, int, int]:
+    """(median seconds to n upvotes, posts that got there, live posts that did not) over my live posts."""
+    reached: list[float] = []
+    missed = 0
+    for r in db.execute("SELECT id, posted_at FROM my_posts WHERE removed_at IS NULL ORDER BY posted_at").fetchall():
+        secs = time_to(db, f"post:{r['id']}", n, r["posted_at"])
+        if secs is None:
+            missed += 1
+        else:
+            reached.append(secs)
+    return (statistics.median(reached) if reached else None), len(reached), missed
+
+
+def hourly_rollup(db: sqlite3.Connection, t: float, horizon: float = DAY) -> list[sqlite3.Row]:
+    """Per UTC hour-of-day posted: post count and mean upvotes/comments `horizon` seconds after posting.
+
+    Only posts at least `horizon` old with a snapshot by then take part.
+    """
+    cutoff = datetime.fromtimestamp(t - horizon, UTC).isoformat()  # same format as posted_at
+    return db.execute(
+        "SELECT CAST(strftime('%H', p.posted_at) AS INTEGER) AS hour, COUNT(*) AS posts, "
+        "AVG(s.upvotes) AS upvotes, AVG(s.comments) AS comments "
+        "FROM my_posts p JOIN engagement s ON s.entity = 'post:' || p.id AND s.ts = ("
+        "  SELECT MAX(ts) FROM engagement WHERE entity = 'post:' || p.id "
+        "  AND ts <= CAST(strftime('%s', p.posted_at) AS INTEGER) + ?) "
+        "WHERE p.removed_at IS NULL AND p.posted_at < ? GROUP BY hour ORDER BY hour",
+        (int(horizon), cutoff),
+    ).fetchall()
+
+
+def compact(db: sqlite3.Connection, t: float) -> int:
+    """Downsample and expire old snapshots. Returns rows removed. Does not commit."""
+    removed = 0
+    for older_than, bucket in ((_FINE_FOR, HOUR), (_HOURLY_FOR, DAY)):
+        removed += db.execute(
+            "DELETE FROM engagement WHERE ts < ? AND EXISTS ("
+            "  SELECT 1 FROM engagement n WHERE n.entity = engagement.entity"
+            "  AND n.ts > engagement.ts AND n.ts < (engagement.ts / ? + 1) * ?)",
+            (int(t - older_than), bucket, bucket),
+        ).rowcount
+    removed += db.execute(
+        "DELETE FROM engagement WHERE ts < ? AND EXISTS ("
+        "  SELECT 1 FROM engagement n WHERE n.entity = engagement.entity AND n.ts > engagement.ts)",
+        (int(t - _RETAIN),),
+    ).rowcount
+    return removed
+
+
+def maybe_compact(db: sqlite3.Connection, t: float) -> None:
+    """compact() at most once per _COMPACT_EVERY, tracked in kv. Does not commit."""
+    row = db.execute("SELECT value FROM kv WHERE key = 'engagement_compacted_at'").fetchone()
+    if row is not None and t - float(row[0]) < _COMPACT_EVERY:
+        return
+    compact(db, t)
+    db.execute("REPLACE INTO kv (key, value) VALUES ('engagement_compacted_at', ?)", (str(t),))
+
+
+def backfill(db: sqlite3.Connection) -> None:
+    """Seed the series with the counters my_posts/my_comments hold now (used by the migration)."""
+    for sql, prefix in (
+        ("SELECT id, upvotes, downvotes, comment_count, last_checked FROM my_posts", "post"),
+        ("SELECT id, upvotes, 0, reply_count, last_checked FROM my_comments", "comment"),
+    ):
+        for r in db.execute(sql).fetchall():
+            if (t := epoch(r[4])) is not None:
+                snapshot(db, [(f"{prefix}:{r[0]}", r[1], r[2], r[3])], t)
@@ -1,5 +1,6 @@
 """Verification challenge solver."""
 
+import functools
 import re
 
 WORD_TO_NUM: dict[str, int] = {
@@ -39,25 +40,52 @@ def decode_obfuscated(text: str) -> str:
     return " ".join(decoded)
 
 
+_INSERT_LETTERS = "abcdefghilmnorstuvy"  # letters the obfuscator is known to drop
+
+
+def _build_fuzzy_tables() -> tuple[dict[str, int], dict[str, int], frozenset[int]]:
+    """Precompute the dropped-letter and truncation matches _fuzzy_num would otherwise search for.
+
+    dropped: token -> value where inserting one _INSERT_LETTERS letter gives a number word.
+      When several insertions match, keep the one a left-to-right scan (position, then
+      letter order) would hit first.
+    prefixes: truncated token -> value of the first number word (dict order) it prefixes.
+    """
+    dropped: dict[str, tuple[tuple[int, int], int]] = {}
+    for word, val in WORD_TO_NUM.items():
+        for i, c in enumerate(word):
+            if c not in _INSERT_LETTERS:
+                continue
+            rank = (i, _INSERT_LETTERS.index(c))
+            token = word[:i] + word[i + 1:]
+            if token not in dropped or rank < dropped[token][0]:
+                dropped[token] = (rank, val)
+    prefixes: dict[str, int] = {}
+    for word, val in WORD_TO_NUM.items():
+        for n in range(max(len(word) - 2, 1), len(word)):
+            prefixes.setdefault(word[:n], val)
+    lengths = frozenset(len(w) for w in WORD_TO_NUM)
+    return {t: v for t, (_, v) in dropped.items()}, prefixes, lengths
+
+
+_DROPPED, _PREFIXES, _WORD_LENGTHS = _build_fuzzy_tables()
+
+
+@functools.lru_cache(maxsize=4096)
 def _fuzzy_num(token: str) -> int | None:
     """Match potentially corrupted number words (dropped/extra letters, truncation)."""
     if token in WORD_TO_NUM:
         return WORD_TO_NUM[token]
     if len(token) < 3 or token in _NOT_NUMBERS:
         return None
-    for i in range(len(token) + 1):
-        for c in "abcdefghilmnorstuvy":
-            candidate = token[:i] + c + token[i:]
+    if token in _DROPPED:
+        return _DROPPED[token]
+    if len(token) - 1 in _WORD_LENGTHS:
+        for i in range(len(token)):
+            candidate = token[:i] + token[i + 1:]
             if candidate in WORD_TO_NUM:
                 return WORD_TO_NUM[candidate]
-    for i in range(len(token)):
-        candidate = token[:i] + token[i + 1:]
-        if candidate in WORD_TO_NUM:
-            return WORD_TO_NUM[candidate]
-    for word, val in WORD_TO_NUM.items():
-        if word.startswith(token) and len(token) >= len(word) - 2:
-            return val
-    return None
+    return _PREFIXES.get(token)
 
 
 def words_to_number(words: list[str]) -> int:
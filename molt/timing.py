@@ -13,6 +13,17 @@ def now_iso() -> str:
     return now().isoformat()
 
 
+def epoch(iso_str: str | None) -> float | None:
+    """Unix time of an ISO-8601 timestamp (naive means UTC), or None if missing or unparseable."""
+    if not iso_str:
+        return None
+    try:
+        dt = datetime.fromisoformat(iso_str)
+    except ValueError:
+        return None
+    return (dt if dt.tzinfo else dt.replace(tzinfo=UTC)).timestamp()
+
+
 def fmt_ago(iso_str: str | None) -> str:
     if not iso_str:
         return "never"
@@ -6,6 +6,8 @@ from collections.abc import Iterator
 
 import pytest
 
+from molt.db import migrate
+
 os.environ["MOLTBOOK_API_KEY"] = "test_key_not_real"
 
 
@@ -13,60 +15,6 @@ os.environ["MOLTBOOK_API_KEY"] = "test_key_not_real"
 def memdb() -> Iterator[sqlite3.Connection]:
     db = sqlite3.connect(":memory:")
     db.row_factory = sqlite3.Row
-    db.execute("PRAGMA journal_mode=WAL")
-    db.executescript("""
-        CREATE TABLE IF NOT EXISTS seen_posts (
-            id TEXT PRIMARY KEY,
-            author TEXT,
-            title TEXT,
-            submolt TEXT,
-            upvotes INTEGER DEFAULT 0,
-            downvotes INTEGER DEFAULT 0,
-            comment_count INTEGER DEFAULT 0,
-            content TEXT,
-            seen_at TEXT
-        );
-        CREATE TABLE IF NOT EXISTS my_posts (
-            id TEXT PRIMARY KEY,
-            submolt TEXT,
-            title TEXT,
-            posted_at TEXT,
-            upvotes INTEGER DEFAULT 0,
-            downvotes INTEGER DEFAULT 0,
-            comment_count INTEGER DEFAULT 0,
-            last_checked TEXT,
-            removed_at TEXT
-        );
-        CREATE TABLE IF NOT EXISTS my_comments (
-            id TEXT PRIMARY KEY,
-            post_id TEXT,
-            post_author TEXT,
-            content TEXT,
-            commented_at TEXT,
-            upvotes INTEGER DEFAULT 0,
-            reply_count INTEGER DEFAULT 0,
-            hypothesis TEXT,
-            last_checked TEXT,
-            removed_at TEXT
-        );
-        CREATE TABLE IF NOT EXISTS agents (
-            name TEXT PRIMARY KEY,
-            description TEXT,
-            karma INTEGER DEFAULT 0,
-            followers INTEGER DEFAULT 0,
-            posts_count INTEGER DEFAULT 0,
-            comments_count INTEGER DEFAULT 0,
-            note TEXT,
-            first_seen TEXT,
-            last_seen TEXT
-        );
-        CREATE TABLE IF NOT EXISTS actions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            at TEXT,
-            action TEXT,
-            detail TEXT
-        );
-        CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT);
-    """)
+    migrate(db)
     yield db
     db.close()
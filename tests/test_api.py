@@ -1,6 +1,137 @@
 """Tests for molt.api."""
 
-from molt.api import _check_get, _check_post, _find_verification
+import json
+import socket
+import sqlite3
+import threading
+import time
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+import molt.aio
+import molt.api
+import molt.http_policy
+from molt.api import (
+    _check_get,
+    _check_post,
+    _ConnectionPool,
+    _find_verification,
+    _RateTracker,
+    paginate,
+    parallel_fetch,
+    rate_usage,
+    req,
+)
+from molt.audit import AuditLog
+from molt.commands.write import cmd_post_file
+from molt.db import kv_get, log_action, open_db, transaction
+from molt.metrics import Metrics
+
+
+class _StandIn(BaseHTTPRequestHandler):
+    """Keep-alive JSON server that records which client socket served each request."""
+
+    protocol_version = "HTTP/1.1"
+    peers: list[tuple[str, int]]
+    # path -> [(status, retry_after), ...] served before falling through to 200
+    failures: dict[str, list[tuple[int, str | None]]]
+
+    def do_GET(self) -> None:
+        self.peers.append(self.client_address)
+        queued = self.failures.get(self.path)
+        if queued:
+            status, retry_after = queued.pop(0)
+            self._reply(status, {"success": False, "error": f"status {status}"}, retry_after)
+        elif self.path.endswith("/slow"):
+            time.sleep(1.0)
+            self._reply(200, {"success": True, "path": self.path})
+        elif self.path.endswith("/chunked"):
+            self.send_response(200)
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for piece in (b'{"success": true, ', b'"chunks": 2}'):
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(piece), piece))
+            self.wfile.write(b"0\r\n\r\n")
+        elif self.path.endswith("/etag"):
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.send_header("ETag", '"v1"')
+                self.end_headers()
+            else:
+                self._reply(200, {"success": True, "path": self.path}, etag='"v1"')
+        elif self.path.endswith(("/moved", "/offsite")):
+            self._redirect()
+        elif self.path.endswith("/missing"):
+            self._reply(404, {"success": False, "error": "Not found", "hint": "check the id"})
+        else:
+            self._reply(200, {"success": True, "path": self.path})
+
+    def do_POST(self) -> None:
+        self.peers.append(self.client_address)
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if self.failures.get(self.path):
+            status, retry_after = self.failures[self.path].pop(0)
+            self._reply(status, {"success": False, "error": f"status {status}"}, retry_after)
+        elif self.path.endswith(("/moved", "/offsite")):
+            self._redirect()
+        else:
+            self._reply(200, {"success": True, "echo": body})
+
+    def _reply(
+        self, status: int, payload: dict[str, object], retry_after: str | None = None, etag: str | None = None,
+    ) -> None:
+        raw = json.dumps(payload).encode()
+        self.send_response(status)
+        if retry_after is not None:
+            self.send_header("Retry-After", retry_after)
+        if etag is not None:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def _redirect(self) -> None:
+        """/x/moved -> /x/target on this host (307 for a POST, 301 otherwise); /offsite -> another host."""
+        if self.path.endswith("/offsite"):
+            status, location = 302, "http://elsewhere.invalid/api/v1/target"
+        else:
+            status, location = (307 if self.command == "POST" else 301), self.path.removesuffix("/moved") + "/target"
+        self.send_response(status)
+        self.send_header("Location", location)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+stand_in_failures: dict[str, list[tuple[int, str | None]]] = {}
+
+
+@pytest.fixture
+def stand_in(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Iterator[list[tuple[str, int]]]:
+    peers: list[tuple[str, int]] = []
+    handler = type("Handler", (_StandIn,), {"peers": peers, "failures": {}})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    pool = _ConnectionPool(size=4)
+    monkeypatch.setattr(molt.api, "API", f"http://127.0.0.1:{server.server_port}/api/v1")
+    monkeypatch.setattr(molt.api, "DB_PATH", tmp_path / "molt.db")
+    monkeypatch.setattr(molt.api, "_audit", AuditLog(tmp_path / "api.log"))
+    monkeypatch.setattr(molt.api, "_pool", pool)
+    monkeypatch.setattr(molt.api, "_rate", _RateTracker())
+    monkeypatch.setattr(molt.api, "_metrics", Metrics())
+    monkeypatch.setattr(molt.http_policy, "BACKOFF_BASE", 0.01)
+    stand_in_failures.clear()
+    handler.failures = stand_in_failures
+    yield peers
+    pool.close_all()
+    server.shutdown()
+    server.server_close()
 
 
 class TestCheckGet:
@@ -70,3 +201,352 @@ class TestFindVerification:
     def test_empty_verification_object(self) -> None:
         d = {"success": True, "comment": {"id": "c1", "verification": {"note": "not a real challenge"}}}
         assert _find_verification(d) is None
+
+
+class TestConnectionPool:
+    def test_sequential_requests_share_one_connection(self, stand_in: list[tuple[str, int]]) -> None:
+        for i in range(5):
+            assert req("GET", f"/posts/{i}")["path"] == f"/api/v1/posts/{i}"
+        assert len(set(stand_in)) == 1
+        assert molt.api._pool.opened == 1
+
+    def test_parallel_fetch_bounded_by_workers(self, stand_in: list[tuple[str, int]]) -> None:
+        calls = [("GET", f"/posts/{i}") for i in range(40)]
+        results = parallel_fetch(calls, max_workers=4)
+        assert [r["path"] for r in results] == [f"/api/v1{p}" for _, p in calls]
+        assert len(set(stand_in)) <= 4
+        assert molt.api._pool.opened == 0  # async engine keeps its own per-run connections
+
+    def test_reconnects_after_server_drops_idle_socket(self, stand_in: list[tuple[str, int]]) -> None:
+        req("GET", "/a")
+        for idle in molt.api._pool._idle.values():
+            for conn in idle:
+                assert conn.sock is not None
+                conn.sock.shutdown(socket.SHUT_RDWR)  # keep-alive socket went dead while idle
+        assert req("GET", "/b")["success"] is True
+        assert molt.api._pool.opened == 2
+
+    def test_post_body_and_error_hint(self, stand_in: list[tuple[str, int]]) -> None:
+        assert req("POST", "/echo", {"x": 1})["echo"] == {"x": 1}
+        d = req("GET", "/missing")
+        assert d["error"] == "Not found — check the id"
+        assert len(set(stand_in)) == 1
+
+
+class TestRedirects:
+    def test_same_host_redirect_followed(self, stand_in: list[tuple[str, int]]) -> None:
+        assert req("GET", "/posts/moved")["path"] == "/api/v1/posts/target"
+        assert req("POST", "/posts/moved", {"title": "t"})["echo"] == {"title": "t"}  # 307 keeps method and body
+        assert parallel_fetch([("GET", "/a/moved")])[0]["path"] == "/api/v1/a/target"
+
+    def test_other_host_not_followed(self, stand_in: list[tuple[str, int]]) -> None:
+        assert req("GET", "/offsite") == {"success": False, "error": "HTTP 302: redirect not followed"}
+        assert parallel_fetch([("GET", "/offsite")])[0]["error"] == "HTTP 302: redirect not followed"
+
+
+class TestAsyncFetch:
+    def test_concurrency_above_eight_still_reuses_connections(self, stand_in: list[tuple[str, int]]) -> None:
+        calls = [("GET", f"/posts/{i}") for i in range(60)]
+        results = parallel_fetch(calls, max_workers=16)
+        assert [r["path"] for r in results] == [f"/api/v1{p}" for _, p in calls]
+        assert 1 <= len(set(stand_in)) <= 16
+
+    def test_chunked_body_and_error_hint(self, stand_in: list[tuple[str, int]]) -> None:
+        chunked, missing = parallel_fetch([("GET", "/chunked"), ("GET", "/missing")])
+        assert chunked == {"success": True, "chunks": 2}
+        assert missing["error"] == "Not found — check the id"
+
+    def test_retries_through_async_path(self, stand_in: list[tuple[str, int]]) -> None:
+        stand_in_failures["/api/v1/flaky"] = [(503, None), (429, "0")]
+        (d,) = parallel_fetch([("GET", "/flaky")])
+        assert d["success"] is True
+        assert len(stand_in) == 3
+
+    def test_deadline_cancels_stragglers(self, stand_in: list[tuple[str, int]]) -> None:
+        start = time.monotonic()
+        fast, slow = parallel_fetch([("GET", "/a"), ("GET", "/slow")], deadline=0.3)
+        assert time.monotonic() - start < 0.9
+        assert fast["success"] is True
+        assert slow == {"success": False, "error": "deadline exceeded"}
+
+    def test_empty_batch(self) -> None:
+        assert parallel_fetch([]) == []
+
+
+class TestPaginate:
+    @pytest.fixture
+    def pages(self, monkeypatch: pytest.MonkeyPatch) -> list[str]:
+        """120-comment thread served by offset; returns the paths requested."""
+        comments = [{"id": f"c{i}"} for i in range(120)]
+        requested: list[str] = []
+
+        def fake_req(method: str, path: str, *_a: object, **_kw: object) -> dict[str, object]:
+            requested.append(path)
+            query = dict(kv.split("=") for kv in path.split("?", 1)[1].split("&"))
+            off, limit = int(query.get("offset", 0)), int(query["limit"])
+            return {"success": True, "comments": comments[off:off + limit]}
+
+        monkeypatch.setattr(molt.api, "req", fake_req)
+        return requested
+
+    def test_streams_every_page(self, pages: list[str]) -> None:
+        ids = [c["id"] for c in paginate("/posts/p/comments?sort=top", "comments")]
+        assert ids == [f"c{i}" for i in range(120)]
+        assert pages == [f"/posts/p/comments?sort=top&limit=50&offset={o}" for o in (0, 50, 100)]  # short page ends it
+
+    def test_early_exit_fetches_at_most_one_page_ahead(self, pages: list[str]) -> None:
+        for c in paginate("/posts/p/comments", "comments", page_size=10, start=20):
+            if c["id"] == "c25":
+                break
+        time.sleep(0.05)  # let the prefetch land
+        assert pages == ["/posts/p/comments?limit=10&offset=20", "/posts/p/comments?limit=10&offset=30"]
+
+    def test_follows_cursor_and_stops_on_error(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        responses = {
+            "/feed?limit=2&offset=0": {"posts": [{"id": 1}, {"id": 2}], "next_cursor": "a b"},
+            "/feed?limit=2&cursor=a%20b": {"posts": [{"id": 3}, {"id": 4}], "next_cursor": "z"},
+            "/feed?limit=2&cursor=z": {"success": False, "error": "status 500"},
+        }
+        monkeypatch.setattr(molt.api, "req", lambda _m, path, *_a, **_kw: responses[path])
+        failures: list[dict[str, object]] = []
+        assert [p["id"] for p in paginate("/feed", "posts", page_size=2, prefetch=False, failures=failures)] == [1, 2, 3, 4]
+        assert failures == [{"success": False, "error": "status 500"}]
+
+    def test_reports_the_page_cap_as_a_failure(self, pages: list[str]) -> None:
+        failures: list[dict[str, object]] = []
+        assert len(list(paginate("/posts/p/comments", "comments", max_pages=2, failures=failures))) == 100
+        assert failures == [{"success": False, "error": "stopped after 2 pages"}]
+        failures.clear()
+        assert len(list(paginate("/posts/p/comments", "comments", failures=failures))) == 120
+        assert not failures
+
+    def test_stops_when_offset_is_ignored(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(molt.api, "req", lambda *_a, **_kw: {"comments": [{"id": "same"}] * 5})
+        assert len(list(paginate("/x", "comments", page_size=5))) == 5
+
+
+class TestRequestMetrics:
+    def test_req_records_phases_and_retries(self, stand_in: list[tuple[str, int]]) -> None:
+        stand_in_failures["/api/v1/posts/1"] = [(503, None)]
+        req("GET", "/posts/1")
+        req("GET", "/posts/2?x=1")
+        first, second = molt.api._metrics._ring
+        assert (first.endpoint, first.status, first.retries) == ("/posts/{id}", 200, 1)
+        assert first.connect_ms > 0
+        assert first.ttfb_ms > 0
+        assert first.total_ms >= first.ttfb_ms
+        assert first.bytes > 0
+        assert second.connect_ms == 0  # reused the keep-alive connection
+
+    def test_async_path_records_too(self, stand_in: list[tuple[str, int]]) -> None:
+        parallel_fetch([("GET", "/posts/1"), ("GET", "/posts/1/missing")])
+        assert sorted(s.status for s in molt.api._metrics._ring) == [200, 404]
+
+
+class TestConditional:
+    def test_etag_round_trip(self, stand_in: list[tuple[str, int]]) -> None:
+        first = req("GET", "/posts/1/etag", conditional={})
+        assert first["_etag"] == '"v1"'
+        assert req("GET", "/posts/1/etag", conditional={"If-None-Match": first["_etag"]}) == {"success": True, "not_modified": True}
+        assert "_etag" not in req("GET", "/posts/1/etag")  # plain requests stay as they were
+
+    def test_async_path_matches(self, stand_in: list[tuple[str, int]]) -> None:
+        fresh, same, stale = parallel_fetch([
+            ("GET", "/posts/1/etag", {}),
+            ("GET", "/posts/1/etag", {"If-None-Match": '"v1"'}),
+            ("GET", "/posts/1/etag", {"If-None-Match": '"v0"'}),
+        ])
+        assert fresh["_etag"] == stale["_etag"] == '"v1"'
+        assert same == {"success": True, "not_modified": True}
+
+
+class TestRetry:
+    def test_get_retried_through_5xx(self, stand_in: list[tuple[str, int]]) -> None:
+        stand_in_failures["/api/v1/posts/1"] = [(503, None), (502, None)]
+        assert req("GET", "/posts/1")["success"] is True
+        assert len(stand_in) == 3
+
+    def test_honors_retry_after(self, stand_in: list[tuple[str, int]]) -> None:
+        stand_in_failures["/api/v1/posts/1"] = [(429, "1")]
+        start = time.monotonic()
+        assert req("GET", "/posts/1")["success"] is True
+        assert time.monotonic() - start >= 1.0
+
+    def test_gives_up_when_retry_after_exceeds_deadline(self, stand_in: list[tuple[str, int]]) -> None:
+        stand_in_failures["/api/v1/posts/1"] = [(429, "30")]
+        start = time.monotonic()
+        d = req("GET", "/posts/1", deadline=2)
+        assert d == {"success": False, "error": "status 429"}
+        assert time.monotonic() - start < 1.0
+        assert len(stand_in) == 1
+
+    def test_stops_after_max_attempts(self, stand_in: list[tuple[str, int]]) -> None:
+        stand_in_failures["/api/v1/posts/1"] = [(500, None)] * 10
+        assert req("GET", "/posts/1")["error"] == "status 500"
+        assert len(stand_in) == molt.http_policy.MAX_ATTEMPTS
+
+    def test_post_never_retried(self, stand_in: list[tuple[str, int]]) -> None:
+        stand_in_failures["/api/v1/posts"] = [(503, None)]
+        assert req("POST", "/posts", {"title": "t"})["error"] == "status 503"
+        assert len(stand_in) == 1
+
+    def test_retries_count_against_rate_budget(self, stand_in: list[tuple[str, int]]) -> None:
+        stand_in_failures["/api/v1/posts/1"] = [(503, None), (503, None)]
+        req("GET", "/posts/1")
+        assert molt.api._rate.usage() == (3, 0)
+
+    def test_retry_after_http_date(self) -> None:
+        assert molt.http_policy.retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+        assert molt.http_policy.retry_after("7") == 7.0
+        assert molt.http_policy.retry_after("soon") is None
+
+
+class TestRateTracker:
+    @pytest.fixture(autouse=True)
+    def _tmp_db(self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+        monkeypatch.setattr(molt.api, "DB_PATH", tmp_path / "molt.db")
+
+    def test_counts_in_memory_without_touching_disk(self, tmp_path: Path) -> None:
+        tracker = _RateTracker()
+        tracker.usage()  # seeds (creates the db once)
+        before = (tmp_path / "molt.db").stat().st_mtime_ns
+        for _ in range(20):
+            tracker.reserve("GET")
+        tracker.reserve("POST")
+        assert tracker.usage() == (20, 1)
+        assert (tmp_path / "molt.db").stat().st_mtime_ns == before
+
+    def test_flush_shares_counts_with_next_process(self) -> None:
+        first = _RateTracker()
+        for _ in range(3):
+            first.reserve("GET")
+        first.reserve("DELETE")
+        first.flush()
+        first.flush()  # nothing pending — no duplicate rows
+        assert _RateTracker().usage() == (3, 1)
+
+    def test_rate_usage_includes_unflushed(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        tracker = _RateTracker()
+        monkeypatch.setattr(molt.api, "_rate", tracker)
+        tracker.reserve("GET")
+        tracker.reserve("PATCH")
+        assert rate_usage() == (1, 60, 1, 30)
+
+    def test_old_entries_leave_window(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        tracker = _RateTracker()
+        clock = [1000.0]
+        monkeypatch.setattr(molt.api.time, "time", lambda: clock[0])
+        tracker.reserve("GET")
+        clock[0] += 61
+        tracker.reserve("GET")
+        assert tracker.usage() == (1, 0)
+
+
+class TestThrottle:
+    @pytest.fixture(autouse=True)
+    def _tmp_db(self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+        monkeypatch.setattr(molt.api, "DB_PATH", tmp_path / "molt.db")
+        monkeypatch.setattr(molt.api, "_RATE_SLACK", 0.0)
+
+    def test_reserve_reports_wait_when_window_full(self) -> None:
+        tracker = _RateTracker(limits={"r": 2, "w": 1}, window=60.0)
+        assert tracker.reserve("GET") == 0
+        assert tracker.reserve("GET") == 0
+        assert 59 < tracker.reserve("GET") <= 60
+        assert tracker.reserve("POST") == 0  # writes have their own budget
+        assert tracker.usage() == (2, 1)
+
+    def test_batch_over_the_limit_is_paced_not_failed(self, stand_in: list[tuple[str, int]], monkeypatch: pytest.MonkeyPatch) -> None:
+        # The real 60 reads, in a window longer than each call's deadline as in production (60s vs 40s)
+        monkeypatch.setattr(molt.api, "_rate", _RateTracker(window=0.5))
+        start = time.monotonic()
+        results = parallel_fetch([("GET", f"/posts/{i}") for i in range(75)], timeout=0.2)
+        assert all(d.get("success") for d in results)
+        assert len(stand_in) == 75
+        assert time.monotonic() - start >= 0.5  # the last 15 waited for the window
+
+    def test_parallel_fetch_never_exceeds_window(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        tracker = _RateTracker(limits={"r": 5, "w": 5}, window=0.3)
+        monkeypatch.setattr(molt.api, "_rate", tracker)
+        sent: list[float] = []
+
+        async def _asend(*_a: object, **_kw: object) -> tuple[int, str, dict[str, str], bytes]:
+            sent.append(time.monotonic())
+            return 200, "OK", {}, b"{}"
+
+        monkeypatch.setattr(molt.aio, "_asend", _asend)
+        parallel_fetch([("GET", f"/posts/{i}") for i in range(12)], max_workers=8)
+        sent.sort()
+        for i in range(len(sent) - 5):
+            assert sent[i + 5] - sent[i] >= 0.29
+
+    def test_full_window_waits_past_the_deadline(self, stand_in: list[tuple[str, int]], monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(molt.api, "_rate", _RateTracker(limits={"r": 1, "w": 1}, window=0.3))
+        assert req("GET", "/a")["success"] is True
+        start = time.monotonic()
+        assert req("GET", "/b", deadline=0.1)["success"] is True  # queued on the limiter, not timed out
+        assert parallel_fetch([("GET", "/c")], deadline=5)[0]["success"] is True
+        assert time.monotonic() - start >= 0.55
+        assert len(stand_in) == 3
+
+
+class TestWriteLock:
+    """Requests inside a transaction() commit it first, so other connections can write meanwhile."""
+
+    def test_req_and_parallel_fetch_release_the_lock(
+        self, stand_in: list[tuple[str, int]], monkeypatch: pytest.MonkeyPatch, tmp_path: Path,
+    ) -> None:
+        db = open_db(tmp_path / "molt.db")
+        other = sqlite3.connect(str(tmp_path / "molt.db"), timeout=0.1)
+
+        def other_writes() -> None:
+            other.execute("INSERT INTO actions (at, action, detail) VALUES ('t', 'bg', '')")
+            other.commit()  # "database is locked" if the request still held the write lock
+
+        def _send(*_a: object, **_kw: object) -> tuple[int, str, dict[str, str], bytes]:
+            other_writes()
+            return 200, "OK", {}, b'{"success": true}'
+
+        async def _asend(*_a: object, **_kw: object) -> tuple[int, str, dict[str, str], bytes]:
+            other_writes()
+            return 200, "OK", {}, b'{"success": true}'
+
+        monkeypatch.setattr(molt.api, "_send", _send)
+        monkeypatch.setattr(molt.aio, "_asend", _asend)
+        with transaction(db):
+            log_action(db, "post", "p1")
+            assert req("GET", "/a")["success"] is True
+            log_action(db, "upvote", "p1")
+            assert parallel_fetch([("GET", "/b")])[0]["success"] is True
+        assert db.execute("SELECT COUNT(*) FROM actions").fetchone()[0] == 4
+        db.close()
+        other.close()
+
+    def test_record_of_an_accepted_post_survives_a_later_error(
+        self, stand_in: list[tuple[str, int]], monkeypatch: pytest.MonkeyPatch, tmp_path: Path,
+    ) -> None:
+        db = open_db(tmp_path / "molt.db")
+        db.row_factory = sqlite3.Row
+        draft = tmp_path / "post.json"
+        draft.write_text(json.dumps({"submolt": "general", "title": "T", "content": "c"}))
+
+        def _send(*_a: object, **_kw: object) -> tuple[int, str, dict[str, str], bytes]:
+            return 200, "OK", {}, b'{"success": true, "post": {"id": "p9"}}'  # no title: printing it raises
+
+        monkeypatch.setattr(molt.api, "_send", _send)
+        with pytest.raises(KeyError), transaction(db):
+            cmd_post_file(db, str(draft))
+        assert [r["id"] for r in db.execute("SELECT id FROM my_posts")] == ["p9"]
+        assert kv_get(db, "last_post_at") is not None
+
+        def read_then_fail() -> None:
+            with transaction(db):
+                log_action(db, "t", "")
+                req("GET", "/a")
+                log_action(db, "t", "")
+                raise KeyError
+
+        with pytest.raises(KeyError):  # a failed read-only run still rolls back what it wrote after the request
+            read_then_fail()
+        assert db.execute("SELECT COUNT(*) FROM actions WHERE action='t'").fetchone()[0] == 1
+        db.close()
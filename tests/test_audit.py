@@ -0,0 +1,86 @@
+"""Tests for molt.audit — queued API log writer."""
+
+import gzip
+import json
+import threading
+import time
+from pathlib import Path
+
+from molt.audit import AuditLog
+
+
+def _lines(path: Path) -> list[dict[str, object]]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+class TestAuditLog:
+    def test_log_returns_before_writing_and_flushes_on_size(self, tmp_path: Path) -> None:
+        log = AuditLog(tmp_path / "api.log", batch=3, interval=60)
+        log.log("POST", "/posts", 200, {"success": True})
+        log.log("POST", "/posts", 200, {"success": True})
+        time.sleep(0.05)
+        assert not (tmp_path / "api.log").exists()
+        log.log("POST", "/posts", 201, {"success": True})
+        for _ in range(100):
+            if log.written == 3:
+                break
+            time.sleep(0.01)
+        assert [e["status"] for e in _lines(tmp_path / "api.log")] == [200, 200, 201]
+        log.close()
+
+    def test_flushes_on_interval_and_close(self, tmp_path: Path) -> None:
+        log = AuditLog(tmp_path / "api.log", batch=100, interval=0.05)
+        log.log("POST", "/a", 200, {})
+        time.sleep(0.3)
+        assert log.written == 1
+        log2 = AuditLog(tmp_path / "api2.log", batch=100, interval=60)
+        log2.log("POST", "/b", 200, {})
+        log2.close()
+        assert _lines(tmp_path / "api2.log")[0]["path"] == "/b"
+        log2.log("POST", "/late", 200, {})  # ignored once closed
+        log2.flush()
+        assert len(_lines(tmp_path / "api2.log")) == 1
+        log.close()
+
+    def test_logs_every_write_method_and_no_gets_by_default(self, tmp_path: Path) -> None:
+        log = AuditLog(tmp_path / "api.log", batch=100, interval=60, get_rate=0)
+        for method in ("GET", "POST", "PUT", "PATCH", "DELETE"):
+            log.log(method, "/agents/Bot/follow", 200, {"success": True})
+        log.close()
+        assert [e["method"] for e in _lines(tmp_path / "api.log")] == ["POST", "PUT", "PATCH", "DELETE"]
+
+    def test_concurrent_writers_never_interleave(self, tmp_path: Path) -> None:
+        log = AuditLog(tmp_path / "api.log", batch=16, interval=0.01)
+        big = {"content": "x" * 5000}
+
+        def worker(n: int) -> None:
+            for i in range(50):
+                log.log("POST", f"/w{n}/{i}", 200, big)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        log.close()
+        assert len({e["path"] for e in _lines(tmp_path / "api.log")}) == 400
+
+    def test_gets_sampled(self, tmp_path: Path) -> None:
+        off = AuditLog(tmp_path / "off.log")
+        off.log("GET", "/feed", 200, {})
+        off.flush()
+        assert not (tmp_path / "off.log").exists()
+        on = AuditLog(tmp_path / "on.log", get_rate=1.0)
+        on.log("GET", "/feed", 200, {})
+        on.flush()
+        assert _lines(tmp_path / "on.log")[0]["method"] == "GET"
+
+    def test_rotates_and_compresses(self, tmp_path: Path) -> None:
+        log = AuditLog(tmp_path / "api.log", max_bytes=1000, keep=2)
+        for gen in range(3):
+            log.log("POST", f"/gen{gen}", 200, {"pad": "y" * 1200})
+            log.flush()
+        assert not (tmp_path / "api.log").exists()
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["api.log.1.gz", "api.log.2.gz"]
+        newest = json.loads(gzip.decompress((tmp_path / "api.log.1.gz").read_bytes()))
+        assert newest["path"] == "/gen2"
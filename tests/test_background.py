@@ -0,0 +1,27 @@
+"""Tests for molt.background — spawned work is joined and its failures surface."""
+
+import pytest
+
+from molt import background
+from molt.background import join_all, spawn
+
+
+class TestSpawn:
+    def test_failure_is_recorded_and_reported(self, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]) -> None:
+        monkeypatch.setattr(background, "failures", [])
+
+        def refresh() -> None:
+            raise RuntimeError("database is locked")
+
+        spawn(refresh)
+        join_all(timeout=5)
+        assert [(name, str(e)) for name, e in background.failures] == [("refresh", "database is locked")]
+        assert "background refresh failed: database is locked" in capsys.readouterr().err
+
+    def test_success_leaves_no_failure(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(background, "failures", [])
+        done: list[int] = []
+        spawn(done.append, 1)
+        join_all(timeout=5)
+        assert done == [1]
+        assert not background.failures
@@ -0,0 +1,100 @@
+"""Tests for molt.bench."""
+
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from molt.bench import load_challenges, main, run, summarize
+
+ROWS = [
+    {
+        "code": "ok", "raw_text": "ClAw FoRcE iS tHiRtY nEwToNs AnD iT gAiNs FiVe",
+        "decoded_text": "", "numbers": "[30, 5]", "operation": "add",
+        "proposed": 35.0, "submitted": 35.0, "result": "success",
+    },
+    {
+        "code": "bad", "raw_text": "SwImS aT tWeNtY fOuR aNd LoSeS sEvEn",
+        "decoded_text": "", "numbers": "[24, 7]", "operation": "subtract",
+        "proposed": 17.0, "submitted": 31.0, "result": "success",
+    },
+    {
+        "code": "failed", "raw_text": "ClAw FoRcE iS tWeNtY eIgHt GaInS fOuR",
+        "decoded_text": "", "numbers": "[28, 4]", "operation": "add",
+        "proposed": 32.0, "submitted": 32.0, "result": "fail",
+    },
+    {
+        "code": "pending", "raw_text": "ThIrTy TiMeS tWo",
+        "decoded_text": "", "numbers": "[]", "operation": "?",
+        "proposed": None, "submitted": None, "result": None,
+    },
+]
+
+
+class TestRun:
+    def test_grades_against_submitted(self) -> None:
+        verdicts = {o["code"]: o["verdict"] for o in run(ROWS)["outcomes"]}
+        assert verdicts == {"ok": "correct", "bad": "wrong", "failed": "repeats_fail", "pending": "ungraded"}
+
+    def test_summary_percentiles_and_accuracy(self) -> None:
+        summary = summarize(run(ROWS, repeat=3))
+        assert summary["challenges"] == 4
+        assert summary["accuracy"] == 0.5
+        assert set(summary["stages"]) == {"decode", "extract", "solve"}
+        for pct in summary["stages"].values():
+            assert 0 < pct["p50"] <= pct["p95"] <= pct["p99"] <= pct["max"]
+        assert summary["throughput"] > 0
+
+    def test_throughput_counts_solve_challenge_only(self) -> None:
+        timings = {"decode": [1.0, 1.0], "extract": [1.0, 1.0], "solve": [2.0, 2.0]}  # solve already includes the rest
+        outcomes = [{"verdict": "ungraded", "drift": False}]
+        assert summarize({"timings": timings, "outcomes": outcomes, "repeat": 2})["throughput"] == 0.5
+
+    def test_solver_output_suppressed(self, capsys: object) -> None:
+        run(ROWS[:1])
+        assert capsys.readouterr().out == ""  # type: ignore[union-attr]
+
+
+class TestMain:
+    def test_export_then_replay_fixture(self, tmp_path: Path, capsys: object) -> None:
+        db_path = tmp_path / "molt.db"
+        db = sqlite3.connect(db_path)
+        db.execute(
+            "CREATE TABLE challenges (id INTEGER PRIMARY KEY AUTOINCREMENT, at TEXT, code TEXT, raw_text TEXT, "
+            "decoded_text TEXT, numbers TEXT, operation TEXT, proposed REAL, submitted REAL, result TEXT)",
+        )
+        db.executemany(
+            "INSERT INTO challenges (code, raw_text, decoded_text, numbers, operation, proposed, submitted, result) "
+            "VALUES (:code, :raw_text, :decoded_text, :numbers, :operation, :proposed, :submitted, :result)",
+            ROWS,
+        )
+        db.commit()
+        db.close()
+        assert [r["code"] for r in load_challenges(db_path)] == [r["code"] for r in ROWS]
+
+        fixture = tmp_path / "corpus.json"
+        assert main(["--db", str(db_path), "--export", str(fixture)]) == 0
+        assert len(json.loads(fixture.read_text())) == 4
+        assert main(["--fixture", str(fixture)]) == 0
+        out = capsys.readouterr().out  # type: ignore[union-attr]
+        assert "Replayed 4 challenges" in out
+        assert "accuracy    50.0%" in out
+
+    def test_accuracy_gate(self, tmp_path: Path) -> None:
+        fixture = tmp_path / "corpus.json"
+        fixture.write_text(json.dumps(ROWS))
+        assert main(["--fixture", str(fixture), "--min-accuracy", "0.5"]) == 0
+        assert main(["--fixture", str(fixture), "--min-accuracy", "0.9"]) == 1
+
+    def test_accuracy_gate_fails_without_graded_rows(self, tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+        fixture = tmp_path / "corpus.json"
+        fixture.write_text(json.dumps(ROWS[2:]))  # a failed and a pending challenge: nothing to grade
+        assert main(["--fixture", str(fixture), "--min-accuracy", "0.5"]) == 1
+        assert "no challenge has a graded" in capsys.readouterr().out
+
+    def test_missing_flag_value_prints_usage(self, capsys: pytest.CaptureFixture[str]) -> None:
+        assert main(["--fixture"]) == 2
+        out = capsys.readouterr().out
+        assert "--fixture needs a value" in out
+        assert "python -m molt.bench --export corpus.json" in out
@@ -1,10 +1,12 @@
-"""Tests for new browse commands — followers, following, leaderboard, stats, global, postwindow, network, controversial."""
+"""Tests for new browse commands — followers, following, leaderboard, stats, global, postwindow, network, controversial, review, prune."""
 
 import sqlite3
+from collections.abc import Iterator
 from datetime import UTC, datetime, timedelta
 from unittest.mock import patch
 
 from molt.commands.browse import (
+    _check_my_posts,
     cmd_controversial,
     cmd_followers,
     cmd_following,
@@ -12,8 +14,13 @@ from molt.commands.browse import (
     cmd_leaderboard,
     cmd_network,
     cmd_postwindow,
+    cmd_prune,
+    cmd_review,
+    cmd_search,
     cmd_stats,
 )
+from molt.db import mark_seen
+from molt.graph import commented, record, replied
 
 FAKE_FOLLOWER = {"name": "FollowBot", "karma": 100, "follower_count": 5, "following_count": 4000, "posts_count": 0}
 FAKE_FOLLOWING = {"name": "CoolAgent", "karma": 200, "follower_count": 50, "posts_count": 10}
@@ -163,14 +170,15 @@ class TestPostwindow:
 
 class TestNetwork:
     def test_shows_interactions(self, memdb: sqlite3.Connection, capsys: object) -> None:
+        comments = [
+            ("c1", "p1", "Alice", "Comment 1", "2026-02-21T10:00:00Z"),
+            ("c2", "p2", "Alice", "Comment 2", "2026-02-21T11:00:00Z"),
+            ("c3", "p3", "Bob", "Comment 3", "2026-02-21T12:00:00Z"),
+        ]
         memdb.executemany(
-            "INSERT INTO my_comments (id, post_id, post_author, content, commented_at) VALUES (?, ?, ?, ?, ?)",
-            [
-                ("c1", "p1", "Alice", "Comment 1", "2026-02-21T10:00:00Z"),
-                ("c2", "p2", "Alice", "Comment 2", "2026-02-21T11:00:00Z"),
-                ("c3", "p3", "Bob", "Comment 3", "2026-02-21T12:00:00Z"),
-            ],
+            "INSERT INTO my_comments (id, post_id, post_author, content, commented_at) VALUES (?, ?, ?, ?, ?)", comments,
         )
+        record(memdb, [commented(c[0], c[2], c[4]) for c in comments])  # as cmd_comment does
         memdb.commit()
         cmd_network(memdb, 10)
         out = capsys.readouterr().out  # type: ignore[union-attr]
@@ -179,6 +187,32 @@ class TestNetwork:
         # Alice should be first (2 interactions)
         assert out.index("Alice") < out.index("Bob")
 
+    def test_sections_from_graph_with_fixed_query_count(self, memdb: sqlite3.Connection, capsys: object) -> None:
+        for pid, author, up, cc in [("p1", "Carol", 7, 2), ("p2", "Carol", 3, 9), ("p3", "Dave", 1, 0), ("p4", "?", 0, 0)]:
+            mark_seen(memdb, {"id": pid, "author": {"name": author}, "title": pid, "upvotes": up, "comment_count": cc})
+        mark_seen(memdb, {"id": "p1", "author": {"name": "Carol"}, "title": "p1", "upvotes": 8})  # re-sighting: no new edge
+        memdb.executemany(
+            "INSERT INTO agents (name, karma, followers, note) VALUES (?, ?, ?, ?)",
+            [("Carol", 50, 4, "thoughtful"), ("Dave", 90, 1, None), ("Quiet", 5, 0, "lurker")],
+        )
+        record(memdb, [commented("c1", "Dave", None), replied("r1", "Dave", None), replied("r1", "Dave", None)])
+        statements: list[str] = []
+        memdb.set_trace_callback(statements.append)
+        cmd_network(memdb, 10)
+        memdb.set_trace_callback(None)
+        out = capsys.readouterr().out  # type: ignore[union-attr]
+        assert sum(s.lstrip().startswith("SELECT") for s in statements) == 8  # fixed per section, no per-row lookups
+        seen, commented_on, lately, creators, noted = out.split("---")[2::2]
+        assert "Carol                   seen 2x  best 8^/9c  [thoughtful]" in seen
+        assert "?" not in seen
+        assert "Dave                    1 comments  1 replies back" in commented_on
+        assert "Carol" not in commented_on
+        assert lately.index("Dave") < lately.index("Carol")  # comment + reply outweigh two sightings
+        assert creators.index("Dave") < creators.index("Carol")
+        assert "Quiet" not in creators
+        assert "Carol" in noted
+        assert "Quiet" in noted
+
     def test_empty_network(self, memdb: sqlite3.Connection, capsys: object) -> None:
         cmd_network(memdb, 10)
         out = capsys.readouterr().out  # type: ignore[union-attr]
@@ -203,3 +237,174 @@ class TestControversial:
         assert "Hot take" in out
         # Hot take (5 downvotes) should appear — most controversial
         assert "5v" in out or "5 downvotes" in out.lower()
+
+
+class TestSearch:
+    def test_shows_ranked_posts_with_snippet_and_agents(self, memdb: sqlite3.Connection, capsys: object) -> None:
+        memdb.execute(
+            "INSERT INTO seen_posts (id, author, title, submolt, upvotes, downvotes, comment_count, content) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            ("p1", "Starfish", "Policy notes", "aisafety", 4, 0, 2, "a long thread about verification latency"),
+        )
+        memdb.execute(
+            "INSERT INTO agents (name, karma, followers, description) VALUES (?, ?, ?, ?)",
+            ("Verifier", 12, 3, "checks verification math"),
+        )
+        cmd_search(memdb, "verification")
+        out = capsys.readouterr().out  # type: ignore[union-attr]
+        assert "Policy notes" in out
+        assert "[verification]" in out
+        assert "Verifier" in out
+
+    def test_no_matches(self, memdb: sqlite3.Connection, capsys: object) -> None:
+        cmd_search(memdb, "nothing")
+        out = capsys.readouterr().out  # type: ignore[union-attr]
+        assert out.count("(none)") == 2
+
+
+DEEP_THREAD = {"comments": [
+    {"id": "top", "replies": [
+        {"id": "mid", "replies": [
+            {"id": "deep", "upvotes": 7, "replies": [{"id": "r1", "author": {"name": "Ann"}, "content": "agreed"}]},
+        ]},
+    ]},
+]}
+
+
+FAILED_FETCHES = [
+    {"success": False, "error": "Post not found", "not_found": True},
+    {"success": False, "error": "HTTP 429"},
+    {"success": False, "error": "deadline exceeded"},
+]
+
+
+class TestCommentTree:
+    @patch("molt.commands.browse.parallel_fetch")
+    def test_review_finds_comment_nested_below_first_reply_level(self, mock_fetch: object, memdb: sqlite3.Connection, capsys: object) -> None:
+        memdb.execute("INSERT INTO my_comments (id, post_id, post_author, content) VALUES ('deep', 'p1', 'Ann', 'nested')")
+        mock_fetch.return_value = [DEEP_THREAD, {"comments": []}]  # type: ignore[union-attr]
+        cmd_review(memdb)
+        out = capsys.readouterr().out  # type: ignore[union-attr]
+        assert "7^ (+7)  1 replies" in out
+        assert memdb.execute("SELECT upvotes FROM my_comments WHERE id='deep'").fetchone()[0] == 7
+
+    @patch("molt.commands.browse.parallel_fetch")
+    def test_prune_keeps_nested_and_drops_missing(self, mock_fetch: object, memdb: sqlite3.Connection) -> None:
+        memdb.executemany(
+            "INSERT INTO my_comments (id, post_id, post_author, content) VALUES (?, 'p1', 'Ann', 'x')", [("deep",), ("gone",)],
+        )
+        mock_fetch.return_value = [DEEP_THREAD]  # type: ignore[union-attr]
+        cmd_prune(memdb)
+        removed = {r[0] for r in memdb.execute("SELECT id FROM my_comments WHERE removed_at IS NOT NULL")}
+        assert removed == {"gone"}
+
+    @patch("molt.commands.browse.parallel_fetch")
+    def test_prune_skips_threads_that_failed_to_load(self, mock_fetch: object, memdb: sqlite3.Connection, capsys: object) -> None:
+        memdb.executemany(
+            "INSERT INTO my_comments (id, post_id, post_author, content) VALUES (?, ?, 'Ann', 'x')",
+            [("c1", "slow"), ("c2", "slow"), ("c3", "deleted")],
+        )
+        mock_fetch.return_value = FAILED_FETCHES[2:] + FAILED_FETCHES[:1]  # type: ignore[union-attr]
+        cmd_prune(memdb)
+        removed = {r[0] for r in memdb.execute("SELECT id FROM my_comments WHERE removed_at IS NOT NULL")}
+        assert removed == {"c3"}
+        assert "(2 comments in threads that failed to load; kept)" in capsys.readouterr().out  # type: ignore[union-attr]
+
+    @patch("molt.commands.browse.paginate")
+    @patch("molt.commands.browse.parallel_fetch")
+    def test_truncated_thread_is_paged_until_found(self, mock_fetch: object, mock_pages: object, memdb: sqlite3.Connection) -> None:
+        memdb.execute("INSERT INTO my_comments (id, post_id, post_author, content) VALUES ('late', 'p1', 'Ann', 'x')")
+        first_page = {"count": 3, "comments": [{"id": "a"}]}
+        mock_fetch.return_value = [first_page]  # type: ignore[union-attr]
+        mock_pages.return_value = iter([{"id": "b", "replies": [{"id": "late"}]}, {"id": "never-read"}])  # type: ignore[union-attr]
+        cmd_prune(memdb)
+        assert memdb.execute("SELECT removed_at FROM my_comments WHERE id='late'").fetchone()[0] is None
+        mock_pages.assert_called_once_with("/posts/p1/comments", "comments", start=1, failures=[])  # type: ignore[union-attr]
+
+    @patch("molt.commands.browse.paginate")
+    @patch("molt.commands.browse.parallel_fetch")
+    def test_failed_paging_keeps_missing_comments(self, mock_fetch: object, mock_pages: object, memdb: sqlite3.Connection) -> None:
+        memdb.execute("INSERT INTO my_comments (id, post_id, post_author, content) VALUES ('late', 'p1', 'Ann', 'x')")
+        mock_fetch.return_value = [{"count": 300, "comments": [{"id": "a"}]}]  # type: ignore[union-attr]
+
+        def pages(*_a: object, failures: list[dict[str, object]], **_kw: object) -> Iterator[dict[str, object]]:
+            yield {"id": "b"}
+            failures.append({"success": False, "error": "HTTP 503"})
+
+        mock_pages.side_effect = pages  # type: ignore[union-attr]
+        cmd_prune(memdb)
+        assert memdb.execute("SELECT removed_at FROM my_comments WHERE id='late'").fetchone()[0] is None
+
+
+class TestRemoval:
+    """Only a 404/410 marks tracked content removed; errors, deadlines and rate limits leave it alone."""
+
+    def _seed(self, memdb: sqlite3.Connection) -> None:
+        memdb.executemany(
+            "INSERT INTO my_posts (id, submolt, title, posted_at) VALUES (?, 'general', ?, ?)",
+            [(pid, f"Post {pid}", datetime.now(UTC).isoformat()) for pid in ("gone", "busy", "late")],
+        )
+
+    def _removed(self, memdb: sqlite3.Connection) -> set[str]:
+        return {r[0] for r in memdb.execute("SELECT id FROM my_posts WHERE removed_at IS NOT NULL")}
+
+    @patch("molt.commands.browse.parallel_fetch")
+    def test_review(self, mock_fetch: object, memdb: sqlite3.Connection, capsys: object) -> None:
+        self._seed(memdb)
+        mock_fetch.return_value = FAILED_FETCHES  # type: ignore[union-attr]
+        cmd_review(memdb)
+        out = capsys.readouterr().out  # type: ignore[union-attr]
+        assert self._removed(memdb) == {"gone"}
+        assert out.count("REMOVED") == 1
+        assert "(check failed: deadline exceeded)" in out
+
+    @patch("molt.commands.browse.parallel_fetch")
+    def test_prune(self, mock_fetch: object, memdb: sqlite3.Connection) -> None:
+        self._seed(memdb)
+        mock_fetch.return_value = FAILED_FETCHES  # type: ignore[union-attr]
+        cmd_prune(memdb)
+        assert self._removed(memdb) == {"gone"}
+
+    @patch("molt.commands.browse.parallel_fetch")
+    def test_myposts(self, mock_fetch: object, memdb: sqlite3.Connection) -> None:
+        self._seed(memdb)
+        mock_fetch.return_value = FAILED_FETCHES  # type: ignore[union-attr]
+        _check_my_posts(memdb)
+        assert self._removed(memdb) == {"gone"}
+
+
+class TestReviewSchedule:
+    def _seed(self, memdb: sqlite3.Connection) -> None:
+        old, fresh = (datetime.now(UTC) - timedelta(days=30)).isoformat(), datetime.now(UTC).isoformat()
+        memdb.executemany(
+            "INSERT INTO my_posts (id, submolt, title, upvotes, comment_count, posted_at) VALUES (?, 'general', ?, 3, 1, ?)",
+            [(f"p{i}", f"Post {i}", fresh if i < 5 else old) for i in range(200)],
+        )
+
+    @patch("molt.commands.browse.parallel_fetch")
+    def test_second_run_only_fetches_hot_posts(self, mock_fetch: object, memdb: sqlite3.Connection, capsys: object) -> None:
+        self._seed(memdb)
+        mock_fetch.side_effect = lambda calls: [  # type: ignore[union-attr]
+            {"post": {"upvotes": 3, "comment_count": 1}, "_etag": f'"{c[1]}"'} for c in calls
+        ]
+        cmd_review(memdb)
+        assert len(mock_fetch.call_args.args[0]) == 200  # type: ignore[union-attr]
+        assert memdb.execute("SELECT COUNT(*) FROM engagement").fetchone()[0] == 200
+        cmd_review(memdb)
+        calls = mock_fetch.call_args.args[0]  # type: ignore[union-attr]
+        assert [c[1] for c in calls] == [f"/posts/p{i}" for i in range(5)]
+        assert calls[0][2] == {"If-None-Match": '"/posts/p0"'}
+        assert "195 quiet posts not due yet" in capsys.readouterr().out  # type: ignore[union-attr]
+        cmd_review(memdb, full=True)
+        assert len(mock_fetch.call_args.args[0]) == 200  # type: ignore[union-attr]
+
+    @patch("molt.commands.browse.parallel_fetch")
+    def test_not_modified_keeps_stored_numbers(self, mock_fetch: object, memdb: sqlite3.Connection, capsys: object) -> None:
+        memdb.execute("INSERT INTO my_posts (id, submolt, title, upvotes, comment_count, posted_at) VALUES ('p1', 'general', 'T', 4, 2, ?)", (datetime.now(UTC).isoformat(),))
+        memdb.execute("INSERT INTO my_comments (id, post_id, post_author, content, upvotes, reply_count) VALUES ('c1', 'p9', 'Ann', 'hi', 5, 1)")
+        mock_fetch.return_value = [{"success": True, "not_modified": True}] * 2 + [{"comments": []}]  # type: ignore[union-attr]
+        cmd_review(memdb)
+        out = capsys.readouterr().out  # type: ignore[union-attr]
+        assert "REMOVED" not in out
+        assert "4^ (=)  2c (=)" in out
+        assert "5^ (=)  1 replies" in out
+        assert "(thread unchanged)" in out
@@ -1,8 +1,27 @@
 """Tests for molt.db."""
 
 import sqlite3
+from pathlib import Path
 
-from molt.db import kv_get, kv_set, log_action, mark_seen, remember_agent
+import pytest
+
+from molt.db import (
+    SCHEMA_VERSION,
+    cache_put,
+    commit_pending,
+    connection,
+    ingest_posts,
+    kv_get,
+    kv_set,
+    log_action,
+    mark_seen,
+    migrate,
+    open_db,
+    remember_agent,
+    search_agents,
+    search_posts,
+    transaction,
+)
 
 
 class TestKV:
@@ -136,3 +155,201 @@ class TestMarkSeenSubmolt:
         mark_seen(memdb, post)
         memdb.commit()
         assert memdb.execute("SELECT submolt FROM seen_posts WHERE id='p3'").fetchone()["submolt"] == "?"
+
+
+class TestIngestPosts:
+    @staticmethod
+    def _page(n: int) -> list[dict[str, object]]:
+        return [
+            {
+                "id": f"p{i}", "title": f"Post {i}", "submolt": {"name": "general"},
+                "upvotes": i, "comment_count": 0, "author": {"name": f"Agent{i % 3}", "karma": i},
+            }
+            for i in range(n)
+        ]
+
+    def test_returns_already_seen(self, memdb: sqlite3.Connection) -> None:
+        mark_seen(memdb, self._page(2)[1])
+        assert ingest_posts(memdb, self._page(4)) == {"p1"}
+        assert memdb.execute("SELECT COUNT(*) FROM seen_posts").fetchone()[0] == 4
+        assert memdb.execute("SELECT COUNT(*) FROM agents").fetchone()[0] == 3
+
+    def test_single_lookup_per_page(self, memdb: sqlite3.Connection) -> None:
+        statements: list[str] = []
+        memdb.set_trace_callback(statements.append)
+        ingest_posts(memdb, self._page(50))
+        memdb.set_trace_callback(None)
+        assert len([s for s in statements if s.startswith("SELECT")]) == 1
+
+    def test_matches_per_post_upserts(self, memdb: sqlite3.Connection) -> None:
+        remember_agent(memdb, {"name": "Agent0", "karma": 1, "follower_count": 77, "description": "kept"})
+        ingest_posts(memdb, self._page(3))
+        row = memdb.execute("SELECT karma, followers, description FROM agents WHERE name='Agent0'").fetchone()
+        assert row["karma"] == 0
+        assert row["followers"] == 77
+        assert row["description"] == "kept"
+
+    def test_skips_bare_author_names(self, memdb: sqlite3.Connection) -> None:
+        ingest_posts(memdb, [{"id": "x", "title": "T", "author": "plain"}])
+        assert memdb.execute("SELECT author FROM seen_posts WHERE id='x'").fetchone()["author"] == "plain"
+        assert memdb.execute("SELECT COUNT(*) FROM agents").fetchone()[0] == 0
+
+    def test_empty_page(self, memdb: sqlite3.Connection) -> None:
+        assert ingest_posts(memdb, []) == set()
+
+
+class TestSearch:
+    @staticmethod
+    def _seed(db: sqlite3.Connection) -> None:
+        ingest_posts(db, [
+            {"id": "a", "title": "Consent degrades", "author": {"name": "ClaudeOpus-Lauri"}, "content": "safety friction is a feature"},
+            {"id": "b", "title": "Lobster facts", "author": {"name": "Crab"}, "content": "nothing about safety here, mostly claws"},
+            {"id": "c", "title": "Safety culture", "author": {"name": "Starfish"}, "content": "policy threads"},
+        ])
+
+    def test_ranks_title_hits_first(self, memdb: sqlite3.Connection) -> None:
+        self._seed(memdb)
+        ids = [r["id"] for r in search_posts(memdb, "safety")]
+        assert ids[0] == "c"
+        assert set(ids) == {"a", "b", "c"}
+
+    def test_snippet_highlights_match(self, memdb: sqlite3.Connection) -> None:
+        self._seed(memdb)
+        (row,) = search_posts(memdb, "friction")
+        assert "[friction]" in row["snip"]
+
+    def test_prefix_and_multiword(self, memdb: sqlite3.Connection) -> None:
+        self._seed(memdb)
+        assert [r["id"] for r in search_posts(memdb, "lobst claw")] == ["b"]
+
+    def test_index_follows_updates_and_deletes(self, memdb: sqlite3.Connection) -> None:
+        self._seed(memdb)
+        mark_seen(memdb, {"id": "b", "title": "Lobster facts", "author": {"name": "Crab"}}, content="now about tides")
+        assert [r["id"] for r in search_posts(memdb, "tides")] == ["b"]
+        assert "b" not in [r["id"] for r in search_posts(memdb, "claws")]
+        memdb.execute("DELETE FROM seen_posts WHERE id='c'")
+        assert [r["id"] for r in search_posts(memdb, "policy")] == []
+
+    def test_agents_by_note(self, memdb: sqlite3.Connection) -> None:
+        remember_agent(memdb, {"name": "xtoa", "karma": 1, "description": "phenomenology"})
+        memdb.execute("UPDATE agents SET note='designing successor' WHERE name='xtoa'")
+        assert [r["name"] for r in search_agents(memdb, "successor")] == ["xtoa"]
+        assert [r["name"] for r in search_agents(memdb, "phenomenolog")] == ["xtoa"]
+
+    def test_punctuation_only_query_falls_back_to_like(self, memdb: sqlite3.Connection) -> None:
+        self._seed(memdb)
+        memdb.execute("UPDATE seen_posts SET title='What?!' WHERE id='a'")
+        assert [r["id"] for r in search_posts(memdb, "?!")] == ["a"]
+
+    def test_without_fts_uses_like(self) -> None:
+        db = sqlite3.connect(":memory:")
+        db.row_factory = sqlite3.Row
+        db.execute("CREATE TABLE seen_posts (id TEXT PRIMARY KEY, author TEXT, title TEXT, submolt TEXT, upvotes INT, downvotes INT, comment_count INT, content TEXT)")
+        db.execute("INSERT INTO seen_posts VALUES ('x', 'A', 'Edge cases', 'g', 1, 0, 0, '')")
+        assert [r["id"] for r in search_posts(db, "edge")] == ["x"]
+
+
+class TestMigrations:
+    def test_fresh_database_reaches_current_version(self, memdb: sqlite3.Connection) -> None:
+        assert memdb.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        tables = {r[0] for r in memdb.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        assert {"seen_posts", "my_posts", "agents", "challenges", "http_cache", "rate_log", "posts_fts"} <= tables
+
+    def test_upgrades_pre_versioning_database(self) -> None:
+        db = sqlite3.connect(":memory:")
+        db.row_factory = sqlite3.Row
+        db.execute("CREATE TABLE seen_posts (id TEXT PRIMARY KEY, author TEXT, title TEXT, submolt TEXT, upvotes INTEGER, comment_count INTEGER, seen_at TEXT)")
+        db.execute("CREATE TABLE rate_log (ts REAL)")
+        db.execute("INSERT INTO seen_posts (id, author, title) VALUES ('old', 'A', 'Legacy interpretability notes')")
+        db.commit()
+        migrate(db)
+        assert {"content", "downvotes"} <= {r[1] for r in db.execute("PRAGMA table_info(seen_posts)")}
+        assert "kind" in {r[1] for r in db.execute("PRAGMA table_info(rate_log)")}
+        assert [r["id"] for r in search_posts(db, "interpretab")] == ["old"]  # FTS backfilled
+        assert db.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+
+    def test_fts_created_once_sqlite_has_fts5(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        db = sqlite3.connect(":memory:")
+        db.row_factory = sqlite3.Row
+        with monkeypatch.context() as m:
+            m.setattr("molt.db._FTS_SCHEMA", "CREATE VIRTUAL TABLE posts_fts USING no_such_module(title);")
+            migrate(db)
+            ingest_posts(db, [{"id": "p", "title": "Interpretability notes", "author": {"name": "A"}}])
+            assert [r["snip"] for r in search_posts(db, "interpretab")] == [None]  # LIKE fallback
+        assert db.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        (row,) = search_posts(db, "interpretab")
+        assert row["snip"] == "[Interpretability] notes"
+        assert db.execute("SELECT 1 FROM sqlite_master WHERE name='agents_fts'").fetchone()
+
+    def test_current_database_opens_with_one_statement(self, tmp_path: Path) -> None:
+        open_db(tmp_path / "molt.db").close()
+        statements: list[str] = []
+        db = sqlite3.connect(str(tmp_path / "molt.db"))
+        db.set_trace_callback(statements.append)
+        migrate(db)
+        assert statements == ["PRAGMA user_version"]
+        db.close()
+
+    def test_rerun_is_harmless(self, memdb: sqlite3.Connection) -> None:
+        memdb.execute("PRAGMA user_version = 0")
+        migrate(memdb)
+        assert memdb.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+
+
+class TestTransaction:
+    @pytest.fixture
+    def db(self, tmp_path: Path) -> sqlite3.Connection:
+        db = open_db(tmp_path / "molt.db")
+        db.row_factory = sqlite3.Row
+        return db
+
+    def test_helper_commits_are_deferred_to_one(self, db: sqlite3.Connection, tmp_path: Path) -> None:
+        statements: list[str] = []
+        db.set_trace_callback(statements.append)
+        other = sqlite3.connect(str(tmp_path / "molt.db"))
+        with transaction(db):
+            log_action(db, "comment", "p1")
+            kv_set(db, "k", "v")
+            cache_put(db, "GET /home", {"ok": True})
+            db.commit()
+            assert other.execute("SELECT COUNT(*) FROM actions").fetchone()[0] == 0  # nothing visible yet
+        assert other.execute("SELECT COUNT(*) FROM actions").fetchone()[0] == 1
+        assert statements.count("COMMIT") == 1
+        db.close()
+        other.close()
+
+    def test_nested_blocks_commit_at_the_outermost(self, db: sqlite3.Connection, tmp_path: Path) -> None:
+        other = sqlite3.connect(str(tmp_path / "molt.db"))
+        with transaction(db):
+            with transaction(db):
+                log_action(db, "upvote", "p1")
+            assert other.execute("SELECT COUNT(*) FROM actions").fetchone()[0] == 0
+        assert other.execute("SELECT COUNT(*) FROM actions").fetchone()[0] == 1
+        db.close()
+        other.close()
+
+    def test_error_rolls_back_to_the_last_request(self, db: sqlite3.Connection) -> None:
+        def post_then_fail() -> None:
+            with transaction(db):
+                log_action(db, "post", "p1")
+                commit_pending()  # what molt.api does before each request
+                log_action(db, "upvote", "p1")
+                raise RuntimeError
+
+        with pytest.raises(RuntimeError):
+            post_then_fail()
+        assert [r["action"] for r in db.execute("SELECT action FROM actions")] == ["post"]
+        assert not db.in_transaction
+        db.close()
+
+    def test_connection_borrows_the_open_transaction(self, db: sqlite3.Connection) -> None:
+        with transaction(db), connection() as borrowed:
+            assert borrowed is db
+        with connection(lambda: sqlite3.connect(":memory:")) as fresh:
+            assert fresh is not db
+        db.close()
+
+    def test_wal_with_normal_sync(self, db: sqlite3.Connection) -> None:
+        assert db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert db.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        db.close()
@@ -0,0 +1,51 @@
+"""Tests for molt.freshness — review schedule and change tracking."""
+
+import sqlite3
+import time
+from datetime import UTC, datetime, timedelta
+
+from molt.freshness import conditional_headers, fingerprint, is_due, load_state, observe
+
+DAY = 86400.0
+
+
+def _iso(days_ago: float) -> str:
+    return (datetime.now(UTC) - timedelta(days=days_ago)).isoformat()
+
+
+def _state(memdb: sqlite3.Connection, checked_ago: float, changed_ago: float) -> sqlite3.Row:
+    t = time.time()
+    memdb.execute(
+        "INSERT INTO review_state (path, checked_at, changed_at) VALUES ('/p', ?, ?)", (t - checked_ago, t - changed_ago),
+    )
+    return load_state(memdb, ["/p"])["/p"]
+
+
+class TestIsDue:
+    def test_never_checked_or_young_always_due(self, memdb: sqlite3.Connection) -> None:
+        assert is_due(None, _iso(30), time.time())
+        state = _state(memdb, checked_ago=60, changed_ago=20 * DAY)
+        assert is_due(state, _iso(1), time.time())
+        assert is_due(state, None, time.time())
+
+    def test_quiet_old_post_backs_off(self, memdb: sqlite3.Connection) -> None:
+        state = _state(memdb, checked_ago=2 * DAY, changed_ago=20 * DAY)
+        assert not is_due(state, _iso(30), time.time())  # waits the 7-day cap
+        assert is_due(state, _iso(30), time.time() + 5.5 * DAY)
+
+    def test_recently_changed_old_post_stays_hot(self, memdb: sqlite3.Connection) -> None:
+        state = _state(memdb, checked_ago=20 * 60, changed_ago=50 * 60)  # 30 min quiet -> 15 min interval
+        assert is_due(state, _iso(10), time.time())
+
+
+class TestObserve:
+    def test_tracks_changes_and_validators(self, memdb: sqlite3.Connection) -> None:
+        assert observe(memdb, "/p", None, {"_etag": '"a"'}, fingerprint([1, 0]), at=100.0)
+        state = load_state(memdb, ["/p"])["/p"]
+        assert conditional_headers(state) == {"If-None-Match": '"a"'}
+        assert not observe(memdb, "/p", state, {}, fingerprint([1, 0]), at=200.0)
+        assert not observe(memdb, "/p", state, {"not_modified": True}, "", at=300.0)
+        row = load_state(memdb, ["/p"])["/p"]
+        assert (row["checked_at"], row["changed_at"]) == (300.0, 100.0)
+        assert observe(memdb, "/p", row, {}, fingerprint([2, 0]), at=400.0)
+        assert load_state(memdb, ["/p"])["/p"]["changed_at"] == 400.0
@@ -0,0 +1,84 @@
+"""Tests for molt.graph."""
+
+import sqlite3
+from unittest.mock import patch
+
+from molt.commands.browse import cmd_review
+from molt.db import ingest_posts, migrate
+from molt.graph import (
+    ME,
+    commented,
+    recency_scores,
+    reciprocity,
+    record,
+    replied,
+    sighting,
+    top_neighbours,
+)
+
+
+def _post(pid: str, author: str) -> dict[str, object]:
+    return {"id": pid, "title": pid, "author": {"name": author}, "upvotes": 1, "comment_count": 0}
+
+
+class TestRecord:
+    def test_same_ref_counts_once(self, memdb: sqlite3.Connection) -> None:
+        ingest_posts(memdb, [_post("p1", "Ann"), _post("p2", "Ann"), _post("p1", "Ann")])
+        ingest_posts(memdb, [_post("p2", "Ann"), _post("p3", "Bo")])
+        assert [(r["name"], r["weight"]) for r in top_neighbours(memdb, ME, "seen")] == [("Ann", 2), ("Bo", 1)]
+
+    def test_placeholder_and_self_authors_skipped(self, memdb: sqlite3.Connection) -> None:
+        assert sighting("p", "?", None) is None
+        assert sighting("p", ME, None) is None
+        record(memdb, [sighting("p", "", None), commented("c", "?", None), None])
+        assert memdb.execute("SELECT COUNT(*) FROM edges").fetchone()[0] == 0
+
+    def test_recency_prefers_recent_over_frequent(self, memdb: sqlite3.Connection) -> None:
+        record(memdb, [sighting(f"old{i}", "Old", "2026-01-01T00:00:00+00:00") for i in range(3)])
+        record(memdb, [sighting("new", "New", "2026-03-01T00:00:00+00:00")])
+        assert top_neighbours(memdb, ME, "seen", by="weight")[0]["name"] == "Old"
+        assert top_neighbours(memdb, ME, "seen", by="recency")[0]["name"] == "New"
+        scores = dict(recency_scores(memdb))
+        assert 0 < scores["Old"] < scores["New"]
+
+    def test_reciprocity(self, memdb: sqlite3.Connection) -> None:
+        record(memdb, [commented("c1", "Ann", None), commented("c2", "Ann", None), commented("c3", "Bo", None)])
+        record(memdb, [replied("r1", "Ann", None)])
+        rows = {r["name"]: (r["given"], r["back"], r["ratio"]) for r in reciprocity(memdb)}
+        assert rows == {"Ann": (2, 1, 0.5), "Bo": (1, 0, 0.0)}
+
+    def test_top_k_is_an_index_walk(self, memdb: sqlite3.Connection) -> None:
+        plan = " ".join(r["detail"] for r in memdb.execute(
+            "EXPLAIN QUERY PLAN SELECT dst FROM edges WHERE src = 'x' AND kind = 'seen' ORDER BY weight DESC LIMIT 5",
+        ))
+        assert "idx_edges_weight" in plan
+        assert "TEMP B-TREE" not in plan
+
+
+class TestBackfill:
+    def test_migration_replays_existing_rows(self) -> None:
+        db = sqlite3.connect(":memory:")
+        db.row_factory = sqlite3.Row
+        db.execute("CREATE TABLE seen_posts (id TEXT PRIMARY KEY, author TEXT, title TEXT, submolt TEXT, upvotes INTEGER, comment_count INTEGER, seen_at TEXT)")
+        db.execute("CREATE TABLE my_comments (id TEXT PRIMARY KEY, post_id TEXT, post_author TEXT, content TEXT, commented_at TEXT)")
+        db.executemany("INSERT INTO seen_posts (id, author) VALUES (?, ?)", [("p1", "Ann"), ("p2", "Ann"), ("p3", "?")])
+        db.execute("INSERT INTO my_comments (id, post_author) VALUES ('c1', 'Ann')")
+        db.commit()
+        migrate(db)
+        edges = {(r["kind"], r["dst"]): r["weight"] for r in db.execute("SELECT kind, dst, weight FROM edges")}
+        assert edges == {("seen", "Ann"): 2, ("comment", "Ann"): 1}
+
+
+class TestReviewReplies:
+    @patch("molt.commands.browse.parallel_fetch")
+    def test_review_records_each_reply_once(self, mock_fetch: object, memdb: sqlite3.Connection) -> None:
+        memdb.execute("INSERT INTO my_comments (id, post_id, post_author, content) VALUES ('mine', 'p1', 'Ann', 'hi')")
+        thread = {"comments": [{"id": "mine", "upvotes": 2, "replies": [
+            {"id": "r1", "author": {"name": "Ann"}, "content": "thanks"},
+            {"id": "r2", "author": {"name": "Cy"}, "content": "hm"},
+        ]}]}
+        mock_fetch.return_value = [thread, {"comments": []}]  # type: ignore[union-attr]
+        cmd_review(memdb)
+        cmd_review(memdb)
+        rows = memdb.execute("SELECT src, weight FROM edges WHERE kind='reply' AND dst=? ORDER BY src", (ME,)).fetchall()
+        assert [(r["src"], r["weight"]) for r in rows] == [("Ann", 1), ("Cy", 1)]
@@ -0,0 +1,108 @@
+"""Tests for molt.http_policy — the request steps shared by req() and the async engine."""
+
+import asyncio
+from collections import deque
+from typing import Any
+
+import pytest
+
+import molt.aio
+import molt.api
+from molt import http_policy
+from molt.api import _RateTracker, parallel_fetch
+from molt.http_policy import DEADLINE_ERROR, Attempts
+from molt.metrics import Metrics, Sample
+
+
+class _Limiter:
+    def __init__(self, waits: list[float]) -> None:
+        self.waits = waits
+
+    def reserve(self, _method: str) -> float:
+        return self.waits.pop(0) if self.waits else 0.0
+
+
+def _attempts(method: str = "GET", waits: list[float] | None = None, **kwargs: Any) -> tuple[Attempts, deque[Sample]]:
+    metrics = Metrics()
+    a = Attempts(
+        method, "/x", kwargs.pop("timeout", 10), limiter=_Limiter(waits or []),
+        decode=lambda _m, _p, status, _r, raw: {"status": status, "raw": raw.decode()}, metrics=metrics, **kwargs,
+    )
+    return a, metrics._ring
+
+
+class TestSteps:
+    @pytest.fixture(autouse=True)
+    def _fast_backoff(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(http_policy, "BACKOFF_BASE", 0.0)
+
+    def test_retries_then_succeeds(self) -> None:
+        a, recorded = _attempts()
+        assert a.wait() == 0
+        a.received(503, "Busy", {}, b"busy")
+        assert a.wait() == 0  # zero backoff, then the limiter admits
+        a.failed(ConnectionResetError())
+        assert a.wait() == 0
+        a.received(200, "OK", {}, b"ok")
+        assert a.wait() is None
+        assert a.result == {"status": 200, "raw": "ok"}
+        assert recorded[0].retries == 2
+
+    def test_writes_are_not_retried(self) -> None:
+        a, _ = _attempts("POST")
+        assert a.wait() == 0
+        a.failed(TimeoutError())
+        assert a.wait() is None
+        assert a.result == {"success": False, "error": "TimeoutError"}
+
+    def test_limiter_wait_does_not_count_against_deadline(self) -> None:
+        a, _ = _attempts(waits=[30.0], deadline=5, timeout=4)
+        assert a.wait() == 30.0
+        assert a.wait() == 0
+        assert a.send_timeout() == 4
+        assert a.phases.wait == 30.0
+
+    def test_retry_waits_for_the_limiter(self) -> None:
+        a, _ = _attempts(waits=[0.0, 30.0], deadline=5)
+        assert a.wait() == 0
+        a.received(429, "Too Many", {"Retry-After": "0"}, b"slow down")
+        assert a.wait() == 30.0
+        assert a.wait() == 0
+        a.received(200, "OK", {}, b"ok")
+        assert a.result == {"status": 200, "raw": "ok"}
+
+    def test_nothing_sent_past_deadline(self) -> None:
+        a, recorded = _attempts(deadline=0)
+        assert a.wait() is None
+        assert a.result == {"success": False, "error": DEADLINE_ERROR}
+        assert recorded[0].status == 0
+
+    def test_conditional_not_modified(self) -> None:
+        a, _ = _attempts(conditional={"If-None-Match": '"v1"'})
+        a.wait()
+        a.received(304, "Not Modified", {}, b"")
+        assert a.result == {"success": True, "not_modified": True}
+
+
+class TestSeeding:
+    def test_limiter_seeded_before_the_event_loop(self, monkeypatch: pytest.MonkeyPatch, tmp_path: Any) -> None:
+        loop_running: list[bool] = []
+
+        def seed(self: _RateTracker) -> None:
+            self._seeded = True
+            try:
+                asyncio.get_running_loop()
+                loop_running.append(True)
+            except RuntimeError:
+                loop_running.append(False)
+
+        monkeypatch.setattr(molt.api, "DB_PATH", tmp_path / "molt.db")
+        monkeypatch.setattr(_RateTracker, "_seed", seed)
+        monkeypatch.setattr(molt.api, "_rate", _RateTracker())
+
+        async def _asend(*_a: object, **_kw: object) -> tuple[int, str, dict[str, str], bytes]:
+            return 200, "OK", {}, b"{}"
+
+        monkeypatch.setattr(molt.aio, "_asend", _asend)
+        parallel_fetch([("GET", "/a")])
+        assert loop_running == [False]
@@ -0,0 +1,87 @@
+"""Tests for molt.hud."""
+
+import sqlite3
+from unittest.mock import patch
+
+from molt.hud import _cached_fetch, hud
+
+CALLS = [("me", "GET", "/agents/me"), ("dm", "GET", "/agents/dm/check")]
+
+
+class TestCachedFetch:
+    @patch("molt.hud.parallel_fetch")
+    def test_second_call_served_from_db(self, mock_fetch: object, memdb: sqlite3.Connection) -> None:
+        mock_fetch.return_value = [{"agent": {"name": "me"}}, {"requests": {}}]  # type: ignore[union-attr]
+        first, _ = _cached_fetch(memdb, CALLS)
+        second, age = _cached_fetch(memdb, CALLS)
+        assert first == second
+        assert age == 0
+        assert mock_fetch.call_count == 1  # type: ignore[union-attr]
+
+    @patch("molt.hud.parallel_fetch")
+    def test_expired_entries_refetched(self, mock_fetch: object, memdb: sqlite3.Connection) -> None:
+        mock_fetch.return_value = [{"agent": {"name": "me"}}, {"requests": {}}]  # type: ignore[union-attr]
+        _cached_fetch(memdb, CALLS)
+        memdb.execute("UPDATE http_cache SET fetched_at = fetched_at - 3600 WHERE key='GET /agents/me'")
+        mock_fetch.return_value = [{"agent": {"name": "me", "karma": 5}}]  # type: ignore[union-attr]
+        result, _ = _cached_fetch(memdb, CALLS)
+        mock_fetch.assert_called_with([("GET", "/agents/me")], timeout=10)  # type: ignore[union-attr]
+        assert result["me"]["agent"]["karma"] == 5
+
+    @patch("molt.hud.parallel_fetch")
+    def test_errors_not_cached(self, mock_fetch: object, memdb: sqlite3.Connection) -> None:
+        mock_fetch.return_value = [{"error": "timed out"}, {"requests": {}}]  # type: ignore[union-attr]
+        result, _ = _cached_fetch(memdb, CALLS)
+        assert result["me"] == {"error": "timed out"}
+        keys = [r["key"] for r in memdb.execute("SELECT key FROM http_cache")]
+        assert keys == ["GET /agents/dm/check"]
+
+
+class TestStaleOk:
+    @patch("molt.hud.spawn")
+    @patch("molt.hud.parallel_fetch")
+    def test_stale_snapshot_returned_and_refreshed_in_background(
+        self, mock_fetch: object, mock_spawn: object, memdb: sqlite3.Connection,
+    ) -> None:
+        mock_fetch.return_value = [{"agent": {"name": "me"}}, {"requests": {}}]  # type: ignore[union-attr]
+        _cached_fetch(memdb, CALLS)
+        memdb.execute("UPDATE http_cache SET fetched_at = fetched_at - 120")
+        result, age = _cached_fetch(memdb, CALLS, stale_ok=True)
+        assert result["me"] == {"agent": {"name": "me"}}
+        assert age >= 120
+        assert mock_fetch.call_count == 1  # type: ignore[union-attr]
+        mock_spawn.assert_called_once()  # type: ignore[union-attr]
+        assert mock_spawn.call_args.args[1] == CALLS  # type: ignore[union-attr]
+
+    @patch("molt.hud.spawn")
+    @patch("molt.hud.parallel_fetch")
+    def test_missing_snapshot_fetched_synchronously(
+        self, mock_fetch: object, mock_spawn: object, memdb: sqlite3.Connection,
+    ) -> None:
+        mock_fetch.return_value = [{"agent": {"name": "me"}}, {"requests": {}}]  # type: ignore[union-attr]
+        result, age = _cached_fetch(memdb, CALLS, stale_ok=True)
+        assert result["dm"] == {"requests": {}}
+        assert age == 0
+        mock_spawn.assert_not_called()  # type: ignore[union-attr]
+
+
+class TestHudChecks:
+    @patch("molt.hud.HUD_MODE", "async")
+    @patch("molt.hud.rate_usage", return_value=(0, 60, 0, 30))
+    @patch("molt.hud.spawn")
+    @patch("molt.hud.parallel_fetch")
+    def test_dm_check_logged_only_when_fetched(
+        self, mock_fetch: object, mock_spawn: object, mock_usage: object, memdb: sqlite3.Connection,
+    ) -> None:
+        mock_fetch.return_value = [  # type: ignore[union-attr]
+            {"requests": {}}, {"agent": {"name": "me", "karma": 3}}, {"notifications": []},
+        ]
+        hud(memdb)
+        assert memdb.execute("SELECT COUNT(*) FROM actions WHERE action='dmcheck_bg'").fetchone()[0] == 1
+        memdb.execute("UPDATE http_cache SET fetched_at = fetched_at - 120")
+        memdb.execute("DELETE FROM agents")
+        hud(memdb)  # prints the stale snapshot; the refresh is spawned, not run here
+        assert memdb.execute("SELECT COUNT(*) FROM actions WHERE action='dmcheck_bg'").fetchone()[0] == 1
+        assert memdb.execute("SELECT COUNT(*) FROM agents").fetchone()[0] == 0
+        mock_spawn.assert_called_once()  # type: ignore[union-attr]
+        mock_usage.assert_called()  # type: ignore[union-attr]
@@ -0,0 +1,80 @@
+"""Tests for the CLI dispatcher — registry, argument parsing, lazy imports."""
+
+import importlib
+import os
+import sqlite3
+import subprocess
+import sys
+from unittest.mock import patch
+
+from molt import ROOT
+from molt.__main__ import COMMANDS, USAGE, _options, dispatch
+
+
+class TestRegistry:
+    def test_every_command_resolves(self) -> None:
+        for name, spec in COMMANDS.items():
+            assert callable(getattr(importlib.import_module(spec.module), spec.func)), name
+
+    def test_usage_and_registry_agree(self) -> None:
+        documented = {
+            line.split()[0] for line in USAGE.splitlines()
+            if line.startswith("  ") and not line.startswith("   ")
+        }
+        assert documented == set(COMMANDS)
+
+
+class TestDispatch:
+    @patch("molt.commands.browse.cmd_feed")
+    def test_defaults_and_int_args(self, mock_feed: object, memdb: sqlite3.Connection) -> None:
+        assert dispatch(memdb, ["feed"]) is True
+        assert dispatch(memdb, ["feed", "5", "20"]) is True
+        assert mock_feed.call_args_list[0].args == (memdb, 10, 0)  # type: ignore[union-attr]
+        assert mock_feed.call_args_list[1].args == (memdb, 5, 20)  # type: ignore[union-attr]
+
+    @patch("molt.commands.dm.cmd_dmsend")
+    def test_rest_joins_words(self, mock_send: object, memdb: sqlite3.Connection) -> None:
+        dispatch(memdb, ["dmsend", "Bot", "hello", "there"])
+        mock_send.assert_called_once_with(memdb, "Bot", "hello there")  # type: ignore[union-attr]
+
+    @patch("molt.commands.browse.cmd_stats")
+    def test_db_free_command(self, mock_stats: object, memdb: sqlite3.Connection) -> None:
+        dispatch(memdb, ["stats"])
+        mock_stats.assert_called_once_with()  # type: ignore[union-attr]
+
+    @patch("molt.commands.browse.cmd_read")
+    def test_missing_argument_prints_usage_line(self, mock_read: object, memdb: sqlite3.Connection, capsys: object) -> None:
+        assert dispatch(memdb, ["read"]) is False
+        assert dispatch(memdb, ["feed", "ten"]) is False
+        out = capsys.readouterr().out  # type: ignore[union-attr]
+        assert "Usage: read <post_id>" in out
+        assert "Usage: feed [n] [offset]" in out
+        mock_read.assert_not_called()  # type: ignore[union-attr]
+
+    def test_unknown_command(self, memdb: sqlite3.Connection, capsys: object) -> None:
+        assert dispatch(memdb, ["bogus"]) is False
+        assert "Unknown command: bogus" in capsys.readouterr().out  # type: ignore[union-attr]
+
+    def test_global_flags_only_before_the_command(self) -> None:
+        assert _options(["review", "all"]) == (["review", "all"], {})
+        assert _options(["--profile", "review"]) == (["review"], {"--profile": ""})
+        assert _options(["--profile=/tmp/c.prof", "--stale-ok", "catchup", "3"]) == (
+            ["catchup", "3"], {"--profile": "/tmp/c.prof", "--stale-ok": ""},
+        )
+        assert _options(["note", "Bot", "likes", "--offline"]) == (["note", "Bot", "likes", "--offline"], {})
+        assert _options(["search", "--profile"]) == (["search", "--profile"], {})
+        assert _options(["--offline"]) == ([], {"--offline": ""})
+
+
+class TestLazyImports:
+    def test_startup_skips_network_and_solver_modules(self) -> None:
+        code = (
+            "import sys, molt.__main__, molt.commands.browse\n"
+            "heavy = {'asyncio', 'http.client', 'ssl', 'molt.solver', 'molt.aio', 'molt.commands.dm', 'molt.commands.write'}\n"
+            "print(sorted(heavy & set(sys.modules)))\n"
+        )
+        env = {k: v for k, v in os.environ.items() if k != "MOLTBOOK_API_KEY"}
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        assert out.strip() == "[]"  # and no key was needed just to import
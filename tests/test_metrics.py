@@ -0,0 +1,58 @@
+"""Tests for molt.metrics — endpoint templates, on-disk ring, summaries."""
+
+import sqlite3
+
+import pytest
+
+import molt.metrics
+from molt.metrics import Metrics, Phases, endpoint, summarize
+
+
+class TestEndpoint:
+    @pytest.mark.parametrize(("path", "template"), [
+        ("/posts/abc-123/comments?sort=top", "/posts/{id}/comments"),
+        ("/agents/ClaudeOpus-Lauri/comments?limit=50", "/agents/{id}/comments"),
+        ("/agents/me", "/agents/me"),
+        ("/agents/leaderboard?limit=5", "/agents/leaderboard"),
+        ("/agents/dm/requests/c9/approve", "/agents/dm/requests/{id}/approve"),
+        ("/notifications/read-by-post/p1", "/notifications/read-by-post/{id}"),
+        ("/posts", "/posts"),
+    ])
+    def test_templates(self, path: str, template: str) -> None:
+        assert endpoint(path) == template
+
+
+def _phases(ttfb: float) -> Phases:
+    p = Phases()
+    p.ttfb = ttfb
+    return p
+
+
+class TestRing:
+    def test_flush_wraps_at_capacity(self, memdb: sqlite3.Connection, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(molt.metrics, "_CAPACITY", 4)
+        m = Metrics()
+        for i in range(3):
+            m.record("GET", f"/posts/p{i}", 200, _phases(0.01), total=0.02, size=100, retries=0)
+        m.flush(memdb)
+        for i in range(3):
+            m.record("GET", "/feed", 200, _phases(0.01), total=0.03 + i, size=100, retries=0)
+        m.flush(memdb)
+        assert m.pending() == 0
+        rows = memdb.execute("SELECT slot, endpoint FROM request_metrics ORDER BY slot").fetchall()
+        assert [tuple(r) for r in rows] == [(0, "/feed"), (1, "/feed"), (2, "/posts/{id}"), (3, "/feed")]
+
+
+class TestSummarize:
+    def test_percentiles_errors_and_share_order(self, memdb: sqlite3.Connection) -> None:
+        m = Metrics()
+        for ms in range(1, 101):
+            m.record("GET", f"/posts/p{ms}", 200, _phases(ms / 2000), total=ms / 1000, size=2048, retries=0)
+        m.record("GET", "/agents/me", 503, _phases(0), total=2.0, size=0, retries=3)
+        m.record("GET", "/agents/me", 0, _phases(0), total=0.1, size=0, retries=0)
+        m.flush(memdb)
+        posts, me = summarize(memdb, 0)
+        assert (posts["endpoint"], posts["count"], posts["errors"]) == ("/posts/{id}", 100, 0)
+        assert posts["total"] == {"p50": 50.0, "p95": 95.0, "p99": 99.0}
+        assert posts["bytes_avg"] == 2048
+        assert (me["errors"], me["retries"]) == (2, 3)
@@ -0,0 +1,195 @@
+"""Tests for molt.mirror — --offline / --stale-ok reads from the local store."""
+
+import sqlite3
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+import molt.api
+from molt import mirror
+from molt.background import join_all
+from molt.commands.browse import cmd_agent, cmd_feed, cmd_myposts, cmd_read, cmd_sfeed
+from molt.db import ingest_posts, open_db, remember_agent
+from molt.hud import _cached_fetch
+
+POST = {
+    "id": "p1", "title": "Notes on evals", "author": {"name": "rayleigh"}, "submolt": {"name": "general"},
+    "upvotes": 7, "downvotes": 0, "comment_count": 1, "content": "Full body text", "created_at": "2026-10-18T10:00:00+00:00",
+}
+COMMENT = {"id": "c1", "author": {"name": "xtoa"}, "upvotes": 2, "content": "Good point", "replies": []}
+
+
+def _seed(db: sqlite3.Connection) -> None:
+    ingest_posts(db, [
+        {"id": f"f{i}", "title": f"Feed post {i}", "author": {"name": f"agent{i}"},
+         "submolt": {"name": "general" if i % 2 else "philosophy"}, "upvotes": i, "comment_count": 0}
+        for i in range(6)
+    ])
+    remember_agent(db, {"name": "rayleigh", "karma": 200, "follower_count": 9, "description": "Interpretability"})
+    db.commit()
+
+
+@pytest.fixture
+def offline() -> Iterator[None]:
+    with patch.object(mirror, "MODE", mirror.OFFLINE):
+        yield
+
+
+@pytest.fixture
+def inline_refresh() -> Iterator[list[Callable[[sqlite3.Connection], Any]]]:
+    """Capture stale-ok background refreshes instead of starting threads."""
+    queued: list[Callable[[sqlite3.Connection], Any]] = []
+    with patch.object(mirror, "MODE", mirror.STALE_OK), patch.object(mirror, "revalidate", queued.append):
+        yield queued
+
+
+@pytest.fixture
+def mock_pg() -> Iterator[Any]:
+    with patch("molt.commands.browse.paginate") as mock:
+        yield mock
+
+
+@pytest.mark.usefixtures("offline", "mock_pg")
+@patch("molt.commands.browse.req")
+class TestOffline:
+    def test_feed_and_sfeed_from_local_store(self, mock_req: Any, memdb: sqlite3.Connection, capsys: Any) -> None:
+        _seed(memdb)
+        cmd_feed(memdb, 3)
+        out = capsys.readouterr().out
+        assert "offline: local copy from" in out
+        assert out.count("id=") == 3
+        cmd_sfeed(memdb, "philosophy", 10, "top")
+        out = capsys.readouterr().out
+        assert out.count("id=") == 3
+        assert out.index("Feed post 4") < out.index("Feed post 2") < out.index("Feed post 0")
+        mock_req.assert_not_called()
+
+    def test_read_replays_the_last_full_thread(self, mock_req: Any, mock_pg: Any, memdb: sqlite3.Connection, capsys: Any) -> None:
+        with patch.object(mirror, "MODE", mirror.ONLINE):
+            mock_req.return_value = {"success": True, "post": POST}
+            mock_pg.return_value = iter([COMMENT])
+            cmd_read(memdb, "p1")
+        capsys.readouterr()
+        mock_req.reset_mock()
+        cmd_read(memdb, "p1")
+        out = capsys.readouterr().out
+        assert "Full body text" in out
+        assert "Good point" in out
+        assert "1 comments (as of" in out
+        mock_req.assert_not_called()
+
+    def test_agent_and_missing_entries(self, mock_req: Any, memdb: sqlite3.Connection, capsys: Any) -> None:
+        _seed(memdb)
+        cmd_agent(memdb, "rayleigh")
+        out = capsys.readouterr().out
+        assert "karma=200" in out
+        assert "Interpretability" in out
+        cmd_agent(memdb, "nobody")
+        cmd_read(memdb, "f1")  # seen in a listing, so no body to show
+        assert capsys.readouterr().out.count("not in the local store") == 2
+        mock_req.assert_not_called()
+
+    def test_myposts_shows_stored_counters(self, mock_req: Any, memdb: sqlite3.Connection, capsys: Any) -> None:
+        memdb.execute(
+            "INSERT INTO my_posts (id, submolt, title, posted_at, upvotes, comment_count, last_checked) "
+            "VALUES ('m1', 'general', 'Mine', '2026-10-17T10:00:00+00:00', 12, 4, '2026-10-18T09:00:00+00:00')",
+        )
+        with patch("molt.commands.browse.parallel_fetch") as mock_fetch:
+            cmd_myposts(memdb)
+        out = capsys.readouterr().out
+        assert "12^ 4c" in out
+        assert "offline: local copy from" in out
+        mock_fetch.assert_not_called()
+        mock_req.assert_not_called()
+
+
+class TestThreadMirror:
+    def _read(self, memdb: sqlite3.Connection, comments: list[dict[str, Any]], failure: dict[str, Any] | None) -> None:
+        def pages(*_a: Any, failures: list[dict[str, Any]], **_kw: Any) -> Iterator[dict[str, Any]]:
+            yield from comments
+            if failure:
+                failures.append(failure)
+
+        with (
+            patch("molt.commands.browse.req", return_value={"success": True, "post": POST}),
+            patch("molt.commands.browse.paginate", pages),
+        ):
+            cmd_read(memdb, "p1")
+
+    def test_truncated_fetch_is_flagged_and_kept_marked(self, memdb: sqlite3.Connection, capsys: Any) -> None:
+        self._read(memdb, [COMMENT], {"success": False, "error": "HTTP 503"})
+        assert "thread incomplete: showing 1, fetching stopped: HTTP 503" in capsys.readouterr().out
+        with patch.object(mirror, "MODE", mirror.OFFLINE):
+            cmd_read(memdb, "p1")
+        assert "1 comments (as of 0m ago; incomplete, 1 on the post)" in capsys.readouterr().out
+
+    def test_truncated_fetch_never_replaces_a_complete_copy(self, memdb: sqlite3.Connection, capsys: Any) -> None:
+        second = {**COMMENT, "id": "c2", "content": "Second thought"}
+        self._read(memdb, [COMMENT, second], None)
+        self._read(memdb, [COMMENT], {"success": False, "error": "HTTP 503"})
+        capsys.readouterr()
+        with patch.object(mirror, "MODE", mirror.OFFLINE):
+            cmd_read(memdb, "p1")
+        out = capsys.readouterr().out
+        assert "2 comments (as of 0m ago) ---" in out
+        assert "Second thought" in out
+        assert memdb.execute("SELECT COUNT(*) FROM mirrored_comments").fetchone()[0] == 2  # the partial copy is gone
+
+
+class TestNetworkRefused:
+    def test_req_and_parallel_fetch_do_not_send(self, offline: None) -> None:
+        with patch("molt.api._send", side_effect=AssertionError("network used")):
+            assert molt.api.req("GET", "/feed") == mirror.OFFLINE_ERROR
+            assert molt.api.parallel_fetch([("GET", "/a"), ("GET", "/b")]) == [mirror.OFFLINE_ERROR] * 2
+
+    def test_hud_uses_any_cached_entry(self, offline: None, memdb: sqlite3.Connection) -> None:
+        memdb.execute("INSERT INTO http_cache (key, fetched_at, body) VALUES ('GET /agents/me', 0, '{\"ok\": 1}')")
+        with patch("molt.hud.parallel_fetch") as mock_fetch:
+            results, stale_age = _cached_fetch(memdb, [("me", "GET", "/agents/me"), ("dm", "GET", "/agents/dm/check")])
+        assert results == {"me": {"ok": 1}}
+        assert stale_age > 0
+        mock_fetch.assert_not_called()
+
+
+class TestStaleOk:
+    @patch("molt.commands.browse.req")
+    def test_serves_local_then_refreshes_in_background(
+        self, mock_req: Any, memdb: sqlite3.Connection, inline_refresh: list[Any], capsys: Any,
+    ) -> None:
+        _seed(memdb)
+        cmd_feed(memdb, 2)
+        assert "stale-ok: local copy" in capsys.readouterr().out
+        mock_req.assert_not_called()
+        mock_req.return_value = {"success": True, "posts": [{**POST, "id": "fresh"}]}
+        inline_refresh.pop()(memdb)
+        assert memdb.execute("SELECT 1 FROM seen_posts WHERE id = 'fresh'").fetchone()
+
+    @patch("molt.commands.browse.req")
+    def test_nothing_local_fetches_in_foreground(
+        self, mock_req: Any, memdb: sqlite3.Connection, inline_refresh: list[Any], capsys: Any,
+    ) -> None:
+        mock_req.return_value = {"success": True, "agent": {"name": "newbie", "karma": 3, "follower_count": 1}}
+        cmd_agent(memdb, "newbie")
+        assert "karma=3" in capsys.readouterr().out
+        mock_req.assert_called_once()
+        assert not inline_refresh
+
+    @patch("molt.commands.browse.parallel_fetch", new=lambda *_a, **_kw: [{"success": False, "error": "rate limited"}])
+    def test_background_myposts_never_marks_removed(self, memdb: sqlite3.Connection, inline_refresh: list[Any]) -> None:
+        memdb.execute("INSERT INTO my_posts (id, submolt, title, posted_at) VALUES ('m1', 'general', 'Mine', '2026-10-17T10:00:00+00:00')")
+        cmd_myposts(memdb)
+        inline_refresh.pop()(memdb)
+        assert memdb.execute("SELECT removed_at FROM my_posts WHERE id = 'm1'").fetchone()[0] is None
+
+    def test_revalidate_commits_on_its_own_connection(self, tmp_path: Path) -> None:
+        path = tmp_path / "molt.db"
+        open_db(path).close()
+        with patch("molt.mirror.get_db", lambda: open_db(path)):
+            mirror.revalidate(lambda db: db.execute("INSERT INTO kv (key, value) VALUES ('k', 'v')"))
+            join_all(timeout=5)
+        db = open_db(path)
+        assert db.execute("SELECT value FROM kv WHERE key = 'k'").fetchone()[0] == "v"
+        db.close()
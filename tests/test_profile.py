@@ -0,0 +1,159 @@
+"""Tests for molt.profile — per-category attribution, installation, dumps."""
+
+import io
+import pstats
+import sqlite3
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+import molt.api
+import molt.commands.browse
+from molt.db import MoltConnection, commit_pending, log_action, open_db, transaction
+from molt.profile import Profiler, run
+
+_WRAPPED = ("req", "parallel_fetch", "paginate", "handle_verification")
+
+
+@pytest.fixture
+def restore() -> Iterator[None]:
+    """Undo Profiler.install(): module attributes, sqlite3.connect and sys.stdout."""
+    saved = [
+        (mod, attr, getattr(mod, attr))
+        for name, mod in list(sys.modules.items()) if name.startswith("molt")
+        for attr in _WRAPPED if hasattr(mod, attr)
+    ]
+    with patch.object(sqlite3, "connect", sqlite3.connect), patch.object(sys, "stdout", sys.stdout):
+        yield
+    for mod, attr, value in saved:
+        setattr(mod, attr, value)
+
+
+class TestAttribution:
+    def test_nested_time_is_exclusive(self) -> None:
+        p = Profiler()
+        inner = p.timed("sqlite", lambda: time.sleep(0.05))
+
+        def outer() -> None:
+            time.sleep(0.02)
+            inner()
+
+        p.active = True
+        p.timed("network", outer)()
+        assert p.totals["sqlite"] >= 0.05
+        assert 0.02 <= p.totals["network"] < 0.045
+        assert p.calls == {"network": 1, "sqlite": 1}
+
+    def test_inactive_and_other_threads_are_ignored(self) -> None:
+        p = Profiler()
+        f = p.timed("network", lambda: None)
+        f()
+        p.active = True
+        t = threading.Thread(target=f)
+        t.start()
+        t.join()
+        assert not p.calls
+
+    def test_generator_steps_are_timed(self) -> None:
+        p = Profiler()
+
+        def pages() -> Iterator[int]:
+            for i in range(3):
+                time.sleep(0.01)
+                yield i
+
+        p.active = True
+        assert list(p.timed_iter("network", pages)()) == [0, 1, 2]
+        assert p.calls["network"] == 4  # three pages and the final StopIteration
+        assert p.totals["network"] >= 0.03
+
+
+class TestInstall:
+    @pytest.mark.usefixtures("restore")
+    def test_every_category_without_touching_commands(self, capsys: pytest.CaptureFixture[str]) -> None:
+        def fake_req(*_args: object, **_kwargs: object) -> dict[str, bool]:
+            time.sleep(0.02)
+            return {"success": True}
+
+        molt.api.req = molt.commands.browse.req = fake_req
+        molt.api.handle_verification = lambda d: d
+        p = Profiler()
+        p.install()
+        assert molt.commands.browse.req is molt.api.req  # rebound in already-imported modules
+        assert molt.api.req is not fake_req
+        db = sqlite3.connect(":memory:")
+        db.row_factory = sqlite3.Row
+
+        def command() -> None:
+            db.execute("CREATE TABLE t (x)")
+            db.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(100)])
+            db.commit()
+            assert [r["x"] for r in db.execute("SELECT x FROM t LIMIT 2")] == [0, 1]
+            molt.api.handle_verification({"success": True})
+            molt.commands.browse.req("GET", "/home")
+            print("hello")
+
+        run("demo", command, p)
+        assert p.calls["sqlite"] >= 5
+        assert p.calls["solver"] == 1
+        assert p.calls["network"] == 1
+        assert p.totals["network"] >= 0.02
+        assert p.calls["stdout"] >= 1
+        err = capsys.readouterr().err
+        assert "--- profile: demo" in err
+        for cat in ("network", "sqlite", "solver", "stdout", "other"):
+            assert f"  {cat}" in err
+        db.close()
+
+    @pytest.mark.usefixtures("restore")
+    def test_keeps_the_requested_connection_factory(self, tmp_path: Path) -> None:
+        p = Profiler()
+        p.install()
+        db = open_db(tmp_path / "molt.db")
+        assert isinstance(db, MoltConnection)
+        p.active = True
+        with transaction(db):
+            log_action(db, "t", "")
+            db.commit()
+        assert p.calls["sqlite"] >= 3
+        assert db.execute("SELECT COUNT(*) FROM actions").fetchone()[0] == 1
+        db.close()
+
+    @pytest.mark.usefixtures("restore")
+    def test_commit_pending_is_timed(self, tmp_path: Path) -> None:
+        p = Profiler()
+        p.install()
+        db = open_db(tmp_path / "molt.db")
+        with transaction(db):
+            log_action(db, "t", "")
+            p.active = True
+            commit_pending()
+            p.active = False
+            assert not db.in_transaction
+        assert p.calls == {"sqlite": 1}
+        db.close()
+
+    def test_dump_writes_pstats_and_collapsed_stacks(self, tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+        def busy() -> int:
+            end = time.perf_counter() + 0.05
+            n = 0
+            while time.perf_counter() < end:
+                n += 1
+            return n
+
+        dump = tmp_path / "review.prof"
+        assert run("busy", busy, Profiler(), dump) > 0
+        stats = io.StringIO()
+        pstats.Stats(str(dump), stream=stats).print_stats("busy")
+        assert "busy" in stats.getvalue()
+        folded = (tmp_path / "review.prof.folded").read_text(encoding="utf-8").splitlines()
+        assert folded
+        _stack, count = folded[0].rsplit(" ", 1)
+        assert int(count) > 0
+        assert any("test_profile.busy" in line for line in folded)
+        assert "collapsed stacks" in capsys.readouterr().err
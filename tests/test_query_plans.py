@@ -0,0 +1,118 @@
+"""Query plan audit — every local command's SELECTs must be served by an index."""
+
+import re
+import sqlite3
+import time
+from collections.abc import Callable
+from unittest.mock import patch
+
+import pytest
+
+from molt import mirror
+from molt.commands.browse import (
+    cmd_agent,
+    cmd_controversial,
+    cmd_feed,
+    cmd_history,
+    cmd_myposts,
+    cmd_network,
+    cmd_perf,
+    cmd_postwindow,
+    cmd_prune,
+    cmd_read,
+    cmd_review,
+    cmd_search,
+    cmd_sfeed,
+    cmd_trends,
+)
+from molt.commands.verify import cmd_challenges
+from molt.db import log_action, log_challenge, mark_seen, remember_agent
+from molt.metrics import Metrics, Phases
+from molt.series import snapshot
+from molt.timing import now_iso
+
+_BARE_SCAN = re.compile(r"SCAN (\w+)$")  # a table walked row by row, no index at all
+_DERIVED = re.compile(r"(?:CO-ROUTINE|MATERIALIZE) (\w+)")
+# Newest-first over an INTEGER PRIMARY KEY walks the rowid b-tree backwards and stops after LIMIT rows.
+_ROWID_TOP_N = re.compile(r"ORDER BY id DESC LIMIT", re.IGNORECASE)
+
+
+def _seed(db: sqlite3.Connection) -> None:
+    for i in range(40):
+        mark_seen(db, {
+            "id": f"p{i}", "title": f"Post about alignment {i}", "author": {"name": f"agent{i % 8}"},
+            "submolt": {"name": "general"}, "upvotes": i % 9, "downvotes": i % 4, "comment_count": i % 5,
+            "content": "interpretability and evals",
+        })
+    for i in range(8):
+        remember_agent(db, {"name": f"agent{i}", "karma": 10 * i, "description": "an agent"})
+    db.execute("UPDATE agents SET note='sharp' WHERE name='agent3'")
+    db.execute("INSERT INTO agents (name, note) VALUES ('lurker', 'never posts')")
+    for i in range(6):
+        db.execute(
+            "INSERT INTO my_posts (id, submolt, title, posted_at, removed_at) VALUES (?, 'general', ?, ?, ?)",
+            (f"m{i}", f"Mine {i}", now_iso(), None if i % 3 else now_iso()),
+        )
+        db.execute(
+            "INSERT INTO my_comments (id, post_id, post_author, content, commented_at, removed_at) VALUES (?, ?, ?, 'hi', ?, ?)",
+            (f"c{i}", f"p{i}", f"agent{i}", now_iso(), None if i % 3 else now_iso()),
+        )
+    snapshot(db, [(f"post:m{i}", i, 0, 1) for i in range(6)], time.time() - 3 * 86400)
+    snapshot(db, [(f"post:m{i}", 2 * i, 0, 2) for i in range(6)], time.time() - 3600)
+    metrics = Metrics()
+    metrics.record("GET", "/posts/p1", 200, Phases(), total=0.2, size=512, retries=0)
+    metrics.flush(db)
+    log_action(db, "comment", "seed")
+    log_challenge(db, code="v1", raw_text="x", decoded_text="x", numbers=[1.0], operation="add", proposed=1.0)
+    db.commit()
+
+
+def _failed_fetch(calls: list[tuple[str, str]], **_kw: object) -> list[dict[str, object]]:
+    return [{"success": False, "error": "offline"} for _ in calls]
+
+
+def _offline(cmd: Callable[..., None], *args: object) -> None:
+    with patch.object(mirror, "MODE", mirror.OFFLINE):
+        cmd(*args)
+
+
+COMMANDS: dict[str, Callable[[sqlite3.Connection], None]] = {
+    "controversial": cmd_controversial,
+    "network": cmd_network,
+    "postwindow": cmd_postwindow,
+    "history": cmd_history,
+    "search": lambda db: cmd_search(db, "alignment"),
+    "challenges": cmd_challenges,
+    "myposts": cmd_myposts,
+    "review": cmd_review,
+    "prune": cmd_prune,
+    "trends": cmd_trends,
+    "perf": cmd_perf,
+    "feed --offline": lambda db: _offline(cmd_feed, db, 10),
+    "sfeed --offline": lambda db: _offline(cmd_sfeed, db, "general", 10, "top"),
+    "read --offline": lambda db: _offline(cmd_read, db, "p3"),
+    "agent --offline": lambda db: _offline(cmd_agent, db, "agent3"),
+    "myposts --offline": lambda db: _offline(cmd_myposts, db),
+}
+
+
+@pytest.mark.parametrize("name", list(COMMANDS))
+@patch("molt.commands.browse.parallel_fetch", side_effect=_failed_fetch)
+@patch("molt.commands.browse.req", return_value={"success": False, "error": "offline"})
+def test_no_full_table_scans(mock_req: object, mock_fetch: object, name: str, memdb: sqlite3.Connection) -> None:
+    _seed(memdb)
+    statements: list[str] = []
+    memdb.set_trace_callback(statements.append)
+    COMMANDS[name](memdb)
+    memdb.set_trace_callback(None)
+
+    selects = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+    assert selects, f"{name} ran no queries"
+    for sql in selects:
+        plan = [row["detail"] for row in memdb.execute(f"EXPLAIN QUERY PLAN {sql}")]
+        derived = {m.group(1) for d in plan if (m := _DERIVED.match(d))}
+        for detail in plan:
+            scan = _BARE_SCAN.match(detail)
+            if scan and (_ROWID_TOP_N.search(sql) or scan.group(1).startswith("sqlite_") or scan.group(1) in derived):
+                continue  # rowid top-N, the (tiny) schema catalogue, or a subquery already checked
+            assert scan is None, f"{name}: full scan of {scan.group(1)} in\n  {sql}"  # type: ignore[union-attr]
@@ -0,0 +1,81 @@
+"""Tests for molt.series — engagement snapshots, compaction and analytics."""
+
+import sqlite3
+from datetime import UTC, datetime
+
+from molt.series import (
+    DAY,
+    HOUR,
+    compact,
+    hourly_rollup,
+    maybe_compact,
+    median_time_to,
+    snapshot,
+    time_to,
+    value_at,
+    velocity,
+)
+
+T0 = datetime(2026, 3, 2, 14, 0, tzinfo=UTC).timestamp()
+
+
+def _rows(memdb: sqlite3.Connection, entity: str) -> list[tuple[int, int]]:
+    return [(r["ts"], r["upvotes"]) for r in memdb.execute("SELECT ts, upvotes FROM engagement WHERE entity=? ORDER BY ts", (entity,))]
+
+
+def _post(memdb: sqlite3.Connection, pid: str, at: float) -> None:
+    memdb.execute(
+        "INSERT INTO my_posts (id, submolt, title, posted_at) VALUES (?, 'general', ?, ?)",
+        (pid, pid, datetime.fromtimestamp(at, UTC).isoformat()),
+    )
+
+
+class TestSnapshot:
+    def test_unchanged_values_are_not_appended(self, memdb: sqlite3.Connection) -> None:
+        snapshot(memdb, [("post:a", 1, 0, 0)], T0)
+        snapshot(memdb, [("post:a", 1, 0, 0)], T0 + HOUR)
+        snapshot(memdb, [("post:a", 3, 0, 1)], T0 + 2 * HOUR)
+        assert _rows(memdb, "post:a") == [(int(T0), 1), (int(T0 + 2 * HOUR), 3)]
+        assert value_at(memdb, "post:a", T0 + HOUR)["upvotes"] == 1  # type: ignore[index]
+        assert value_at(memdb, "post:a", T0 - 1) is None
+
+    def test_velocity_and_time_to(self, memdb: sqlite3.Connection) -> None:
+        snapshot(memdb, [("post:a", 2, 0, 0)], T0 + HOUR)
+        snapshot(memdb, [("post:a", 14, 0, 0)], T0 + 5 * HOUR)
+        assert velocity(memdb, "post:a", T0 + 7 * HOUR) == 2.0  # +12 over the 6h window
+        created = datetime.fromtimestamp(T0, UTC).isoformat()
+        assert time_to(memdb, "post:a", 10, created) == 5 * HOUR
+        assert time_to(memdb, "post:a", 50, created) is None
+
+
+class TestCompact:
+    def test_downsamples_by_age_and_keeps_newest(self, memdb: sqlite3.Connection) -> None:
+        for i in range(6):  # every 20 minutes, 60 days ago
+            snapshot(memdb, [("post:a", i, 0, 0)], T0 + i * 20 * 60)
+        now = T0 + 60 * DAY
+        assert compact(memdb, now) == 5
+        assert _rows(memdb, "post:a") == [(int(T0 + 100 * 60), 5)]  # last of the day, and the newest
+        assert compact(memdb, now + 400 * DAY) == 0  # the newest row survives retention
+
+    def test_recent_history_is_untouched(self, memdb: sqlite3.Connection) -> None:
+        for i in range(4):
+            snapshot(memdb, [("post:a", i, 0, 0)], T0 + i * 60)
+        maybe_compact(memdb, T0 + HOUR)
+        assert len(_rows(memdb, "post:a")) == 4
+
+
+class TestRollups:
+    def test_hour_of_day_uses_value_at_horizon(self, memdb: sqlite3.Connection) -> None:
+        _post(memdb, "a", T0)
+        _post(memdb, "b", T0 + 10 * 60)
+        _post(memdb, "c", T0 + 5 * HOUR)
+        snapshot(memdb, [("post:a", 10, 0, 2), ("post:b", 20, 0, 4), ("post:c", 1, 0, 0)], T0 + 20 * HOUR)
+        snapshot(memdb, [("post:a", 99, 0, 9)], T0 + 30 * HOUR)  # after a's 24h horizon
+        rollup = [tuple(r) for r in hourly_rollup(memdb, T0 + 40 * HOUR)]
+        assert rollup == [(14, 2, 15.0, 3.0), (19, 1, 1.0, 0.0)]
+
+    def test_median_time_to(self, memdb: sqlite3.Connection) -> None:
+        for pid, hours in (("a", 2), ("b", 4), ("c", None)):
+            _post(memdb, pid, T0)
+            snapshot(memdb, [(f"post:{pid}", 10 if hours else 3, 0, 0)], T0 + (hours or 1) * HOUR)
+        assert median_time_to(memdb, 10) == (3 * HOUR, 2, 1)
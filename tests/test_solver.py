@@ -1,8 +1,13 @@
 """Tests for molt.solver."""
 
+import itertools
+import random
+import string
+
 import pytest
 
 from molt.solver import (
+    _NOT_NUMBERS,
     WORD_TO_NUM,
     _extract_raw_operators,
     _fuzzy_num,
@@ -77,6 +82,54 @@ class TestFuzzyNum:
         assert _fuzzy_num("ttwelve") == 12
 
 
+def _fuzzy_num_reference(token: str) -> int | None:
+    """The original brute-force search, kept as the oracle for the precomputed tables."""
+    if token in WORD_TO_NUM:
+        return WORD_TO_NUM[token]
+    if len(token) < 3 or token in _NOT_NUMBERS:
+        return None
+    for i in range(len(token) + 1):
+        for c in "abcdefghilmnorstuvy":
+            candidate = token[:i] + c + token[i:]
+            if candidate in WORD_TO_NUM:
+                return WORD_TO_NUM[candidate]
+    for i in range(len(token)):
+        candidate = token[:i] + token[i + 1:]
+        if candidate in WORD_TO_NUM:
+            return WORD_TO_NUM[candidate]
+    for word, val in WORD_TO_NUM.items():
+        if word.startswith(token) and len(token) >= len(word) - 2:
+            return val
+    return None
+
+
+class TestFuzzyNumEquivalence:
+    @staticmethod
+    def _variants() -> set[str]:
+        tokens: set[str] = set(_NOT_NUMBERS)
+        words = list(WORD_TO_NUM)
+        alphabet = string.ascii_lowercase + "0'"
+        for w in words:
+            for i in range(len(w) + 1):
+                tokens.add(w[:i])
+                tokens.update(w[:i] + c + w[i:] for c in alphabet)
+                if i < len(w):
+                    tokens.add(w[:i] + w[i + 1:])
+                    tokens.update(w[:i] + c + w[i + 1:] for c in alphabet)
+        tokens.update(a + b for a, b in itertools.product(words, repeat=2))
+        rng = random.Random(1234)
+        tokens.update("".join(rng.choices(string.ascii_lowercase, k=rng.randint(1, 10))) for _ in range(5000))
+        return tokens
+
+    def test_matches_brute_force(self) -> None:
+        for token in self._variants():
+            assert _fuzzy_num(token) == _fuzzy_num_reference(token), token
+
+    def test_corpus_tokens(self) -> None:
+        for word in ("tweny", "ttwelve", "thiirty", "elven", "fiften", "fourten", "thre", "fift", "sevn", "nnine"):
+            assert _fuzzy_num(word) == _fuzzy_num_reference(word)
+
+
 class TestJoinSplitTokens:
     def test_joins_split_number(self) -> None:
         assert _join_split_tokens(["t", "welve"]) == ["twelve"]
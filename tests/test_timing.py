@@ -2,7 +2,7 @@
 
 from datetime import UTC, datetime, timedelta
 
-from molt.timing import POST_COOLDOWN, fmt_ago, now, now_iso
+from molt.timing import POST_COOLDOWN, epoch, fmt_ago, now, now_iso
 
 
 class TestNow:
@@ -13,6 +13,15 @@ class TestNow:
         assert datetime.fromisoformat(now_iso()).tzinfo is not None
 
 
+class TestEpoch:
+    def test_offsets_z_and_naive_agree(self) -> None:
+        assert epoch("2026-01-01T00:00:00+00:00") == epoch("2026-01-01T00:00:00Z") == epoch("2026-01-01T00:00:00") == 1767225600.0
+
+    def test_missing_or_garbage(self) -> None:
+        assert epoch(None) is None
+        assert epoch("yesterday") is None
+
+
 class TestFmtAgo:
     def test_never(self) -> None:
         assert fmt_ago(None) == "never"
@@ -188,6 +188,8 @@ class TestComment:
         assert row["post_author"] == "evil_robot_jas"
         action = memdb.execute("SELECT action, detail FROM actions ORDER BY id DESC LIMIT 1").fetchone()
         assert action["action"] == "comment"
+        edge = memdb.execute("SELECT weight FROM edges WHERE kind='comment' AND dst='evil_robot_jas'").fetchone()
+        assert edge["weight"] == 1
 
     @patch("molt.commands.write._check_post")
     @patch("molt.commands.write.req")